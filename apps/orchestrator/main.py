@@ -1,13 +1,25 @@
 # Created automatically by Cursor AI (2025-08-25)
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 from dotenv import load_dotenv
+import glob
+import json
 import os
+import uuid
+
+from tile_server import TileServer
+from metrics_exporter import MetricsExporter, CONTENT_TYPE
 
 load_dotenv()
 
+tile_server = TileServer()
+metrics_exporter = MetricsExporter()
+
+# Where workers store profiled runs (see monitoring/profiling.py); PROFILE_RETENTION bounds it
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/urban-planner-profiles")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -15,6 +27,7 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     print("Shutting down orchestrator...")
+    await tile_server.close()
 
 app = FastAPI(
     title="AI Urban Planner Crew Orchestrator",
@@ -40,6 +53,63 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+def metrics():
+    # Sync route so reading worker snapshots runs in the threadpool
+    return Response(content=metrics_exporter.render(tile_server.metrics.families()), media_type=CONTENT_TYPE)
+
+@app.get("/profiles")
+def profiles(limit: int = 20):
+    # Most recent profiled worker runs with their hottest functions, newest first
+    summaries = []
+    for path in glob.glob(os.path.join(PROFILE_DIR, "*", "*.json")):
+        try:
+            with open(path) as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError):
+            # Pruned or half-written between the listing and the read
+            continue
+    summaries.sort(key=lambda summary: summary.get("started_at", ""), reverse=True)
+    return {"profiles": summaries[:max(limit, 0)]}
+
+@app.get("/tiles/metrics")
+async def tile_metrics():
+    return tile_server.stats()
+
+@app.get("/tiles/{scenario_id}/{z}/{x}/{y}.pbf")
+async def get_tile(scenario_id: str, z: int, x: int, y: int, request: Request):
+    # The scenario ID becomes part of cache keys and disk paths, so only canonical UUIDs get through
+    try:
+        scenario_id = str(uuid.UUID(scenario_id))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid scenario ID")
+
+    if not 0 <= z <= 22 or not 0 <= x < 2 ** z or not 0 <= y < 2 ** z:
+        raise HTTPException(status_code=400, detail="Invalid tile coordinates")
+
+    resolved = await tile_server.get_etag(scenario_id, z, x, y)
+    if resolved is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+
+    revision, etag = resolved
+    headers = {
+        "ETag": etag,
+        "Cache-Control": tile_server.cache_control()
+    }
+
+    # Revalidations are answered from the revision alone, before the tile is loaded
+    if request.headers.get("if-none-match") == etag:
+        tile_server.metrics.counts["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+
+    tile, source = await tile_server.get_tile(scenario_id, revision, z, x, y)
+    headers["X-Tile-Cache"] = source
+
+    if not tile:
+        return Response(status_code=204, headers=headers)
+
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile", headers=headers)
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
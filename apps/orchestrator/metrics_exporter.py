@@ -0,0 +1,193 @@
+import fcntl
+import glob
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Counter and histogram totals of processes that stopped writing snapshots
+COMPACTED_FILE = "compacted.json"
+
+class MetricsExporter:
+    """Merges the metric snapshots written by worker processes and renders OpenMetrics text
+
+    Workers write <METRICS_DIR>/<host>-<pid>.json (see monitoring/openmetrics.py).
+    Counters and histograms are summed across files, so totals survive worker
+    restarts; a gauge takes the value from the most recently written file.
+
+    Live workers rewrite their file at least every heartbeat, so a file older than
+    stale_after seconds belongs to a dead process. Those are folded into
+    compacted.json, without their gauges, and deleted, which keeps the directory
+    bounded and stops dead gauges from being reported.
+    """
+
+    def __init__(self, snapshot_dir: Optional[str] = None, stale_after: Optional[float] = None,
+                 compact_interval: Optional[float] = None):
+        self.snapshot_dir = snapshot_dir if snapshot_dir is not None else os.getenv("METRICS_DIR", "")
+        # Must comfortably exceed the workers' METRICS_HEARTBEAT_SECONDS
+        self.stale_after = stale_after if stale_after is not None else float(os.getenv("METRICS_STALE_SECONDS", 300))
+        self.compact_interval = (
+            compact_interval if compact_interval is not None else float(os.getenv("METRICS_COMPACT_SECONDS", 60))
+        )
+        self.last_compaction = None
+
+    def load_snapshots(self) -> List[Dict[str, Any]]:
+        return [snapshot for _, snapshot in self._read_snapshots()]
+
+    def _read_snapshots(self) -> List[Tuple[str, Dict[str, Any]]]:
+        if not self.snapshot_dir:
+            return []
+
+        snapshots = []
+        for path in glob.glob(os.path.join(self.snapshot_dir, "*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append((path, json.load(f)))
+            except (OSError, ValueError):
+                # The writer replaces files atomically, so this is a vanished or foreign file
+                continue
+        return snapshots
+
+    def compact(self) -> int:
+        """Fold snapshots not rewritten within stale_after into compacted.json; returns how many"""
+        if not self.snapshot_dir or not os.path.isdir(self.snapshot_dir):
+            return 0
+
+        with open(os.path.join(self.snapshot_dir, ".compact.lock"), "a") as lock:
+            try:
+                # Several orchestrator workers may scrape at once; one compaction is enough
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return 0
+
+            compacted_path = os.path.join(self.snapshot_dir, COMPACTED_FILE)
+            cutoff = time.time() - self.stale_after
+            compacted, stale = None, []
+            for path, snapshot in self._read_snapshots():
+                if path == compacted_path:
+                    compacted = snapshot
+                elif snapshot.get("written_at", 0) < cutoff:
+                    stale.append((path, snapshot))
+            if not stale:
+                return 0
+
+            families = [
+                family for family in merge_snapshots(([compacted] if compacted else []) + [s for _, s in stale])
+                if family["type"] != "gauge"
+            ]
+            temp_path = f"{compacted_path}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({"version": 1, "process": "compacted", "written_at": 0, "families": families}, f,
+                          separators=(",", ":"))
+            os.replace(temp_path, compacted_path)
+
+            for path, _ in stale:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+            return len(stale)
+
+    def collect(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        if self.last_compaction is None or now - self.last_compaction >= self.compact_interval:
+            self.last_compaction = now
+            try:
+                self.compact()
+            except OSError:
+                # Serve the uncompacted snapshots; the next interval retries
+                pass
+        return merge_snapshots(self.load_snapshots())
+
+    def render(self, extra_families: List[Dict[str, Any]] = ()) -> str:
+        return render_families(self.collect() + list(extra_families))
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Combine per-process snapshots into one list of families with merged samples"""
+    families: Dict[str, Dict[str, Any]] = {}
+
+    for snapshot in sorted(snapshots, key=lambda s: s.get("written_at", 0)):
+        for family in snapshot.get("families", []):
+            merged = families.get(family["name"])
+            if merged is None:
+                merged = families[family["name"]] = {
+                    key: value for key, value in family.items() if key != "samples"
+                }
+                merged["samples"] = {}
+            elif merged["type"] != family["type"] or merged.get("buckets") != family.get("buckets"):
+                # Bucket layouts cannot be added together; keep the first layout seen
+                continue
+
+            samples = merged["samples"]
+            for sample in family["samples"]:
+                key = tuple(sample["labels"])
+                current = samples.get(key)
+                if current is None or family["type"] == "gauge":
+                    samples[key] = dict(sample)
+                elif family["type"] == "counter":
+                    current["value"] += sample["value"]
+                else:
+                    current["counts"] = [a + b for a, b in zip(current["counts"], sample["counts"])]
+                    current["sum"] += sample["sum"]
+                    current["count"] += sample["count"]
+
+    result = []
+    for name in sorted(families):
+        family = families[name]
+        family["samples"] = [
+            dict(sample, labels=list(labels)) for labels, sample in sorted(family["samples"].items())
+        ]
+        result.append(family)
+    return result
+
+def render_families(families: List[Dict[str, Any]]) -> str:
+    """OpenMetrics text exposition, terminated by # EOF"""
+    lines = []
+    for family in families:
+        name = family["name"]
+        lines.append(f"# TYPE {name} {family['type']}")
+        if family.get("unit"):
+            lines.append(f"# UNIT {name} {family['unit']}")
+        if family.get("help"):
+            lines.append(f"# HELP {name} {_escape(family['help'])}")
+
+        labelnames = family.get("labelnames", [])
+        for sample in family["samples"]:
+            labels = list(zip(labelnames, sample["labels"]))
+            if family["type"] == "counter":
+                lines.append(f"{name}_total{_labels(labels)} {_number(sample['value'])}")
+            elif family["type"] == "gauge":
+                lines.append(f"{name}{_labels(labels)} {_number(sample['value'])}")
+            else:
+                cumulative = 0
+                bounds = [repr(float(bound)) for bound in family["buckets"]] + ["+Inf"]
+                for bound, count in zip(bounds, sample["counts"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_count{_labels(labels)} {sample['count']}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(sample['sum'])}")
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
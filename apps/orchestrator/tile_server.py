@@ -0,0 +1,332 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import asyncpg
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# The tile layer SQL lives with the workers' MBTiles exporter so both render identical tiles
+TILE_SQL_PATH = os.getenv(
+    "TILE_SQL_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "workers", "src", "exports", "scenario_tile.sql")
+)
+
+with open(TILE_SQL_PATH) as f:
+    # asyncpg takes positional parameters; the extent and buffer are fixed for served tiles
+    TILE_LAYERS_SQL = f.read() % {"scenario_id": "$1", "extent": 4096, "buffer": 64}
+
+TILE_QUERY = f"""
+SELECT {TILE_LAYERS_SQL}
+FROM (SELECT ST_TileEnvelope($2, $3, $4) as envelope) t
+"""
+
+REVISION_QUERY = """
+SELECT p.parcel_count, p.parcels_updated_at, l.link_count, l.links_updated_at
+FROM scenarios s
+LEFT JOIN LATERAL (
+    SELECT COUNT(*) as parcel_count, MAX(updated_at) as parcels_updated_at
+    FROM parcels
+    WHERE scenario_id = s.id AND status = 'active'
+) p ON TRUE
+LEFT JOIN LATERAL (
+    SELECT COUNT(*) as link_count, MAX(updated_at) as links_updated_at
+    FROM links
+    WHERE scenario_id = s.id AND status = 'active'
+) l ON TRUE
+WHERE s.id = $1
+"""
+
+class TileMetrics:
+    """Request counts, cache hit rates and a sliding window of tile latencies"""
+
+    def __init__(self, window: int = 2048):
+        self.counts = {
+            'requests': 0, 'memory_hits': 0, 'disk_hits': 0, 'coalesced': 0, 'renders': 0, 'not_modified': 0
+        }
+        self.latencies_ms = deque(maxlen=window)
+
+    def record(self, source: str, latency_ms: float):
+        self.counts['requests'] += 1
+        if source == 'memory':
+            self.counts['memory_hits'] += 1
+        elif source == 'disk':
+            self.counts['disk_hits'] += 1
+        elif source == 'coalesced':
+            self.counts['coalesced'] += 1
+        else:
+            self.counts['renders'] += 1
+        self.latencies_ms.append(latency_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        requests = self.counts['requests']
+        served_from_cache = self.counts['memory_hits'] + self.counts['disk_hits'] + self.counts['coalesced']
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+        return {
+            **self.counts,
+            'hit_rate': served_from_cache / requests if requests else None,
+            'memory_hit_rate': self.counts['memory_hits'] / requests if requests else None,
+            'latency_ms': {'p50': percentile(0.5), 'p95': percentile(0.95), 'p99': percentile(0.99)}
+        }
+
+    def families(self) -> List[Dict[str, Any]]:
+        """Tile counters in the metric family format rendered by the /metrics endpoint"""
+        sources = {'memory': 'memory_hits', 'disk': 'disk_hits', 'coalesced': 'coalesced', 'render': 'renders'}
+        return [
+            {
+                'name': 'urban_planner_tile_requests', 'type': 'counter', 'help': 'Tile requests by serving source',
+                'labelnames': ['source'],
+                'samples': [{'labels': [source], 'value': self.counts[key]} for source, key in sources.items()]
+            },
+            {
+                'name': 'urban_planner_tile_not_modified', 'type': 'counter', 'help': 'Tile requests answered with 304',
+                'labelnames': [], 'samples': [{'labels': [], 'value': self.counts['not_modified']}]
+            }
+        ]
+
+class TileServer:
+    """On-demand vector tiles with an in-process LRU and a bounded disk cache keyed by scenario revision"""
+
+    def __init__(self):
+        self.dsn = os.getenv(
+            "DATABASE_URL",
+            "postgresql://{user}:{password}@{host}:{port}/{database}".format(
+                user=os.getenv("POSTGRES_USER", "planner"),
+                password=os.getenv("POSTGRES_PASSWORD", "dev_password"),
+                host=os.getenv("POSTGRES_HOST", "localhost"),
+                port=os.getenv("POSTGRES_PORT", "5432"),
+                database=os.getenv("POSTGRES_DB", "urban_planner")
+            )
+        )
+        self.cache_dir = os.getenv("TILE_CACHE_DIR", "/tmp/urban-planner-tiles")
+        self.memory_limit_bytes = int(os.getenv("TILE_CACHE_MEMORY_BYTES", 128 * 1024 * 1024))
+        self.disk_limit_bytes = int(os.getenv("TILE_CACHE_DISK_BYTES", 2 * 1024 ** 3))
+        self.revision_ttl = float(os.getenv("TILE_REVISION_TTL_SECONDS", 2))
+        self.max_age = int(os.getenv("TILE_CACHE_MAX_AGE", 60))
+        self.revision_cache_size = int(os.getenv("TILE_REVISION_CACHE_SIZE", 4096))
+
+        self.pool = None
+        self.pool_lock = asyncio.Lock()
+        self.memory_cache = OrderedDict()
+        self.memory_bytes = 0
+        # Measured by the first put, since other processes may share the cache directory
+        self.disk_bytes = None
+        self.disk_lock = threading.Lock()
+        self.revisions = OrderedDict()
+        self.in_flight = {}
+        self.metrics = TileMetrics()
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def get_etag(self, scenario_id: str, z: int, x: int, y: int) -> Optional[Tuple[str, str]]:
+        """Return (revision, etag) for a tile without loading it, or None when the scenario does not exist"""
+        revision = await self._get_revision(scenario_id)
+        if revision is None:
+            return None
+        return revision, '"' + hashlib.md5(f"{revision}/{z}/{x}/{y}".encode()).hexdigest() + '"'
+
+    async def get_tile(self, scenario_id: str, revision: str, z: int, x: int, y: int) -> Tuple[bytes, str]:
+        """Return (tile, cache source) for a tile of the revision resolved by get_etag"""
+        start_time = time.perf_counter()
+
+        key = (scenario_id, revision, z, x, y)
+        tile = self._memory_get(key)
+        source = 'memory'
+        if tile is None:
+            tile, source = await self._load_or_render(key)
+
+        self.metrics.record(source, (time.perf_counter() - start_time) * 1000)
+        return tile, source
+
+    def cache_control(self) -> str:
+        # Tile URLs are not versioned, so browsers revalidate with the ETag once max-age passes
+        return f"public, max-age={self.max_age}, stale-while-revalidate={self.max_age * 5}"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.metrics.snapshot(),
+            'memory_tiles': len(self.memory_cache),
+            'memory_bytes': self.memory_bytes,
+            'disk_bytes': self.disk_bytes,
+            'in_flight_renders': len(self.in_flight)
+        }
+
+    async def _get_pool(self):
+        async with self.pool_lock:
+            if self.pool is None:
+                self.pool = await asyncpg.create_pool(
+                    self.dsn,
+                    min_size=1,
+                    max_size=int(os.getenv("TILE_DB_POOL_SIZE", 10))
+                )
+        return self.pool
+
+    async def _get_revision(self, scenario_id: str) -> Optional[str]:
+        """Scenario revision, re-checked at most every revision_ttl seconds per scenario"""
+        cached = self.revisions.get(scenario_id)
+        if cached and time.monotonic() - cached[1] < self.revision_ttl:
+            self.revisions.move_to_end(scenario_id)
+            return cached[0]
+
+        pool = await self._get_pool()
+        row = await pool.fetchrow(REVISION_QUERY, scenario_id)
+        if row is None:
+            return None
+
+        revision = hashlib.md5(
+            f"{row['parcel_count']}:{row['parcels_updated_at']}:{row['link_count']}:{row['links_updated_at']}".encode()
+        ).hexdigest()[:16]
+        if not cached or cached[0] != revision:
+            # Tiles of other revisions can never be served again, including ones left by an earlier process
+            await asyncio.to_thread(self._disk_prune_revisions, scenario_id, revision)
+
+        self.revisions[scenario_id] = (revision, time.monotonic())
+        self.revisions.move_to_end(scenario_id)
+        while len(self.revisions) > self.revision_cache_size:
+            self.revisions.popitem(last=False)
+        return revision
+
+    async def _load_or_render(self, key: Tuple) -> Tuple[bytes, str]:
+        # Concurrent viewers asking for the same cold tile share one load
+        pending = self.in_flight.get(key)
+        if pending is not None:
+            tile, _ = await asyncio.shield(pending)
+            return tile, 'coalesced'
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            tile = await asyncio.to_thread(self._disk_get, key)
+            source = 'disk'
+            if tile is None:
+                tile = await self._render(key)
+                source = 'render'
+                await asyncio.to_thread(self._disk_put, key, tile)
+
+            self._memory_put(key, tile)
+            future.set_result((tile, source))
+            return tile, source
+
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+
+        finally:
+            del self.in_flight[key]
+
+    async def _render(self, key: Tuple) -> bytes:
+        scenario_id, _, z, x, y = key
+        pool = await self._get_pool()
+        tile = await pool.fetchval(TILE_QUERY, scenario_id, z, x, y)
+        return bytes(tile or b'')
+
+    def _memory_get(self, key: Tuple) -> Optional[bytes]:
+        tile = self.memory_cache.get(key)
+        if tile is not None:
+            self.memory_cache.move_to_end(key)
+        return tile
+
+    def _memory_put(self, key: Tuple, tile: bytes):
+        if key in self.memory_cache:
+            return
+        self.memory_cache[key] = tile
+        self.memory_bytes += len(tile) + 1
+
+        while self.memory_bytes > self.memory_limit_bytes and self.memory_cache:
+            _, evicted = self.memory_cache.popitem(last=False)
+            self.memory_bytes -= len(evicted) + 1
+
+    def _disk_path(self, key: Tuple) -> str:
+        scenario_id, revision, z, x, y = key
+        return os.path.join(self.cache_dir, str(scenario_id), revision, str(z), str(x), f"{y}.pbf")
+
+    def _disk_get(self, key: Tuple) -> Optional[bytes]:
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                tile = f.read()
+            # The mtime doubles as the last-used time for the disk sweep
+            os.utime(path)
+            return tile
+        except FileNotFoundError:
+            return None
+
+    def _disk_put(self, key: Tuple, tile: bytes):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(tile)
+        os.replace(temp_path, path)
+
+        with self.disk_lock:
+            if self.disk_bytes is None:
+                self.disk_bytes = sum(size for _, size, _ in self._disk_files())
+            else:
+                self.disk_bytes += len(tile)
+            if self.disk_bytes > self.disk_limit_bytes:
+                self._disk_sweep()
+
+    def _disk_files(self) -> List[Tuple[float, int, str]]:
+        """List (mtime, size, path) for every cached tile"""
+        files = []
+        for root, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _disk_sweep(self):
+        """Delete least recently used tiles until the disk cache is back under 90% of its limit"""
+        files = sorted(self._disk_files())
+        total = sum(size for _, size, _ in files)
+        target = self.disk_limit_bytes * 0.9
+
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.disk_bytes = total
+
+        # Bottom-up, so directories emptied by the sweep are removed with their parents
+        for root, _, _ in os.walk(self.cache_dir, topdown=False):
+            if root != self.cache_dir:
+                try:
+                    os.rmdir(root)
+                except OSError:
+                    pass
+
+    def _disk_prune_revisions(self, scenario_id: str, revision: str):
+        scenario_dir = os.path.join(self.cache_dir, str(scenario_id))
+        try:
+            entries = os.listdir(scenario_dir)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry != revision:
+                shutil.rmtree(os.path.join(scenario_dir, entry), True)
@@ -1,9 +1,10 @@
 # Created automatically by Cursor AI (2025-08-25)
 import json
 import logging
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, BinaryIO, Iterator, Tuple
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.extensions import ISOLATION_LEVEL_REPEATABLE_READ
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
@@ -11,20 +12,78 @@ import base64
 import zipfile
 from io import BytesIO
 import geopandas as gpd
+import shapely
 from shapely.geometry import shape
-import pandas as pd
+import fiona
+import pyarrow as pa
+import pyarrow.parquet as pq
 import numpy as np
 from urllib.parse import urlparse, parse_qs
 import hashlib
 import hmac
 import time
 import uuid
+import tempfile
+import csv
+import io
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from exports.export_cache import ExportCache
+from exports.vector_tiles import VectorTileExporter
+from monitoring.instrumentation import instrumented, annotate
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ScenarioRowStream:
+    """Re-iterable scenario rows fetched in itersize chunks through a named server-side cursor
+    
+    Streams share the REPEATABLE READ connection they were created on, so every pass and
+    the property key query see the same snapshot of the scenario.
+    """
+    
+    def __init__(self, conn, name: str, query: str, params: tuple, count: int, itersize: int = 2000):
+        self.conn = conn
+        self.name = name
+        self.query = query
+        self.params = params
+        self.count = int(count or 0)
+        self.itersize = itersize
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # Each pass opens its own cursor so several writers can consume the same stream
+        cursor = self.conn.cursor(name=f"{self.name}_{uuid.uuid4().hex[:8]}", cursor_factory=RealDictCursor)
+        cursor.itersize = self.itersize
+        
+        try:
+            cursor.execute(self.query, self.params)
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+
+    def property_keys(self) -> List[str]:
+        """Distinct properties keys across the stream, resolved in the database"""
+        cursor = self.conn.cursor(cursor_factory=RealDictCursor)
+        
+        try:
+            cursor.execute(f"""
+            SELECT DISTINCT jsonb_object_keys(rows.properties) as key
+            FROM ({self.query}) rows
+            WHERE jsonb_typeof(rows.properties) = 'object'
+            ORDER BY key
+            """, self.params)
+            return [row['key'] for row in cursor.fetchall()]
+            
+        finally:
+            cursor.close()
+
 class DataExporter:
     def __init__(self):
         self.db_config = {
@@ -44,6 +103,24 @@ class DataExporter:
             'secure': os.getenv('MINIO_SECURE', 'false').lower() == 'true'
         }
         
+        # Streaming export configuration
+        self.stream_config = {
+            'chunked_fetch': os.getenv('EXPORT_CHUNKED_FETCH', 'true').lower() == 'true',
+            'itersize': int(os.getenv('EXPORT_ITERSIZE', 2000)),  # Rows per server-side cursor round trip
+            'spool_max_bytes': int(os.getenv('EXPORT_SPOOL_MAX_BYTES', 16 * 1024 * 1024)),  # In-memory before spilling to disk
+            'format_workers': int(os.getenv('EXPORT_FORMAT_WORKERS', 4)),  # Concurrent writers for multi-format bundles
+            'row_group_rows': int(os.getenv('EXPORT_PARQUET_ROW_GROUP_ROWS', 50000)),  # Rows per GeoParquet row group
+            'copy_chunk_bytes': 1024 * 1024
+        }
+        
+        # PostGIS vector tile pyramids
+        self.vector_tiles = VectorTileExporter()
+        
+        # Content-addressed cache of generated files, keyed by scenario revision
+        self.export_cache = None
+        if os.getenv('EXPORT_CACHE_ENABLED', 'true').lower() == 'true':
+            self.export_cache = ExportCache()
+        
         # Export formats and their configurations
         self.export_formats = {
             'geojson': {
@@ -76,6 +153,24 @@ class DataExporter:
                 'extensions': ['.csv'],
                 'mime_type': 'text/csv'
             },
+            'geoparquet': {
+                'name': 'GeoParquet',
+                'description': 'Columnar compressed GeoParquet for analytics pipelines',
+                'extensions': ['.parquet'],
+                'mime_type': 'application/vnd.apache.parquet'
+            },
+            'flatgeobuf': {
+                'name': 'FlatGeobuf',
+                'description': 'Streamable FlatGeobuf with a packed spatial index',
+                'extensions': ['.fgb'],
+                'mime_type': 'application/vnd.flatgeobuf'
+            },
+            'mbtiles': {
+                'name': 'MBTiles',
+                'description': 'Mapbox Vector Tile pyramid of parcels and links',
+                'extensions': ['.mbtiles'],
+                'mime_type': 'application/vnd.mapbox-vector-tile'
+            },
             'zip': {
                 'name': 'ZIP Archive',
                 'description': 'Compressed archive with multiple formats',
@@ -84,46 +179,65 @@ class DataExporter:
             }
         }
 
+    @instrumented('exports')
     def export_scenario_data(self, scenario_id: str, export_format: str = 'geojson', 
-                           include_analysis: bool = True, include_metadata: bool = True) -> Dict[str, Any]:
+                           include_analysis: bool = True, include_metadata: bool = True,
+                           theme: Optional[str] = None) -> Dict[str, Any]:
         """Export scenario data in specified format"""
         try:
             # Validate export format
             if export_format not in self.export_formats:
                 return {'success': False, 'error': f'Unsupported export format: {export_format}'}
             
+            # Serve unchanged scenarios from the export cache
+            cache_key = self._export_cache_key(scenario_id, export_format, include_analysis, include_metadata, theme)
+            if cache_key:
+                cached = self.export_cache.get(cache_key)
+                if cached:
+                    return self._cached_export_result(cache_key, cached, scenario_id)
+            
+            # GeoJSON is streamed straight from server-side cursors
+            if export_format == 'geojson':
+                return self._export_geojson_streamed(scenario_id, include_metadata, cache_key)
+            
+            # Vector tiles are rendered in PostGIS rather than from fetched rows
+            if export_format == 'mbtiles':
+                return self._export_mbtiles(scenario_id, cache_key)
+            
             # Get scenario data
             scenario_data = self._get_scenario_data(scenario_id, include_analysis)
             if not scenario_data:
                 return {'success': False, 'error': 'No scenario data found'}
             
             # Generate export
-            export_result = self._generate_export(scenario_data, export_format, include_metadata)
+            try:
+                export_result = self._generate_export(scenario_data, export_format, include_metadata)
+            finally:
+                self._release_scenario_data(scenario_data)
             if not export_result['success']:
                 return export_result
             
-            # Store file and generate signed URL
-            file_url = self._store_export_file(export_result['data'], export_format, scenario_id)
-            if not file_url:
-                return {'success': False, 'error': 'Failed to store export file'}
-            
-            return {
-                'success': True,
-                'message': f'Exported scenario data in {self.export_formats[export_format]["name"]} format',
-                'data': {
-                    'export_format': export_format,
-                    'format_name': self.export_formats[export_format]['name'],
-                    'file_url': file_url,
-                    'file_size': len(export_result['data']),
-                    'expires_at': (datetime.now() + timedelta(hours=24)).isoformat(),
-                    'exported_at': datetime.now().isoformat()
-                }
-            }
+            with self._export_file(export_result['data']) as file_data:
+                return self._finish_export(file_data, export_format, scenario_id, cache_key)
             
         except Exception as e:
             logger.error(f"Error exporting scenario data: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    def export_geojson_stream(self, scenario_id: str, output: BinaryIO, include_metadata: bool = True) -> Dict[str, Any]:
+        """Stream a compact GeoJSON FeatureCollection for a scenario into a binary file or upload stream"""
+        scenario_data = self._get_scenario_data(scenario_id, include_analysis=False, chunked=True)
+        if not scenario_data:
+            return {'success': False, 'error': 'No scenario data found'}
+        
+        try:
+            stats = self._write_geojson(
+                scenario_data['scenario'], scenario_data['parcels'], scenario_data['links'], output, include_metadata
+            )
+        finally:
+            self._release_scenario_data(scenario_data)
+        return {'success': True, 'data': stats}
+
     def export_multiple_formats(self, scenario_id: str, formats: List[str] = None, 
                               include_analysis: bool = True) -> Dict[str, Any]:
         """Export scenario data in multiple formats as a ZIP archive"""
@@ -136,16 +250,20 @@ class DataExporter:
                 if fmt not in self.export_formats:
                     return {'success': False, 'error': f'Unsupported export format: {fmt}'}
             
-            # Get scenario data
-            scenario_data = self._get_scenario_data(scenario_id, include_analysis)
+            # Fetch one snapshot that every format writer shares
+            scenario_data = self._get_scenario_data(scenario_id, include_analysis, chunked=False)
             if not scenario_data:
                 return {'success': False, 'error': 'No scenario data found'}
             
-            # Create ZIP archive with multiple formats
-            zip_data = self._create_multi_format_zip(scenario_data, formats)
+            with tempfile.SpooledTemporaryFile(max_size=self.stream_config['spool_max_bytes']) as archive:
+                # Create ZIP archive with multiple formats
+                self._create_multi_format_zip(scenario_data, formats, archive)
+                file_size = archive.tell()
+                archive.seek(0)
+                
+                # Store file and generate signed URL
+                file_url = self._store_export_file(archive, 'zip', scenario_id, 'multi_format')
             
-            # Store file and generate signed URL
-            file_url = self._store_export_file(zip_data, 'zip', scenario_id, 'multi_format')
             if not file_url:
                 return {'success': False, 'error': 'Failed to store export file'}
             
@@ -156,7 +274,7 @@ class DataExporter:
                     'export_formats': formats,
                     'format_names': [self.export_formats[fmt]['name'] for fmt in formats],
                     'file_url': file_url,
-                    'file_size': len(zip_data),
+                    'file_size': file_size,
                     'expires_at': (datetime.now() + timedelta(hours=24)).isoformat(),
                     'exported_at': datetime.now().isoformat()
                 }
@@ -166,17 +284,30 @@ class DataExporter:
             logger.error(f"Error exporting multiple formats: {str(e)}")
             return {'success': False, 'error': str(e)}
 
-    def _get_scenario_data(self, scenario_id: str, include_analysis: bool = True) -> Optional[Dict[str, Any]]:
-        """Get comprehensive scenario data for export"""
+    @instrumented('exports', 'db_fetch')
+    def _get_scenario_data(self, scenario_id: str, include_analysis: bool = True, chunked: Optional[bool] = None,
+                           itersize: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Get comprehensive scenario data for export, as server-side row streams when chunked
+        
+        Chunked results hold their connection open in a REPEATABLE READ transaction until
+        _release_scenario_data, so every pass over the streams reads the same snapshot.
+        """
+        if chunked is None:
+            chunked = self.stream_config['chunked_fetch']
+        
         conn = psycopg2.connect(**self.db_config)
+        if chunked:
+            conn.set_session(isolation_level=ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
         cursor = conn.cursor(cursor_factory=RealDictCursor)
+        keep_open = False
         
         try:
             # Get scenario
             query = """
             SELECT s.*, 
                    COUNT(p.id) as parcel_count,
-                   SUM(ST_Area(p.geometry)) as total_area
+                   SUM(ST_Area(p.geometry)) as total_area,
+                   (SELECT COUNT(*) FROM links l WHERE l.scenario_id = s.id AND l.status = 'active') as link_count
             FROM scenarios s
             LEFT JOIN parcels p ON s.id = p.scenario_id AND p.status = 'active'
             WHERE s.id = %s
@@ -188,40 +319,261 @@ class DataExporter:
             if not scenario:
                 return None
             
-            # Get parcels
-            query = """
+            parcels_query = """
             SELECT id, ST_AsGeoJSON(geometry) as geometry, properties, capacity, utilities
             FROM parcels
             WHERE scenario_id = %s AND status = 'active'
             """
-            cursor.execute(query, (scenario_id,))
-            parcels = cursor.fetchall()
-            
-            # Get links
-            query = """
+            links_query = """
             SELECT id, ST_AsGeoJSON(geometry) as geometry, properties, link_class
             FROM links
             WHERE scenario_id = %s AND status = 'active'
             """
-            cursor.execute(query, (scenario_id,))
-            links = cursor.fetchall()
+            
+            if chunked:
+                # Rows are pulled lazily by whichever writer iterates them
+                itersize = itersize or self.stream_config['itersize']
+                parcels = ScenarioRowStream(
+                    conn, 'export_parcels', parcels_query, (scenario_id,), scenario['parcel_count'], itersize
+                )
+                links = ScenarioRowStream(
+                    conn, 'export_links', links_query, (scenario_id,), scenario['link_count'], itersize
+                )
+            else:
+                cursor.execute(parcels_query, (scenario_id,))
+                parcels = cursor.fetchall()
+                
+                cursor.execute(links_query, (scenario_id,))
+                links = cursor.fetchall()
+            
+            # Row streams know their size up front, so this does not consume them
+            annotate(rows=1 + len(parcels) + len(links))
             
             # Get analysis data if requested
             analysis_data = {}
             if include_analysis:
                 analysis_data = scenario.get('kpis', {})
             
+            keep_open = chunked
             return {
                 'scenario': scenario,
                 'parcels': parcels,
                 'links': links,
-                'analysis': analysis_data
+                'analysis': analysis_data,
+                'connection': conn if chunked else None
             }
             
         finally:
             cursor.close()
+            if not keep_open:
+                conn.close()
+
+    def _release_scenario_data(self, scenario_data: Dict[str, Any]):
+        """Close the snapshot connection behind chunked row streams"""
+        conn = scenario_data.get('connection')
+        if conn is not None:
             conn.close()
 
+    def _write_geojson(self, scenario: Dict[str, Any], parcels, links, output: BinaryIO, 
+                       include_metadata: bool = True) -> Dict[str, Any]:
+        """Write features incrementally, splicing the database GeoJSON geometry text in unparsed"""
+        dumps = lambda value: json.dumps(value, separators=(',', ':'), default=str)
+        parcel_count = 0
+        link_count = 0
+        bytes_written = 0
+        
+        def write(text: str):
+            nonlocal bytes_written
+            data = text.encode('utf-8')
+            output.write(data)
+            bytes_written += len(data)
+        
+        write('{"type":"FeatureCollection","features":[')
+        separator = ''
+        
+        for parcel in parcels:
+            properties = {'id': parcel['id'], 'type': 'parcel', **(parcel['properties'] or {})}
+            if parcel['capacity']:
+                properties['capacity'] = parcel['capacity']
+            if parcel['utilities']:
+                properties['utilities'] = parcel['utilities']
+            
+            write(f'{separator}{{"type":"Feature","geometry":{parcel["geometry"]},"properties":{dumps(properties)}}}')
+            separator = ','
+            parcel_count += 1
+        
+        for link in links:
+            properties = {'id': link['id'], 'type': 'link', 'link_class': link['link_class'], **(link['properties'] or {})}
+            
+            write(f'{separator}{{"type":"Feature","geometry":{link["geometry"]},"properties":{dumps(properties)}}}')
+            separator = ','
+            link_count += 1
+        
+        write(']')
+        
+        # Counts are only known once every feature has been written
+        if include_metadata:
+            metadata = {
+                'scenario_id': scenario['id'],
+                'scenario_name': scenario['name'],
+                'exported_at': datetime.now().isoformat(),
+                'feature_count': parcel_count + link_count,
+                'parcel_count': parcel_count,
+                'link_count': link_count
+            }
+            write(f',"metadata":{dumps(metadata)}')
+        
+        write('}')
+        
+        return {
+            'feature_count': parcel_count + link_count,
+            'parcel_count': parcel_count,
+            'link_count': link_count,
+            'bytes_written': bytes_written
+        }
+
+    def _export_geojson_streamed(self, scenario_id: str, include_metadata: bool = True,
+                                 cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """Stream GeoJSON into a spooled temp file and store it without materializing the document"""
+        with tempfile.SpooledTemporaryFile(max_size=self.stream_config['spool_max_bytes']) as spool:
+            stream_result = self.export_geojson_stream(scenario_id, spool, include_metadata)
+            if not stream_result['success']:
+                return stream_result
+            
+            result = self._finish_export(spool, 'geojson', scenario_id, cache_key)
+            if result['success']:
+                result['data']['feature_count'] = stream_result['data']['feature_count']
+            return result
+
+    def _export_mbtiles(self, scenario_id: str, cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """Build the scenario tile pyramid into a temporary MBTiles file and store it"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, f'scenario_{scenario_id}.mbtiles')
+            tile_result = self.vector_tiles.export_mbtiles(scenario_id, path)
+            if not tile_result['success']:
+                return tile_result
+            
+            with open(path, 'rb') as mbtiles:
+                result = self._finish_export(mbtiles, 'mbtiles', scenario_id, cache_key)
+            
+            if result['success']:
+                result['data']['tile_count'] = tile_result['data']['tile_count']
+                result['data']['zoom_levels'] = tile_result['data']['zoom_levels']
+            return result
+
+    def _finish_export(self, file_data: BinaryIO, export_format: str, scenario_id: str,
+                       cache_key: Optional[str] = None) -> Dict[str, Any]:
+        """Store a generated export file, record it in the cache and build the response"""
+        file_data.seek(0, os.SEEK_END)
+        file_size = file_data.tell()
+        file_data.seek(0)
+        
+        # Store file and generate signed URL
+        file_url = self._store_export_file(file_data, export_format, scenario_id)
+        if not file_url:
+            return {'success': False, 'error': 'Failed to store export file'}
+        
+        exported_at = datetime.now()
+        expires_at = exported_at + timedelta(hours=24)
+        
+        if cache_key:
+            try:
+                file_data.seek(0)
+                self.export_cache.put(cache_key, file_data, {
+                    'export_format': export_format,
+                    'file_url': file_url,
+                    'expires_at': expires_at.isoformat(),
+                    'exported_at': exported_at.isoformat()
+                })
+            except Exception as e:
+                logger.warning(f"Failed to cache export for scenario {scenario_id}: {str(e)}")
+        
+        return {
+            'success': True,
+            'message': f'Exported scenario data in {self.export_formats[export_format]["name"]} format',
+            'data': {
+                'export_format': export_format,
+                'format_name': self.export_formats[export_format]['name'],
+                'file_url': file_url,
+                'file_size': file_size,
+                'expires_at': expires_at.isoformat(),
+                'exported_at': exported_at.isoformat(),
+                'cached': False
+            }
+        }
+
+    def _export_cache_key(self, scenario_id: str, export_format: str, include_analysis: bool,
+                          include_metadata: bool, theme: Optional[str] = None) -> Optional[str]:
+        """Cache key for an export request, or None when caching is unavailable"""
+        if not self.export_cache:
+            return None
+        
+        revision = self._get_export_revision(scenario_id)
+        if not revision:
+            return None
+        return self.export_cache.make_key(revision, export_format, include_analysis, include_metadata, theme)
+
+    def _get_export_revision(self, scenario_id: str) -> Optional[str]:
+        """Get a cheap revision token covering every row an export reads"""
+        conn = psycopg2.connect(**self.db_config)
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        
+        try:
+            query = """
+            SELECT md5(COALESCE(s.name, '') || COALESCE(s.kpis, '{}'::jsonb)::text) as scenario_hash,
+                   p.parcel_count, p.parcels_updated_at,
+                   l.link_count, l.links_updated_at
+            FROM scenarios s
+            LEFT JOIN LATERAL (
+                SELECT COUNT(*) as parcel_count, MAX(updated_at) as parcels_updated_at
+                FROM parcels
+                WHERE scenario_id = s.id AND status = 'active'
+            ) p ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT COUNT(*) as link_count, MAX(updated_at) as links_updated_at
+                FROM links
+                WHERE scenario_id = s.id AND status = 'active'
+            ) l ON TRUE
+            WHERE s.id = %s
+            """
+            cursor.execute(query, (scenario_id,))
+            row = cursor.fetchone()
+            
+            if not row:
+                return None
+            return (f"{scenario_id}:{row['scenario_hash']}:{row['parcel_count']}:{row['parcels_updated_at']}:"
+                    f"{row['link_count']}:{row['links_updated_at']}")
+            
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _cached_export_result(self, cache_key: str, entry: Dict[str, Any], scenario_id: str) -> Dict[str, Any]:
+        """Build the export response for a cache hit, re-signing the URL if it has expired"""
+        if datetime.fromisoformat(entry['expires_at']) <= datetime.now():
+            with self.export_cache.open_blob(entry['digest']) as blob:
+                file_url = self._store_export_file(blob, entry['export_format'], scenario_id)
+            if not file_url:
+                return {'success': False, 'error': 'Failed to store export file'}
+            
+            entry = dict(entry, file_url=file_url, expires_at=(datetime.now() + timedelta(hours=24)).isoformat())
+            self.export_cache.update(cache_key, entry)
+        
+        export_format = entry['export_format']
+        return {
+            'success': True,
+            'message': f'Exported scenario data in {self.export_formats[export_format]["name"]} format',
+            'data': {
+                'export_format': export_format,
+                'format_name': self.export_formats[export_format]['name'],
+                'file_url': entry['file_url'],
+                'file_size': entry['size'],
+                'expires_at': entry['expires_at'],
+                'exported_at': entry['exported_at'],
+                'cached': True
+            }
+        }
+
     def _generate_export(self, scenario_data: Dict[str, Any], export_format: str, 
                         include_metadata: bool = True) -> Dict[str, Any]:
         """Generate export in specified format"""
@@ -236,6 +588,10 @@ class DataExporter:
                 return self._export_dxf(scenario_data, include_metadata)
             elif export_format == 'csv':
                 return self._export_csv(scenario_data, include_metadata)
+            elif export_format == 'geoparquet':
+                return self._export_geoparquet(scenario_data, include_metadata)
+            elif export_format == 'flatgeobuf':
+                return self._export_flatgeobuf(scenario_data, include_metadata)
             else:
                 return {'success': False, 'error': f'Export format {export_format} not implemented'}
                 
@@ -243,163 +599,118 @@ class DataExporter:
             logger.error(f"Error generating {export_format} export: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    def _spool(self) -> BinaryIO:
+        """Temporary output file kept in memory up to spool_max_bytes"""
+        return tempfile.SpooledTemporaryFile(max_size=self.stream_config['spool_max_bytes'])
+
+    def _export_file(self, data: Union[bytes, BinaryIO]) -> BinaryIO:
+        """Rewound file object for writer output, which is a spooled file or bytes"""
+        if isinstance(data, bytes):
+            return BytesIO(data)
+        data.seek(0)
+        return data
+
     def _export_geojson(self, scenario_data: Dict[str, Any], include_metadata: bool = True) -> Dict[str, Any]:
         """Export data as GeoJSON"""
+        spool = self._spool()
         try:
-            # Create FeatureCollection
-            features = []
-            
-            # Add parcels
-            for parcel in scenario_data['parcels']:
-                feature = {
-                    'type': 'Feature',
-                    'geometry': json.loads(parcel['geometry']),
-                    'properties': {
-                        'id': parcel['id'],
-                        'type': 'parcel',
-                        **parcel['properties']
-                    }
-                }
-                
-                # Add capacity data
-                if parcel['capacity']:
-                    feature['properties']['capacity'] = parcel['capacity']
-                
-                # Add utilities data
-                if parcel['utilities']:
-                    feature['properties']['utilities'] = parcel['utilities']
-                
-                features.append(feature)
-            
-            # Add links
-            for link in scenario_data['links']:
-                feature = {
-                    'type': 'Feature',
-                    'geometry': json.loads(link['geometry']),
-                    'properties': {
-                        'id': link['id'],
-                        'type': 'link',
-                        'link_class': link['link_class'],
-                        **link['properties']
-                    }
-                }
-                features.append(feature)
-            
-            # Create GeoJSON structure
-            geojson = {
-                'type': 'FeatureCollection',
-                'features': features
-            }
-            
-            # Add metadata if requested
-            if include_metadata:
-                geojson['metadata'] = {
-                    'scenario_id': scenario_data['scenario']['id'],
-                    'scenario_name': scenario_data['scenario']['name'],
-                    'exported_at': datetime.now().isoformat(),
-                    'feature_count': len(features),
-                    'parcel_count': len(scenario_data['parcels']),
-                    'link_count': len(scenario_data['links'])
-                }
+            self._write_geojson(
+                scenario_data['scenario'], scenario_data['parcels'], scenario_data['links'],
+                spool, include_metadata
+            )
             
             return {
                 'success': True,
-                'data': json.dumps(geojson, indent=2).encode('utf-8')
+                'data': spool
             }
             
         except Exception as e:
+            spool.close()
             return {'success': False, 'error': str(e)}
 
     def _export_shapefile(self, scenario_data: Dict[str, Any], include_metadata: bool = True) -> Dict[str, Any]:
-        """Export data as Shapefile"""
+        """Export data as a ZIP of Shapefile components, deflated once into a spooled file"""
+        spool = self._spool()
         try:
-            # Create GeoDataFrames
-            parcel_features = []
-            for parcel in scenario_data['parcels']:
-                geometry = shape(json.loads(parcel['geometry']))
-                properties = {
-                    'id': parcel['id'],
-                    'type': 'parcel',
-                    **parcel['properties']
-                }
-                
-                if parcel['capacity']:
-                    properties['capacity'] = json.dumps(parcel['capacity'])
-                
-                if parcel['utilities']:
-                    properties['utilities'] = json.dumps(parcel['utilities'])
-                
-                parcel_features.append({
-                    'geometry': geometry,
-                    **properties
-                })
-            
-            link_features = []
-            for link in scenario_data['links']:
-                geometry = shape(json.loads(link['geometry']))
-                properties = {
-                    'id': link['id'],
-                    'type': 'link',
-                    'link_class': link['link_class'],
-                    **link['properties']
-                }
-                link_features.append({
-                    'geometry': geometry,
-                    **properties
-                })
-            
-            # Create GeoDataFrames
-            parcels_gdf = gpd.GeoDataFrame(parcel_features, crs='EPSG:4326')
-            links_gdf = gpd.GeoDataFrame(link_features, crs='EPSG:4326')
+            with tempfile.TemporaryDirectory() as temp_dir:
+                members = self._write_shapefile(scenario_data, include_metadata, temp_dir)
+                with zipfile.ZipFile(spool, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                    for name in members:
+                        zip_file.write(os.path.join(temp_dir, name), name)
             
-            # Create ZIP file with shapefiles
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                # Add parcels shapefile
-                parcels_buffer = BytesIO()
-                parcels_gdf.to_file(parcels_buffer, driver='ESRI Shapefile')
-                parcels_buffer.seek(0)
-                
-                # Add all shapefile components
-                for ext in ['.shp', '.shx', '.dbf', '.prj']:
-                    try:
-                        with open(f'parcels{ext}', 'rb') as f:
-                            zip_file.writestr(f'parcels{ext}', f.read())
-                    except FileNotFoundError:
-                        pass
-                
-                # Add links shapefile
-                links_buffer = BytesIO()
-                links_gdf.to_file(links_buffer, driver='ESRI Shapefile')
-                links_buffer.seek(0)
-                
-                for ext in ['.shp', '.shx', '.dbf', '.prj']:
-                    try:
-                        with open(f'links{ext}', 'rb') as f:
-                            zip_file.writestr(f'links{ext}', f.read())
-                    except FileNotFoundError:
-                        pass
-                
-                # Add metadata if requested
-                if include_metadata:
-                    metadata = {
-                        'scenario_id': scenario_data['scenario']['id'],
-                        'scenario_name': scenario_data['scenario']['name'],
-                        'exported_at': datetime.now().isoformat(),
-                        'parcel_count': len(scenario_data['parcels']),
-                        'link_count': len(scenario_data['links'])
-                    }
-                    zip_file.writestr('metadata.json', json.dumps(metadata, indent=2))
-            
-            zip_buffer.seek(0)
             return {
                 'success': True,
-                'data': zip_buffer.getvalue()
+                'data': spool
             }
             
         except Exception as e:
+            spool.close()
             return {'success': False, 'error': str(e)}
 
+    def _write_shapefile(self, scenario_data: Dict[str, Any], include_metadata: bool, directory: str) -> List[str]:
+        """Write parcels and links Shapefile components into directory and return their file names"""
+        parcel_features = []
+        for parcel in scenario_data['parcels']:
+            geometry = shape(json.loads(parcel['geometry']))
+            properties = {
+                'id': parcel['id'],
+                'type': 'parcel',
+                **parcel['properties']
+            }
+            
+            if parcel['capacity']:
+                properties['capacity'] = json.dumps(parcel['capacity'])
+            
+            if parcel['utilities']:
+                properties['utilities'] = json.dumps(parcel['utilities'])
+            
+            parcel_features.append({
+                'geometry': geometry,
+                **properties
+            })
+        
+        link_features = []
+        for link in scenario_data['links']:
+            geometry = shape(json.loads(link['geometry']))
+            properties = {
+                'id': link['id'],
+                'type': 'link',
+                'link_class': link['link_class'],
+                **link['properties']
+            }
+            link_features.append({
+                'geometry': geometry,
+                **properties
+            })
+        
+        # Create GeoDataFrames
+        parcels_gdf = gpd.GeoDataFrame(parcel_features, crs='EPSG:4326')
+        links_gdf = gpd.GeoDataFrame(link_features, crs='EPSG:4326')
+        
+        members = []
+        for layer, gdf in (('parcels', parcels_gdf), ('links', links_gdf)):
+            if gdf.empty:
+                continue
+            gdf.to_file(os.path.join(directory, f'{layer}.shp'), driver='ESRI Shapefile')
+            for ext in ['.shp', '.shx', '.dbf', '.prj', '.cpg']:
+                if os.path.exists(os.path.join(directory, f'{layer}{ext}')):
+                    members.append(f'{layer}{ext}')
+        
+        # Add metadata if requested
+        if include_metadata:
+            metadata = {
+                'scenario_id': scenario_data['scenario']['id'],
+                'scenario_name': scenario_data['scenario']['name'],
+                'exported_at': datetime.now().isoformat(),
+                'parcel_count': len(scenario_data['parcels']),
+                'link_count': len(scenario_data['links'])
+            }
+            with open(os.path.join(directory, 'metadata.json'), 'w') as f:
+                json.dump(metadata, f, indent=2)
+            members.append('metadata.json')
+        
+        return members
+
     def _export_gpkg(self, scenario_data: Dict[str, Any], include_metadata: bool = True) -> Dict[str, Any]:
         """Export data as GeoPackage"""
         try:
@@ -459,8 +770,13 @@ class DataExporter:
     def _export_dxf(self, scenario_data: Dict[str, Any], include_metadata: bool = True) -> Dict[str, Any]:
         """Export data as DXF (simplified implementation)"""
         try:
+            dxf_buffer = BytesIO()
+            
+            def write(*codes: str):
+                dxf_buffer.write(('\n'.join(codes) + '\n').encode('utf-8'))
+            
             # Create a simple DXF structure
-            dxf_content = [
+            write(
                 '0',
                 'SECTION',
                 '2',
@@ -475,14 +791,14 @@ class DataExporter:
                 'SECTION',
                 '2',
                 'ENTITIES'
-            ]
+            )
             
             # Add parcels as POLYLINE entities
             for parcel in scenario_data['parcels']:
                 geometry = json.loads(parcel['geometry'])
                 if geometry['type'] == 'Polygon':
                     coords = geometry['coordinates'][0]
-                    dxf_content.extend([
+                    write(
                         '0',
                         'POLYLINE',
                         '8',
@@ -491,10 +807,10 @@ class DataExporter:
                         '1',
                         '70',
                         '1'
-                    ])
+                    )
                     
                     for coord in coords:
-                        dxf_content.extend([
+                        write(
                             '0',
                             'VERTEX',
                             '8',
@@ -503,12 +819,12 @@ class DataExporter:
                             str(coord[0]),
                             '20',
                             str(coord[1])
-                        ])
+                        )
                     
-                    dxf_content.extend([
+                    write(
                         '0',
                         'SEQEND'
-                    ])
+                    )
             
             # Add links as LINE entities
             for link in scenario_data['links']:
@@ -516,7 +832,7 @@ class DataExporter:
                 if geometry['type'] == 'LineString':
                     coords = geometry['coordinates']
                     if len(coords) >= 2:
-                        dxf_content.extend([
+                        write(
                             '0',
                             'LINE',
                             '8',
@@ -529,18 +845,13 @@ class DataExporter:
                             str(coords[-1][0]),
                             '21',
                             str(coords[-1][1])
-                        ])
+                        )
             
-            dxf_content.extend([
-                '0',
-                'ENDSEC',
-                '0',
-                'EOF'
-            ])
+            dxf_buffer.write('0\nENDSEC\n0\nEOF'.encode('utf-8'))
             
             return {
                 'success': True,
-                'data': '\n'.join(dxf_content).encode('utf-8')
+                'data': dxf_buffer.getvalue()
             }
             
         except Exception as e:
@@ -548,18 +859,33 @@ class DataExporter:
 
     def _export_csv(self, scenario_data: Dict[str, Any], include_metadata: bool = True) -> Dict[str, Any]:
         """Export data as CSV (tabular format)"""
+        spool = self._spool()
         try:
-            # Create CSV data
-            csv_data = []
+            parcels = scenario_data['parcels']
+            links = scenario_data['links']
+            
+            # Columns are fixed up front so rows can be written as they arrive
+            fieldnames = ['id', 'type', 'geometry_type']
+            for key in self._property_keys(parcels):
+                if key not in fieldnames:
+                    fieldnames.append(key)
+            fieldnames += ['capacity_units', 'capacity_population', 'capacity_jobs', 'link_class']
+            for key in self._property_keys(links):
+                if key not in fieldnames:
+                    fieldnames.append(key)
+            
+            text_buffer = io.TextIOWrapper(spool, encoding='utf-8', newline='')
+            # Keys outside the snapshot's key query are dropped rather than failing the export
+            writer = csv.DictWriter(text_buffer, fieldnames=fieldnames, lineterminator='\n', extrasaction='ignore')
+            writer.writeheader()
             
             # Add parcels data
-            for parcel in scenario_data['parcels']:
-                properties = parcel['properties']
+            for parcel in parcels:
                 row = {
                     'id': parcel['id'],
                     'type': 'parcel',
                     'geometry_type': json.loads(parcel['geometry'])['type'],
-                    **properties
+                    **(parcel['properties'] or {})
                 }
                 
                 if parcel['capacity']:
@@ -567,83 +893,312 @@ class DataExporter:
                     row['capacity_population'] = parcel['capacity'].get('population', 0)
                     row['capacity_jobs'] = parcel['capacity'].get('jobs', 0)
                 
-                csv_data.append(row)
+                writer.writerow(row)
             
             # Add links data
-            for link in scenario_data['links']:
-                properties = link['properties']
+            for link in links:
                 row = {
                     'id': link['id'],
                     'type': 'link',
                     'link_class': link['link_class'],
                     'geometry_type': json.loads(link['geometry'])['type'],
-                    **properties
+                    **(link['properties'] or {})
                 }
-                csv_data.append(row)
+                writer.writerow(row)
             
-            # Convert to DataFrame and CSV
-            df = pd.DataFrame(csv_data)
-            csv_buffer = BytesIO()
-            df.to_csv(csv_buffer, index=False)
-            csv_buffer.seek(0)
+            text_buffer.flush()
+            text_buffer.detach()
             
             return {
                 'success': True,
-                'data': csv_buffer.getvalue()
+                'data': spool
             }
             
         except Exception as e:
+            spool.close()
             return {'success': False, 'error': str(e)}
 
-    def _create_multi_format_zip(self, scenario_data: Dict[str, Any], formats: List[str]) -> bytes:
-        """Create ZIP archive with multiple export formats"""
-        zip_buffer = BytesIO()
+    def _property_keys(self, rows) -> List[str]:
+        """Distinct properties keys for a row stream or an already fetched row list"""
+        if isinstance(rows, ScenarioRowStream):
+            return rows.property_keys()
         
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Add each format
-            for fmt in formats:
-                export_result = self._generate_export(scenario_data, fmt, True)
-                if export_result['success']:
-                    if fmt == 'shapefile':
-                        # Shapefile is already a ZIP, extract and add components
-                        shapefile_zip = zipfile.ZipFile(BytesIO(export_result['data']))
-                        for name in shapefile_zip.namelist():
-                            zip_file.writestr(f'{fmt}/{name}', shapefile_zip.read(name))
-                    else:
-                        # Add single file
-                        extension = self.export_formats[fmt]['extensions'][0]
-                        zip_file.writestr(f'{fmt}/data{extension}', export_result['data'])
+        keys = {}
+        for row in rows:
+            keys.update(dict.fromkeys(row['properties'] or {}))
+        return list(keys)
+
+    def _export_geoparquet(self, scenario_data: Dict[str, Any], include_metadata: bool = True) -> Dict[str, Any]:
+        """Export data as GeoParquet, one compressed row group per chunk of features"""
+        spool = self._spool()
+        try:
+            column_types = self._column_types(scenario_data)
+            arrow_types = {'bool': pa.bool_(), 'int': pa.int64(), 'float': pa.float64(), 'str': pa.string()}
             
-            # Add metadata
-            metadata = {
-                'scenario_id': scenario_data['scenario']['id'],
-                'scenario_name': scenario_data['scenario']['name'],
-                'exported_at': datetime.now().isoformat(),
-                'formats_included': formats,
-                'parcel_count': len(scenario_data['parcels']),
-                'link_count': len(scenario_data['links'])
+            # GeoParquet 1.0 column metadata; geometries are lon/lat so the default CRS84 applies
+            schema_metadata = {
+                'geo': json.dumps({
+                    'version': '1.0.0',
+                    'primary_column': 'geometry',
+                    'columns': {'geometry': {'encoding': 'WKB', 'geometry_types': []}}
+                })
+            }
+            if include_metadata:
+                schema_metadata['urban_planner'] = json.dumps(self._export_metadata(scenario_data), default=str)
+            
+            schema = pa.schema(
+                [pa.field(column, arrow_types[kind]) for column, kind in column_types.items()] +
+                [pa.field('geometry', pa.binary())],
+                metadata=schema_metadata
+            )
+            
+            with pq.ParquetWriter(spool, schema, compression='zstd') as writer:
+                features = self._iter_flat_features(scenario_data)
+                for batch in self._batched(features, self.stream_config['row_group_rows']):
+                    geometries = shapely.to_wkb(shapely.from_geojson([geometry for geometry, _ in batch]))
+                    arrays = [
+                        pa.array([self._coerce_value(attributes.get(column), kind) for _, attributes in batch],
+                                 type=arrow_types[kind])
+                        for column, kind in column_types.items()
+                    ]
+                    arrays.append(pa.array(geometries, type=pa.binary()))
+                    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            
+            return {
+                'success': True,
+                'data': spool
             }
-            zip_file.writestr('metadata.json', json.dumps(metadata, indent=2))
+            
+        except Exception as e:
+            spool.close()
+            return {'success': False, 'error': str(e)}
+
+    def _export_flatgeobuf(self, scenario_data: Dict[str, Any], include_metadata: bool = True) -> Dict[str, Any]:
+        """Export data as FlatGeobuf with a packed Hilbert R-tree spatial index"""
+        try:
+            column_types = self._column_types(scenario_data)
+            schema = {
+                'geometry': 'Unknown',
+                'properties': {column: kind for column, kind in column_types.items()}
+            }
+            layer_options = {'SPATIAL_INDEX': 'YES'}
+            if include_metadata:
+                layer_options['TITLE'] = str(scenario_data['scenario']['name'])
+                layer_options['DESCRIPTION'] = json.dumps(self._export_metadata(scenario_data), default=str)
+            
+            # GDAL writes FlatGeobuf to a path and builds the index when the layer closes
+            with tempfile.TemporaryDirectory() as temp_dir:
+                path = os.path.join(temp_dir, 'scenario.fgb')
+                with fiona.open(path, 'w', driver='FlatGeobuf', schema=schema, crs='EPSG:4326', **layer_options) as layer:
+                    features = self._iter_flat_features(scenario_data)
+                    for batch in self._batched(features, self.stream_config['itersize']):
+                        layer.writerecords([
+                            {
+                                'geometry': json.loads(geometry),
+                                'properties': {
+                                    column: self._coerce_value(attributes.get(column), kind)
+                                    for column, kind in column_types.items()
+                                }
+                            }
+                            for geometry, attributes in batch
+                        ])
+                
+                # The open handle keeps the unlinked file readable after the directory is removed
+                data = open(path, 'rb')
+            
+            return {
+                'success': True,
+                'data': data
+            }
+            
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def _export_metadata(self, scenario_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Scenario metadata embedded in columnar exports"""
+        return {
+            'scenario_id': scenario_data['scenario']['id'],
+            'scenario_name': scenario_data['scenario']['name'],
+            'exported_at': datetime.now().isoformat(),
+            'parcel_count': len(scenario_data['parcels']),
+            'link_count': len(scenario_data['links'])
+        }
+
+    def _iter_flat_features(self, scenario_data: Dict[str, Any]) -> Iterator[tuple]:
+        """Yield (GeoJSON geometry text, flattened attributes) for every parcel and link"""
+        for parcel in scenario_data['parcels']:
+            yield parcel['geometry'], self._flatten_attributes(parcel, 'parcel')
+        for link in scenario_data['links']:
+            yield link['geometry'], self._flatten_attributes(link, 'link')
+
+    def _flatten_attributes(self, row: Dict[str, Any], feature_type: str) -> Dict[str, Any]:
+        """Flatten a parcel or link row into scalar columns, joining nested keys with underscores"""
+        attributes = {'id': row['id'], 'type': feature_type}
+        if feature_type == 'link':
+            attributes['link_class'] = row.get('link_class')
         
-        zip_buffer.seek(0)
-        return zip_buffer.getvalue()
+        self._flatten_into(attributes, '', row.get('properties') or {})
+        for group in ('capacity', 'utilities'):
+            if row.get(group):
+                self._flatten_into(attributes, f'{group}_', row[group])
+        
+        return attributes
+
+    def _flatten_into(self, target: Dict[str, Any], prefix: str, values: Dict[str, Any]):
+        for key, value in values.items():
+            if isinstance(value, dict):
+                self._flatten_into(target, f'{prefix}{key}_', value)
+            else:
+                target[f'{prefix}{key}'] = value
+
+    def _column_types(self, scenario_data: Dict[str, Any]) -> Dict[str, str]:
+        """Infer a typed column per flattened attribute from a geometry-free pass over the data"""
+        kinds = {}
+        
+        for feature_type, rows in (('parcel', scenario_data['parcels']), ('link', scenario_data['links'])):
+            for row in self._attribute_rows(rows):
+                for column, value in self._flatten_attributes(row, feature_type).items():
+                    column_kinds = kinds.setdefault(column, set())
+                    if value is None:
+                        continue
+                    if isinstance(value, bool):
+                        column_kinds.add('bool')
+                    elif isinstance(value, int):
+                        column_kinds.add('int')
+                    elif isinstance(value, float):
+                        column_kinds.add('float')
+                    else:
+                        column_kinds.add('str')
+        
+        column_types = {}
+        for column, column_kinds in kinds.items():
+            if column_kinds in ({'bool'}, {'int'}, {'float'}):
+                column_types[column] = column_kinds.pop()
+            elif column_kinds == {'int', 'float'}:
+                column_types[column] = 'float'
+            else:
+                column_types[column] = 'str'
+        return column_types
+
+    def _attribute_rows(self, rows):
+        """Rows without geometry; streams are re-queried so no geometry crosses the wire"""
+        if not isinstance(rows, ScenarioRowStream):
+            return rows
+        
+        attributes = ScenarioRowStream(
+            rows.conn, f'{rows.name}_attributes',
+            f"SELECT to_jsonb(rows) - 'geometry' as attributes FROM ({rows.query}) rows",
+            rows.params, rows.count, rows.itersize
+        )
+        return (row['attributes'] for row in attributes)
+
+    def _coerce_value(self, value: Any, kind: str) -> Any:
+        if value is None:
+            return None
+        if kind == 'str':
+            return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+        if kind == 'float':
+            return float(value)
+        if kind == 'int':
+            return int(value)
+        return bool(value)
 
-    def _store_export_file(self, file_data: bytes, export_format: str, scenario_id: str, 
+    def _batched(self, iterable, size: int) -> Iterator[list]:
+        iterator = iter(iterable)
+        while True:
+            batch = list(islice(iterator, size))
+            if not batch:
+                return
+            yield batch
+
+    def _create_multi_format_zip(self, scenario_data: Dict[str, Any], formats: List[str], output: BinaryIO):
+        """Write a ZIP archive with multiple export formats, rendering the formats concurrently"""
+        workers = max(1, min(self.stream_config['format_workers'], len(formats)))
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            rendered = [pool.submit(self._render_format, scenario_data, fmt) for fmt in formats]
+            
+            with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                # Members are added in request order as each writer finishes
+                for fmt, future in zip(formats, rendered):
+                    members = future.result()
+                    if members is None:
+                        continue
+                    
+                    for name, spool in members:
+                        with spool, zip_file.open(f'{fmt}/{name}', 'w') as member:
+                            shutil.copyfileobj(spool, member, self.stream_config['copy_chunk_bytes'])
+                
+                # Add metadata
+                metadata = {
+                    'scenario_id': scenario_data['scenario']['id'],
+                    'scenario_name': scenario_data['scenario']['name'],
+                    'exported_at': datetime.now().isoformat(),
+                    'formats_included': formats,
+                    'parcel_count': len(scenario_data['parcels']),
+                    'link_count': len(scenario_data['links'])
+                }
+                zip_file.writestr('metadata.json', json.dumps(metadata, indent=2))
+
+    def _render_format(self, scenario_data: Dict[str, Any], export_format: str) -> Optional[List[Tuple[str, BinaryIO]]]:
+        """Render one format into (member name, rewound file) pairs, or None if the writer failed"""
+        try:
+            if export_format == 'shapefile':
+                # Components join the bundle as plain files, so their data is deflated exactly once
+                members = []
+                try:
+                    with tempfile.TemporaryDirectory() as temp_dir:
+                        for name in self._write_shapefile(scenario_data, True, temp_dir):
+                            spool = self._spool()
+                            members.append((name, spool))
+                            with open(os.path.join(temp_dir, name), 'rb') as component:
+                                shutil.copyfileobj(component, spool, self.stream_config['copy_chunk_bytes'])
+                            spool.seek(0)
+                except Exception:
+                    for _, spool in members:
+                        spool.close()
+                    raise
+                return members
+            
+            export_result = self._generate_export(scenario_data, export_format, True)
+            if not export_result['success']:
+                logger.warning(f"Skipping {export_format} in multi-format export: {export_result['error']}")
+                return None
+            extension = self.export_formats[export_format]['extensions'][0]
+            return [(f'data{extension}', self._export_file(export_result['data']))]
+            
+        except Exception as e:
+            logger.warning(f"Skipping {export_format} in multi-format export: {str(e)}")
+            return None
+
+    @instrumented('exports', 'store')
+    def _store_export_file(self, file_data: Union[bytes, BinaryIO], export_format: str, scenario_id: str, 
                           suffix: str = '') -> Optional[str]:
-        """Store export file and return signed URL"""
+        """Store export file (bytes or a readable binary stream) and return signed URL"""
         try:
             # Generate filename
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             extension = self.export_formats[export_format]['extensions'][0]
             filename = f"scenario_{scenario_id}_{export_format}{suffix}_{timestamp}{extension}"
             
+            # Hash in chunks so streamed exports are never fully loaded
+            file_hash = hashlib.md5()
+            file_size = 0
+            if isinstance(file_data, (bytes, bytearray)):
+                file_hash.update(file_data)
+                file_size = len(file_data)
+            else:
+                for chunk in iter(lambda: file_data.read(self.stream_config['copy_chunk_bytes']), b''):
+                    file_hash.update(chunk)
+                    file_size += len(chunk)
+            
             # For now, return a mock signed URL
             # In production, this would upload to MinIO/S3 and generate a real signed URL
-            file_hash = hashlib.md5(file_data).hexdigest()
-            mock_url = f"https://exports.urban-planner.com/{filename}?signature={file_hash}&expires={int(time.time() + 86400)}"
+            mock_url = f"https://exports.urban-planner.com/{filename}?signature={file_hash.hexdigest()}&expires={int(time.time() + 86400)}"
             
             # Store file metadata in database
-            self._store_export_metadata(scenario_id, export_format, filename, len(file_data))
+            self._store_export_metadata(scenario_id, export_format, filename, file_size)
+            annotate(payload_bytes=file_size)
             
             return mock_url
             
@@ -0,0 +1,242 @@
+import json
+import logging
+from typing import Dict, Any, List, Optional, BinaryIO, Tuple
+import os
+from dotenv import load_dotenv
+import hashlib
+from io import BytesIO
+import shutil
+import tempfile
+import time
+import uuid
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LocalBlobStore:
+    """Export cache objects on local disk"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, *name.split('/'))
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self._path(name))
+
+    def read(self, name: str) -> Optional[bytes]:
+        try:
+            with open(self._path(name), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def open(self, name: str) -> BinaryIO:
+        return open(self._path(name), 'rb')
+
+    def write(self, name: str, fileobj: BinaryIO):
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write beside the target and rename so readers never see partial blobs
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'wb') as f:
+            shutil.copyfileobj(fileobj, f, 1024 * 1024)
+        os.replace(temp_path, path)
+
+    def delete(self, name: str):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix: str) -> List[Tuple[str, int, float]]:
+        """List (name, size, last_used) for every object under a prefix"""
+        directory = self._path(prefix)
+        if not os.path.isdir(directory):
+            return []
+
+        objects = []
+        for filename in os.listdir(directory):
+            if filename.endswith('.tmp'):
+                continue
+            stat = os.stat(os.path.join(directory, filename))
+            objects.append((f"{prefix}/{filename}", stat.st_size, stat.st_mtime))
+        return objects
+
+class S3BlobStore:
+    """Export cache objects in an S3-compatible bucket"""
+
+    def __init__(self, config: Dict[str, Any], prefix: str = 'export-cache'):
+        import boto3
+
+        scheme = 'https' if config['secure'] else 'http'
+        self.client = boto3.client(
+            's3',
+            endpoint_url=f"{scheme}://{config['endpoint']}",
+            aws_access_key_id=config['access_key'],
+            aws_secret_access_key=config['secret_key']
+        )
+        self.bucket = config['bucket']
+        self.prefix = prefix
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}/{name}"
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(name))
+            return True
+        except self.client.exceptions.ClientError:
+            return False
+
+    def read(self, name: str) -> Optional[bytes]:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(name))['Body'].read()
+        except self.client.exceptions.NoSuchKey:
+            return None
+
+    def open(self, name: str) -> BinaryIO:
+        spool = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+        self.client.download_fileobj(self.bucket, self._key(name), spool)
+        spool.seek(0)
+        return spool
+
+    def write(self, name: str, fileobj: BinaryIO):
+        self.client.upload_fileobj(fileobj, self.bucket, self._key(name))
+
+    def delete(self, name: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(name))
+
+    def list(self, prefix: str) -> List[Tuple[str, int, float]]:
+        objects = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{self._key(prefix)}/"):
+            for item in page.get('Contents', []):
+                name = item['Key'][len(self.prefix) + 1:]
+                objects.append((name, item['Size'], item['LastModified'].timestamp()))
+        return objects
+
+class ExportCache:
+    """Content-addressed cache of generated export files
+
+    Requests map to small key records under keys/, which point at blobs/<sha256>.
+    Identical files produced by different requests share one blob. A single index
+    record tracks each blob's size, last use and referring keys, so hits and
+    eviction never rewrite blobs or list the store.
+    """
+
+    def __init__(self, store=None, max_bytes: Optional[int] = None):
+        if store is None:
+            backend = os.getenv('EXPORT_CACHE_BACKEND', 'local').lower()
+            if backend == 's3':
+                store = S3BlobStore({
+                    'endpoint': os.getenv('MINIO_ENDPOINT', 'localhost:9000'),
+                    'access_key': os.getenv('MINIO_ACCESS_KEY', 'minioadmin'),
+                    'secret_key': os.getenv('MINIO_SECRET_KEY', 'minioadmin'),
+                    'bucket': os.getenv('MINIO_BUCKET', 'urban-planner-exports'),
+                    'secure': os.getenv('MINIO_SECURE', 'false').lower() == 'true'
+                })
+            else:
+                store = LocalBlobStore(os.getenv(
+                    'EXPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'urban-planner-export-cache')
+                ))
+
+        self.store = store
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv('EXPORT_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def make_key(revision: str, export_format: str, include_analysis: bool, include_metadata: bool,
+                 theme: Optional[str] = None) -> str:
+        """Derive the cache key for one export request"""
+        parts = [revision, export_format, str(bool(include_analysis)), str(bool(include_metadata)), theme or '']
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a key, or None when it is missing or its blob was evicted"""
+        raw = self.store.read(f"keys/{key}")
+        entry = json.loads(raw) if raw else None
+        index = self._load_index()
+
+        if not entry or entry['digest'] not in index:
+            if entry:
+                # The blob was evicted; drop the dangling key record
+                self.store.delete(f"keys/{key}")
+            self.stats['misses'] += 1
+            return None
+
+        index[entry['digest']]['last_used'] = time.time()
+        self._save_index(index)
+        self.stats['hits'] += 1
+        return entry
+
+    def put(self, key: str, fileobj: BinaryIO, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a file under its content digest and point the key at it"""
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in iter(lambda: fileobj.read(1024 * 1024), b''):
+            digest.update(chunk)
+            size += len(chunk)
+
+        entry = dict(entry, digest=digest.hexdigest(), size=size, cached_at=time.time())
+        index = self._load_index()
+
+        # Deduplicate: identical output is only written once
+        record = index.get(entry['digest'])
+        if record is None:
+            fileobj.seek(0)
+            self.store.write(f"blobs/{entry['digest']}", fileobj)
+            record = index[entry['digest']] = {'size': size, 'keys': []}
+        record['last_used'] = entry['cached_at']
+        if key not in record['keys']:
+            record['keys'].append(key)
+
+        self.update(key, entry)
+        self._evict(index)
+        self._save_index(index)
+        return entry
+
+    def update(self, key: str, entry: Dict[str, Any]):
+        """Rewrite a key record, e.g. after its signed URL was refreshed"""
+        self.store.write(f"keys/{key}", BytesIO(json.dumps(entry).encode('utf-8')))
+
+    def open_blob(self, digest: str) -> BinaryIO:
+        return self.store.open(f"blobs/{digest}")
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Read the blob index, rebuilding it from a one-off listing when it is missing"""
+        raw = self.store.read('index')
+        if raw:
+            return json.loads(raw)
+
+        # Blobs found this way have no known keys; their key records are dropped lazily by get()
+        return {
+            name.split('/', 1)[1]: {'size': size, 'last_used': last_used, 'keys': []}
+            for name, size, last_used in self.store.list('blobs')
+        }
+
+    def _save_index(self, index: Dict[str, Dict[str, Any]]):
+        # Last writer wins between workers; a lost update only skews LRU order slightly
+        self.store.write('index', BytesIO(json.dumps(index).encode('utf-8')))
+
+    def _evict(self, index: Dict[str, Dict[str, Any]]):
+        """Drop least recently used blobs and their key records until the cache fits in max_bytes"""
+        total = sum(record['size'] for record in index.values())
+        if total <= self.max_bytes:
+            return
+
+        for digest, record in sorted(index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            self.store.delete(f"blobs/{digest}")
+            for key in record['keys']:
+                self.store.delete(f"keys/{key}")
+            del index[digest]
+            total -= record['size']
+            self.stats['evictions'] += 1
+            logger.info(f"Evicted export cache blob {digest} ({record['size']} bytes)")
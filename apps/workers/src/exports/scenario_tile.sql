@@ -0,0 +1,33 @@
+-- Parcel and link layers of one Mapbox Vector Tile, shared by the MBTiles exporter
+-- (exports/vector_tiles.py) and the on-demand tile server (orchestrator/tile_server.py).
+-- Expects a FROM item "t" with an EPSG:3857 "envelope" column and named parameters
+-- scenario_id, extent and buffer in pyformat style.
+(
+    SELECT COALESCE(ST_AsMVT(parcel_tile, 'parcels', %(extent)s, 'geom'), ''::bytea)
+    FROM (
+        SELECT ST_AsMVTGeom(ST_Transform(p.geometry, 3857), t.envelope, %(extent)s, %(buffer)s, true) as geom,
+               p.id::text as id,
+               p.properties->>'zoning' as zoning,
+               (p.properties->>'far')::float as far,
+               (p.properties->>'height')::float as height,
+               (p.capacity->>'units')::float as units,
+               (p.capacity->>'population')::float as population,
+               (p.capacity->>'jobs')::float as jobs,
+               ST_Area(p.geometry::geography) as area
+        FROM parcels p
+        WHERE p.scenario_id = %(scenario_id)s AND p.status = 'active'
+          AND p.geometry && ST_Transform(t.envelope, 4326)
+    ) parcel_tile
+    WHERE parcel_tile.geom IS NOT NULL
+) || (
+    SELECT COALESCE(ST_AsMVT(link_tile, 'links', %(extent)s, 'geom'), ''::bytea)
+    FROM (
+        SELECT ST_AsMVTGeom(ST_Transform(l.geometry, 3857), t.envelope, %(extent)s, %(buffer)s, true) as geom,
+               l.id::text as id,
+               l.link_class
+        FROM links l
+        WHERE l.scenario_id = %(scenario_id)s AND l.status = 'active'
+          AND l.geometry && ST_Transform(t.envelope, 4326)
+    ) link_tile
+    WHERE link_tile.geom IS NOT NULL
+)
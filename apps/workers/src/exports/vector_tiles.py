@@ -0,0 +1,310 @@
+import json
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+import psycopg2
+from psycopg2.extras import RealDictCursor
+import os
+from dotenv import load_dotenv
+from datetime import datetime
+import gzip
+import math
+import sqlite3
+import time
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Tile layer SQL shared with the orchestrator tile server
+TILE_LAYERS_SQL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scenario_tile.sql')
+
+with open(TILE_LAYERS_SQL_PATH) as f:
+    TILE_LAYERS_SQL = f.read()
+
+class VectorTileExporter:
+    # One PostGIS round trip renders every requested tile of a zoom level
+    TILE_QUERY = f"""
+    SELECT t.x, t.y, {TILE_LAYERS_SQL} as tile
+    FROM (
+        SELECT requested.x, requested.y, ST_TileEnvelope(%(z)s, requested.x, requested.y) as envelope
+        FROM unnest(%(xs)s::int[], %(ys)s::int[]) as requested(x, y)
+    ) t
+    """
+
+    VECTOR_LAYERS = [
+        {
+            'id': 'parcels',
+            'fields': {
+                'id': 'String', 'zoning': 'String', 'far': 'Number', 'height': 'Number',
+                'units': 'Number', 'population': 'Number', 'jobs': 'Number', 'area': 'Number'
+            }
+        },
+        {
+            'id': 'links',
+            'fields': {'id': 'String', 'link_class': 'String'}
+        }
+    ]
+
+    def __init__(self):
+        self.db_config = {
+            'host': os.getenv('POSTGRES_HOST', 'localhost'),
+            'port': os.getenv('POSTGRES_PORT', '5432'),
+            'database': os.getenv('POSTGRES_DB', 'urban_planner'),
+            'user': os.getenv('POSTGRES_USER', 'planner'),
+            'password': os.getenv('POSTGRES_PASSWORD', 'dev_password')
+        }
+
+        self.tile_config = {
+            'min_zoom': int(os.getenv('TILES_MIN_ZOOM', 10)),
+            'max_zoom': int(os.getenv('TILES_MAX_ZOOM', 16)),
+            'extent': 4096,  # MVT coordinate resolution
+            'buffer': 64,  # Edge buffer so strokes and labels do not clip
+            'batch_tiles': int(os.getenv('TILES_BATCH', 512))  # Tiles per ST_AsMVT query
+        }
+
+    def export_mbtiles(self, scenario_id: str, output_path: str, min_zoom: Optional[int] = None,
+                       max_zoom: Optional[int] = None) -> Dict[str, Any]:
+        """Build the full tile pyramid for a scenario into an MBTiles file"""
+        try:
+            min_zoom = self.tile_config['min_zoom'] if min_zoom is None else min_zoom
+            max_zoom = self.tile_config['max_zoom'] if max_zoom is None else max_zoom
+
+            conn = psycopg2.connect(**self.db_config)
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+            try:
+                scenario = self._get_scenario_extent(cursor, scenario_id)
+                if not scenario:
+                    return {'success': False, 'error': 'No scenario data found'}
+
+                bounds = (scenario['min_lon'], scenario['min_lat'], scenario['max_lon'], scenario['max_lat'])
+
+                mbtiles = self._open_mbtiles(output_path)
+                try:
+                    mbtiles.execute("DELETE FROM tiles")
+                    zoom_stats = {}
+                    for zoom in range(min_zoom, max_zoom + 1):
+                        tiles = self._tiles_for_bounds([bounds], zoom)
+                        zoom_stats[str(zoom)] = self._render_zoom(cursor, mbtiles, scenario_id, zoom, tiles)
+
+                    self._write_metadata(mbtiles, scenario, bounds, min_zoom, max_zoom)
+                    mbtiles.commit()
+                finally:
+                    mbtiles.close()
+
+            finally:
+                cursor.close()
+                conn.close()
+
+            return {
+                'success': True,
+                'message': f'Built vector tiles for zoom {min_zoom}-{max_zoom}',
+                'data': self._summarize(zoom_stats, output_path)
+            }
+
+        except Exception as e:
+            logger.error(f"Error exporting vector tiles: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    def refresh_mbtiles(self, scenario_id: str, output_path: str,
+                        edited_bounds: List[Tuple[float, float, float, float]]) -> Dict[str, Any]:
+        """Re-render only the tiles touched by edited geometries
+
+        edited_bounds should hold the lon/lat bounds of each edited feature both before and after the edit.
+        """
+        try:
+            conn = psycopg2.connect(**self.db_config)
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            mbtiles = self._open_mbtiles(output_path)
+
+            try:
+                metadata = dict(mbtiles.execute("SELECT name, value FROM metadata").fetchall())
+                if 'minzoom' not in metadata:
+                    return {'success': False, 'error': 'MBTiles file has no pyramid to refresh'}
+
+                zoom_stats = {}
+                for zoom in range(int(metadata['minzoom']), int(metadata['maxzoom']) + 1):
+                    tiles = self._tiles_for_bounds(edited_bounds, zoom)
+                    zoom_stats[str(zoom)] = self._render_zoom(cursor, mbtiles, scenario_id, zoom, tiles)
+
+                mbtiles.execute(
+                    "INSERT OR REPLACE INTO metadata (name, value) VALUES ('updated_at', ?)", (datetime.now().isoformat(),)
+                )
+                mbtiles.commit()
+
+            finally:
+                mbtiles.close()
+                cursor.close()
+                conn.close()
+
+            return {
+                'success': True,
+                'message': f'Refreshed {sum(stats["requested_tiles"] for stats in zoom_stats.values())} touched tiles',
+                'data': self._summarize(zoom_stats, output_path)
+            }
+
+        except Exception as e:
+            logger.error(f"Error refreshing vector tiles: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    def get_tile(self, scenario_id: str, z: int, x: int, y: int) -> Optional[bytes]:
+        """Render one uncompressed MVT tile on demand, or None when it holds no features"""
+        conn = psycopg2.connect(**self.db_config)
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+        try:
+            tiles = self._query_tiles(cursor, scenario_id, z, [(x, y)])
+            return tiles.get((x, y))
+
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _get_scenario_extent(self, cursor, scenario_id: str) -> Optional[Dict[str, Any]]:
+        """Get scenario name, KPIs and the lon/lat extent of its active features"""
+        query = """
+        SELECT s.id, s.name, s.kpis,
+               ST_XMin(e.extent) as min_lon, ST_YMin(e.extent) as min_lat,
+               ST_XMax(e.extent) as max_lon, ST_YMax(e.extent) as max_lat
+        FROM scenarios s
+        CROSS JOIN LATERAL (
+            SELECT ST_Extent(geometry) as extent
+            FROM (
+                SELECT geometry FROM parcels WHERE scenario_id = s.id AND status = 'active'
+                UNION ALL
+                SELECT geometry FROM links WHERE scenario_id = s.id AND status = 'active'
+            ) features
+        ) e
+        WHERE s.id = %s
+        """
+        cursor.execute(query, (scenario_id,))
+        scenario = cursor.fetchone()
+
+        if not scenario or scenario['min_lon'] is None:
+            return None
+        return scenario
+
+    def _tiles_for_bounds(self, bounds_list: Iterable[Tuple[float, float, float, float]], zoom: int) -> List[Tuple[int, int]]:
+        """XYZ tiles covering lon/lat boxes, widened by the MVT buffer so edge features stay consistent"""
+        margin = self.tile_config['buffer'] / self.tile_config['extent']
+        last = 2 ** zoom - 1
+        tiles = set()
+
+        for min_lon, min_lat, max_lon, max_lat in bounds_list:
+            x_min, y_min = self._tile_fraction(min_lon, max_lat, zoom)
+            x_max, y_max = self._tile_fraction(max_lon, min_lat, zoom)
+
+            for x in range(max(0, math.floor(x_min - margin)), min(last, math.floor(x_max + margin)) + 1):
+                for y in range(max(0, math.floor(y_min - margin)), min(last, math.floor(y_max + margin)) + 1):
+                    tiles.add((x, y))
+
+        return sorted(tiles)
+
+    def _tile_fraction(self, lon: float, lat: float, zoom: int) -> Tuple[float, float]:
+        """Fractional Web Mercator tile coordinates for a lon/lat point"""
+        lat = max(min(lat, 85.0511287798), -85.0511287798)
+        n = 2 ** zoom
+        x = (lon + 180.0) / 360.0 * n
+        y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+        return x, y
+
+    def _render_zoom(self, cursor, mbtiles: sqlite3.Connection, scenario_id: str, zoom: int,
+                     tiles: List[Tuple[int, int]]) -> Dict[str, Any]:
+        """Render tiles of one zoom level into MBTiles, deleting tiles that became empty"""
+        start_time = time.perf_counter()
+        stats = {'requested_tiles': len(tiles), 'tile_count': 0, 'bytes': 0, 'max_tile_bytes': 0}
+        last = 2 ** zoom - 1
+
+        for offset in range(0, len(tiles), self.tile_config['batch_tiles']):
+            batch = tiles[offset:offset + self.tile_config['batch_tiles']]
+            rendered = self._query_tiles(cursor, scenario_id, zoom, batch)
+
+            rows = []
+            for x, y in batch:
+                tile = rendered.get((x, y))
+                if tile:
+                    data = gzip.compress(tile)
+                    rows.append((zoom, x, last - y, data))
+                    stats['tile_count'] += 1
+                    stats['bytes'] += len(data)
+                    stats['max_tile_bytes'] = max(stats['max_tile_bytes'], len(data))
+
+            # MBTiles rows are TMS, so y is flipped
+            mbtiles.executemany(
+                "DELETE FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?",
+                [(zoom, x, last - y) for x, y in batch]
+            )
+            mbtiles.executemany(
+                "INSERT INTO tiles (zoom_level, tile_column, tile_row, tile_data) VALUES (?, ?, ?, ?)", rows
+            )
+
+        stats['build_ms'] = (time.perf_counter() - start_time) * 1000
+        return stats
+
+    def _query_tiles(self, cursor, scenario_id: str, zoom: int, tiles: List[Tuple[int, int]]) -> Dict[Tuple[int, int], bytes]:
+        """Run the ST_AsMVT query for a batch of tiles and return the non-empty ones"""
+        if not tiles:
+            return {}
+
+        cursor.execute(self.TILE_QUERY, {
+            'scenario_id': scenario_id,
+            'z': zoom,
+            'xs': [x for x, _ in tiles],
+            'ys': [y for _, y in tiles],
+            'extent': self.tile_config['extent'],
+            'buffer': self.tile_config['buffer']
+        })
+
+        return {
+            (row['x'], row['y']): bytes(row['tile'])
+            for row in cursor.fetchall()
+            if row['tile']
+        }
+
+    def _open_mbtiles(self, output_path: str) -> sqlite3.Connection:
+        """Open or create an MBTiles 1.3 database"""
+        mbtiles = sqlite3.connect(output_path)
+        mbtiles.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)")
+        mbtiles.execute("""
+        CREATE TABLE IF NOT EXISTS tiles (
+            zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB
+        )
+        """)
+        mbtiles.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS tile_index ON tiles (zoom_level, tile_column, tile_row)"
+        )
+        return mbtiles
+
+    def _write_metadata(self, mbtiles: sqlite3.Connection, scenario: Dict[str, Any],
+                        bounds: Tuple[float, float, float, float], min_zoom: int, max_zoom: int):
+        center_zoom = min(max_zoom, max(min_zoom, 14))
+        metadata = {
+            'name': scenario['name'] or str(scenario['id']),
+            'format': 'pbf',
+            'type': 'overlay',
+            'version': '1',
+            'description': f"Scenario {scenario['id']} parcels and links",
+            'bounds': ','.join(str(value) for value in bounds),
+            'center': f"{(bounds[0] + bounds[2]) / 2},{(bounds[1] + bounds[3]) / 2},{center_zoom}",
+            'minzoom': str(min_zoom),
+            'maxzoom': str(max_zoom),
+            'json': json.dumps({
+                'vector_layers': [
+                    dict(layer, minzoom=min_zoom, maxzoom=max_zoom) for layer in self.VECTOR_LAYERS
+                ],
+                'scenario_id': str(scenario['id']),
+                'kpis': scenario.get('kpis') or {}
+            }, default=str),
+            'updated_at': datetime.now().isoformat()
+        }
+        mbtiles.executemany("INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)", list(metadata.items()))
+
+    def _summarize(self, zoom_stats: Dict[str, Dict[str, Any]], output_path: str) -> Dict[str, Any]:
+        return {
+            'zoom_levels': zoom_stats,
+            'tile_count': sum(stats['tile_count'] for stats in zoom_stats.values()),
+            'tile_bytes': sum(stats['bytes'] for stats in zoom_stats.values()),
+            'build_ms': sum(stats['build_ms'] for stats in zoom_stats.values()),
+            'file_size': os.path.getsize(output_path)
+        }
@@ -0,0 +1,133 @@
+import functools
+import os
+import threading
+import time
+from typing import Optional
+from monitoring.slo_dashboards import SLODashboard, DASHBOARD
+from monitoring.openmetrics import MetricsRegistry, REGISTRY
+
+PHASES = ("total", "db_fetch", "compute", "store")
+
+PHASE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800, 3600)
+
+def _enabled_workers(value: str) -> frozenset:
+    return frozenset(name.strip() for name in value.split(",") if name.strip())
+
+# Comma-separated worker names (capacity, mobility, network, optimizer, exports) or "all".
+# Read once at import: disabled workers get their functions back undecorated.
+ENABLED_WORKERS = _enabled_workers(os.getenv("WORKER_INSTRUMENTATION", ""))
+
+class _ActiveSpan(threading.local):
+    # A class default keeps the lookup off the AttributeError path when nothing is timed
+    span = None
+
+_active = _ActiveSpan()
+
+def worker_enabled(worker: str) -> bool:
+    return worker in ENABLED_WORKERS or "all" in ENABLED_WORKERS
+
+class _Span:
+    __slots__ = ("rows", "payload_bytes", "child_seconds")
+
+    def __init__(self):
+        self.rows = None
+        self.payload_bytes = None
+        self.child_seconds = 0.0
+
+class TimingRecorder:
+    """Writes instrumented call timings into an SLO dashboard and the OpenMetrics registry"""
+
+    def __init__(self, dashboard: SLODashboard = None, registry: MetricsRegistry = None):
+        self.dashboard = dashboard if dashboard is not None else DASHBOARD
+        self.lock = threading.Lock()
+        self.phase_seconds = (registry if registry is not None else REGISTRY).histogram(
+            "urban_planner_worker_phase_duration_seconds", "Worker entry point and phase run time",
+            PHASE_BUCKETS, ["worker", "operation", "phase"], unit="seconds"
+        )
+
+    def record(self, worker: str, operation: str, phase: str, duration: float, success: bool,
+               rows: Optional[int] = None, payload_bytes: Optional[int] = None, compute: Optional[float] = None):
+        name = f"{worker}_{operation}"
+        labels = {"worker": worker, "operation": operation, "phase": phase}
+        self.phase_seconds.labels(worker, operation, phase).observe(duration)
+        if compute is not None:
+            self.phase_seconds.labels(worker, operation, "compute").observe(compute)
+
+        with self.lock:
+            self.dashboard.record_metric(f"{name}_duration", duration, "seconds", labels)
+            self.dashboard.record_metric(f"{name}_success_rate", 100.0 if success else 0.0, "percent", labels)
+            if compute is not None:
+                self.dashboard.record_metric(f"{name}_compute_duration", compute, "seconds", dict(labels, phase="compute"))
+            if rows is not None:
+                self.dashboard.record_metric(f"{name}_rows", rows, "rows", labels)
+            if payload_bytes is not None:
+                self.dashboard.record_metric(f"{name}_payload", payload_bytes, "bytes", labels)
+
+_recorder: Optional[TimingRecorder] = None
+
+def get_recorder() -> TimingRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = TimingRecorder()
+    return _recorder
+
+def set_recorder(recorder: TimingRecorder):
+    """Send timings elsewhere; by default they share the process-wide dashboard with UrbanPlannerMonitor"""
+    global _recorder
+    _recorder = recorder
+
+def annotate(rows: Optional[int] = None, payload_bytes: Optional[int] = None):
+    """Attach row and byte counts to the innermost instrumented call; a no-op when none is running"""
+    span = _active.span
+    if span is None:
+        return
+    if rows is not None:
+        span.rows = (span.rows or 0) + rows
+    if payload_bytes is not None:
+        span.payload_bytes = (span.payload_bytes or 0) + payload_bytes
+
+def instrumented(worker: str, phase: str = "total", enabled: Optional[bool] = None):
+    """Time a worker entry point ("total") or one of its db_fetch/store phases
+
+    Entry points also record a compute duration: their run time minus the time spent
+    in instrumented phases underneath them. List results count as fetched rows, and
+    row and byte counts roll up from phases into the entry point. When the worker is
+    not enabled the function is returned unchanged, so disabled workers pay nothing.
+    """
+    if phase not in PHASES:
+        raise ValueError(f"Unknown phase: {phase}")
+
+    def decorator(fn):
+        if not (worker_enabled(worker) if enabled is None else enabled):
+            return fn
+
+        operation = fn.__name__.lstrip("_")
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            parent = _active.span
+            span = _active.span = _Span()
+            success = False
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                success = not (isinstance(result, dict) and result.get("success") is False)
+                if span.rows is None and isinstance(result, list):
+                    span.rows = len(result)
+                return result
+            finally:
+                duration = time.perf_counter() - start
+                _active.span = parent
+                if parent is not None:
+                    parent.child_seconds += duration
+                    if span.rows is not None:
+                        parent.rows = (parent.rows or 0) + span.rows
+                    if span.payload_bytes is not None:
+                        parent.payload_bytes = (parent.payload_bytes or 0) + span.payload_bytes
+
+                compute = max(duration - span.child_seconds, 0.0) if phase == "total" and span.child_seconds else None
+                get_recorder().record(worker, operation, phase, duration, success, span.rows, span.payload_bytes, compute)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,236 @@
+import json
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+SNAPSHOT_VERSION = 1
+
+class _CounterChild:
+    __slots__ = ('registry', 'lock', 'value')
+
+    def __init__(self, registry: 'MetricsRegistry'):
+        self.registry = registry
+        self.lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self.lock:
+            self.value += amount
+        self.registry.dirty = True
+
+    def sample(self) -> Dict[str, Any]:
+        return {'value': self.value}
+
+    def reset(self):
+        self.value = 0.0
+
+class _GaugeChild:
+    __slots__ = ('registry', 'value')
+
+    def __init__(self, registry: 'MetricsRegistry'):
+        self.registry = registry
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = float(value)
+        self.registry.dirty = True
+
+    def sample(self) -> Dict[str, Any]:
+        return {'value': self.value}
+
+    def reset(self):
+        self.value = 0.0
+
+class _HistogramChild:
+    __slots__ = ('registry', 'lock', 'bounds', 'counts', 'sum')
+
+    def __init__(self, registry: 'MetricsRegistry', bounds: Tuple[float, ...]):
+        self.registry = registry
+        self.lock = threading.Lock()
+        self.bounds = bounds
+        # One slot per upper bound plus +Inf; cumulated only when exported
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+        self.registry.dirty = True
+
+    def sample(self) -> Dict[str, Any]:
+        with self.lock:
+            return {'counts': list(self.counts), 'sum': self.sum, 'count': sum(self.counts)}
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+class MetricFamily:
+    """A named metric with fixed label names; children are cached per label value tuple"""
+
+    def __init__(self, registry: 'MetricsRegistry', metric_type: str, name: str, help_text: str,
+                 labelnames: Sequence[str] = (), unit: Optional[str] = None, buckets: Optional[Sequence[float]] = None):
+        self.registry = registry
+        self.type = metric_type
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.unit = unit
+        self.buckets = tuple(sorted(float(b) for b in buckets)) if buckets is not None else None
+        self.children: Dict[Tuple[str, ...], Any] = {}
+        self.lock = threading.Lock()
+
+    def labels(self, *values):
+        """Return the child for these label values; the hot path is a single dict lookup"""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            values = tuple(str(value) for value in values)
+            with self.lock:
+                child = self.children.get(values)
+                if child is None:
+                    child = self.children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        if self.type == 'counter':
+            return _CounterChild(self.registry)
+        if self.type == 'gauge':
+            return _GaugeChild(self.registry)
+        return _HistogramChild(self.registry, self.buckets)
+
+    # Shortcuts for families without labels
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        family = {
+            'name': self.name,
+            'type': self.type,
+            'help': self.help,
+            'unit': self.unit,
+            'labelnames': list(self.labelnames),
+            'samples': [dict(labels=list(values), **child.sample()) for values, child in list(self.children.items())]
+        }
+        if self.buckets is not None:
+            family['buckets'] = list(self.buckets)
+        return family
+
+class MetricsRegistry:
+    """Process-local metric families, snapshotted to a shared directory for the orchestrator
+
+    Each process writes <snapshot_dir>/<host>-<pid>.json atomically at most every
+    flush_interval seconds while metrics change, and at least every heartbeat_interval
+    seconds while it is alive, so the orchestrator's /metrics endpoint can merge every
+    worker. The orchestrator folds snapshots that stop being rewritten into one
+    compacted file, so counters keep their totals across worker restarts.
+    """
+
+    def __init__(self, snapshot_dir: Optional[str] = None, flush_interval: float = 1.0,
+                 heartbeat_interval: float = 30.0):
+        self.snapshot_dir = snapshot_dir
+        self.flush_interval = flush_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.last_write = 0.0
+        self.families: Dict[str, MetricFamily] = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.flusher: Optional[threading.Thread] = None
+
+        if snapshot_dir:
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._register('counter', name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = (), unit: Optional[str] = None) -> MetricFamily:
+        return self._register('gauge', name, help_text, labelnames, unit)
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float], labelnames: Sequence[str] = (),
+                  unit: Optional[str] = None) -> MetricFamily:
+        return self._register('histogram', name, help_text, labelnames, unit, buckets)
+
+    def _register(self, metric_type: str, name: str, help_text: str, labelnames: Sequence[str],
+                  unit: Optional[str] = None, buckets: Optional[Sequence[float]] = None) -> MetricFamily:
+        """Get or create a family so several monitors in one process share it"""
+        with self.lock:
+            family = self.families.get(name)
+            if family is None:
+                family = self.families[name] = MetricFamily(self, metric_type, name, help_text, labelnames, unit, buckets)
+                self._start_flusher()
+            elif family.type != metric_type or family.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered as a {family.type} with labels {family.labelnames}")
+            return family
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'version': SNAPSHOT_VERSION,
+            'process': f"{socket.gethostname()}-{os.getpid()}",
+            'written_at': time.time(),
+            'families': [family.snapshot() for family in list(self.families.values())]
+        }
+
+    def flush(self):
+        """Write this process's snapshot if anything changed since the last write"""
+        if not self.snapshot_dir or not self.dirty:
+            return
+        self.dirty = False
+
+        snapshot = self.snapshot()
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = os.path.join(self.snapshot_dir, f"{snapshot['process']}.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(snapshot, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+        self.last_write = time.monotonic()
+
+    def _start_flusher(self):
+        if not self.snapshot_dir or self.flusher is not None:
+            return
+        self.flusher = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+        self.flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if time.monotonic() - self.last_write >= self.heartbeat_interval:
+                # Rewrite unchanged snapshots too, so the orchestrator can tell live processes from dead ones
+                self.dirty = True
+            try:
+                self.flush()
+            except OSError:
+                # Keep recording; the next interval retries the write
+                self.dirty = True
+
+    def _after_fork(self):
+        # A forked worker starts from zero under its own pid and needs its own flusher thread
+        self.flusher = None
+        self.dirty = False
+        self.last_write = 0.0
+        for family in self.families.values():
+            for child in family.children.values():
+                child.reset()
+        if self.families:
+            self._start_flusher()
+
+# Process-wide registry; set METRICS_DIR to the directory the orchestrator reads
+REGISTRY = MetricsRegistry(
+    os.getenv('METRICS_DIR') or None,
+    float(os.getenv('METRICS_FLUSH_SECONDS', 1.0)),
+    float(os.getenv('METRICS_HEARTBEAT_SECONDS', 30.0))
+)
@@ -0,0 +1,137 @@
+import cProfile
+import functools
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from monitoring.instrumentation import get_recorder
+
+logger = logging.getLogger(__name__)
+
+# Fraction of runs profiled without being asked; 0 profiles only runs called with profile=True
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+# Shared with the orchestrator, which serves the stored summaries at /profiles
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/urban-planner-profiles")
+# Most recent profiled runs kept in PROFILE_DIR across all scenarios
+PROFILE_RETENTION = int(os.getenv("PROFILE_RETENTION", 200))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 20))
+
+_profiling = threading.local()
+
+def top_functions(stats: pstats.Stats, limit: int = PROFILE_TOP_N) -> List[Dict[str, Any]]:
+    """Hottest functions by self time"""
+    rows = []
+    for (filename, line, name), (primitive_calls, calls, self_time, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})" if line else name,
+            "calls": calls,
+            "primitive_calls": primitive_calls,
+            "self_seconds": round(self_time, 6),
+            "cumulative_seconds": round(cumulative, 6)
+        })
+    rows.sort(key=lambda row: row["self_seconds"], reverse=True)
+    return rows[:limit]
+
+def _store_profile(profiler: cProfile.Profile, summary: Dict[str, Any]):
+    """Write <PROFILE_DIR>/<scenario>/<run>.prof and a JSON summary beside it"""
+    directory = os.path.join(PROFILE_DIR, str(summary["scenario_id"]))
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{summary['run_id']}.prof")
+        profiler.dump_stats(path)
+        summary["profile_path"] = path
+        with open(os.path.join(directory, f"{summary['run_id']}.json"), "w") as f:
+            json.dump(summary, f, indent=2)
+        _prune_profiles()
+    except OSError as e:
+        logger.warning(f"Failed to store profile {summary['run_id']}: {str(e)}")
+
+def _prune_profiles():
+    """Delete the oldest runs beyond PROFILE_RETENTION, along with emptied scenario directories"""
+    runs = []
+    for scenario in os.listdir(PROFILE_DIR):
+        directory = os.path.join(PROFILE_DIR, scenario)
+        if not os.path.isdir(directory):
+            continue
+        for filename in os.listdir(directory):
+            if filename.endswith(".json"):
+                path = os.path.join(directory, filename)
+                try:
+                    runs.append((os.path.getmtime(path), path[:-len(".json")]))
+                except FileNotFoundError:
+                    continue
+
+    runs.sort(reverse=True)
+    for _, base in runs[PROFILE_RETENTION:]:
+        for path in (f"{base}.json", f"{base}.prof"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        try:
+            os.rmdir(os.path.dirname(base))
+        except OSError:
+            pass
+
+def profiled(worker: str):
+    """Profile an entry point called as fn(self, scenario_id, ...) when asked or sampled
+
+    Pass profile=True to profile one run, or set PROFILE_SAMPLE_RATE to sample runs.
+    Runs that are not profiled only pay for the sampling check. The summary, with the
+    top PROFILE_TOP_N functions by self time, is stored under the scenario and run ID,
+    returned as result['profile'] and shown on the process-wide SLO dashboard. Only the
+    latest PROFILE_RETENTION runs are kept on disk.
+    """
+    def decorator(fn):
+        operation = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(self, scenario_id, *args, profile: Optional[bool] = None, **kwargs):
+            trigger = "request" if profile else None
+            if profile is None and PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+                trigger = "sampled"
+            # cProfile cannot nest within a thread, so inner entry points run unprofiled
+            if trigger is None or getattr(_profiling, "active", False):
+                return fn(self, scenario_id, *args, **kwargs)
+
+            run_id = uuid.uuid4().hex
+            started_at = datetime.utcnow()
+            profiler = cProfile.Profile()
+            _profiling.active = True
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                result = fn(self, scenario_id, *args, **kwargs)
+            finally:
+                profiler.disable()
+                _profiling.active = False
+
+            stats = pstats.Stats(profiler)
+            summary = {
+                "run_id": run_id,
+                "scenario_id": scenario_id,
+                "worker": worker,
+                "operation": operation,
+                "trigger": trigger,
+                "started_at": started_at.isoformat(),
+                "duration_seconds": round(time.perf_counter() - start, 6),
+                "total_calls": stats.total_calls,
+                "profile_path": None,
+                "top_functions": top_functions(stats)
+            }
+            _store_profile(profiler, summary)
+            get_recorder().dashboard.record_profile(summary)
+
+            if isinstance(result, dict):
+                result["profile"] = summary
+            return result
+
+        return wrapper
+
+    return decorator
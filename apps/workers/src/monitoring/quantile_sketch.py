@@ -0,0 +1,247 @@
+import math
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+# Values at or below this (including zero and negatives) share one bucket
+MIN_INDEXABLE_VALUE = 1e-9
+
+class QuantileSketch:
+    """Mergeable log-bucketed quantile sketch with bounded relative error
+
+    Every value lands in bucket ceil(log_gamma(value)), so any quantile is returned
+    within relative_accuracy of the true sample value. Buckets are a dense NumPy range
+    of at most max_bins; when it would grow further the lowest buckets are collapsed,
+    which keeps the tail quantiles SLOs care about exact to the accuracy bound.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.offset = 0
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: int = 1):
+        self.count += weight
+        self.sum += value * weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        if value <= MIN_INDEXABLE_VALUE:
+            self.zero_count += weight
+            return
+
+        index = math.ceil(math.log(value) / self.log_gamma)
+        if not len(self.counts) or index < self.offset or index >= self.offset + len(self.counts):
+            self._extend(index, index)
+        self.counts[max(index, self.offset) - self.offset] += weight
+
+    def add_many(self, values):
+        """Vectorized add for a batch of samples"""
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        positive = values[values > MIN_INDEXABLE_VALUE]
+        self.zero_count += len(values) - len(positive)
+        if not len(positive):
+            return
+
+        indices = np.ceil(np.log(positive) / self.log_gamma).astype(np.int64)
+        self._extend(int(indices.min()), int(indices.max()))
+        indices = np.maximum(indices, self.offset) - self.offset
+        self.counts += np.bincount(indices, minlength=len(self.counts))
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Fold another sketch with the same accuracy into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if not other.count:
+            return self
+
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero_count += other.zero_count
+
+        if len(other.counts):
+            self._extend(other.offset, other.offset + len(other.counts) - 1)
+            start = other.offset - self.offset
+            if start >= 0:
+                self.counts[start:start + len(other.counts)] += other.counts
+            else:
+                # Some of the other sketch's buckets were collapsed into our lowest bucket
+                indices = np.maximum(np.arange(other.offset, other.offset + len(other.counts)), self.offset) - self.offset
+                np.add.at(self.counts, indices, other.counts)
+
+        return self
+
+    def quantiles(self, qs: List[float]) -> np.ndarray:
+        """Estimate several quantiles at once, interpolating between ranks like np.percentile"""
+        if not self.count:
+            return np.full(len(qs), np.nan)
+
+        ranks = np.asarray(qs, dtype=np.float64) * (self.count - 1)
+        lower = np.floor(ranks)
+        upper = np.ceil(ranks)
+        lower_values = self._values_at(lower)
+        upper_values = self._values_at(upper)
+        return lower_values + (upper_values - lower_values) * (ranks - lower)
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def _values_at(self, ranks: np.ndarray) -> np.ndarray:
+        """Representative value of the rank-th smallest sample (0-indexed)"""
+        values = np.zeros(len(ranks))
+        if len(self.counts):
+            cumulative = np.cumsum(self.counts)
+            bins = np.searchsorted(cumulative, ranks - self.zero_count, side='right')
+            bins = np.minimum(bins, len(self.counts) - 1)
+            # Midpoint of (gamma^(i-1), gamma^i] in the relative-error sense
+            values = 2 * np.power(self.gamma, bins + self.offset) / (self.gamma + 1)
+            values = np.where(ranks < self.zero_count, 0.0, values)
+
+        values = np.clip(values, self.min, self.max)
+        # The extremes are tracked exactly
+        values = np.where(ranks <= 0, self.min, values)
+        return np.where(ranks >= self.count - 1, self.max, values)
+
+    def _extend(self, low: int, high: int):
+        """Grow the bucket range to cover [low, high], collapsing the lowest buckets past max_bins"""
+        if not len(self.counts):
+            new_low, new_high = low, high
+        else:
+            new_low = min(low, self.offset)
+            new_high = max(high, self.offset + len(self.counts) - 1)
+            if new_low == self.offset and new_high == self.offset + len(self.counts) - 1:
+                return
+
+        new_low = max(new_low, new_high - self.max_bins + 1)
+        counts = np.zeros(new_high - new_low + 1, dtype=np.int64)
+        if len(self.counts):
+            indices = np.maximum(np.arange(self.offset, self.offset + len(self.counts)), new_low) - new_low
+            np.add.at(counts, indices, self.counts)
+
+        self.counts = counts
+        self.offset = new_low
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe form for shipping sketches between processes"""
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'max_bins': self.max_bins,
+            'offset': self.offset,
+            'counts': self.counts.tolist(),
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuantileSketch':
+        sketch = cls(data['relative_accuracy'], data['max_bins'])
+        sketch.offset = data['offset']
+        sketch.counts = np.asarray(data['counts'], dtype=np.int64)
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        if data['count']:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        return sketch
+
+class SketchSeries:
+    """Quantile sketches and status tallies per fixed time bucket for one metric"""
+
+    def __init__(self, bucket_seconds: int = 300, retention_seconds: int = 30 * 86400,
+                 relative_accuracy: float = 0.01, tally_size: int = 3):
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_seconds
+        self.relative_accuracy = relative_accuracy
+        self.tally_size = tally_size
+        self.buckets: Dict[int, Tuple[QuantileSketch, np.ndarray]] = {}
+        self.newest_bucket: Optional[int] = None
+
+    def add(self, timestamp: float, value: float, tally: int):
+        bucket_start = int(timestamp // self.bucket_seconds) * self.bucket_seconds
+        sketch, tallies = self._bucket(bucket_start)
+        sketch.add(value)
+        tallies[tally] += 1
+
+    def _bucket(self, bucket_start: int) -> Tuple[QuantileSketch, np.ndarray]:
+        bucket = self.buckets.get(bucket_start)
+        if bucket is None:
+            bucket = self.buckets[bucket_start] = (
+                QuantileSketch(self.relative_accuracy), np.zeros(self.tally_size, dtype=np.int64)
+            )
+            if self.newest_bucket is None or bucket_start > self.newest_bucket:
+                self.newest_bucket = bucket_start
+                self._expire()
+        return bucket
+
+    def _expire(self):
+        """Drop buckets older than the retention period so memory stays fixed"""
+        cutoff = self.newest_bucket - self.retention_seconds
+        for bucket_start in [start for start in self.buckets if start < cutoff]:
+            del self.buckets[bucket_start]
+
+    def window(self, since: float) -> Tuple[QuantileSketch, np.ndarray]:
+        """Merged sketch and tallies of every bucket overlapping [since, now]"""
+        merged = QuantileSketch(self.relative_accuracy)
+        tallies = np.zeros(self.tally_size, dtype=np.int64)
+        for bucket_start, (sketch, bucket_tallies) in self.buckets.items():
+            if bucket_start + self.bucket_seconds > since:
+                merged.merge(sketch)
+                tallies += bucket_tallies
+        return merged, tallies
+
+    def merge(self, other: 'SketchSeries') -> 'SketchSeries':
+        """Fold another process's series into this one bucket by bucket"""
+        if other.bucket_seconds != self.bucket_seconds:
+            raise ValueError("Cannot merge series with different bucket sizes")
+        for bucket_start, (sketch, tallies) in other.buckets.items():
+            own_sketch, own_tallies = self._bucket(bucket_start)
+            own_sketch.merge(sketch)
+            own_tallies += tallies
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'bucket_seconds': self.bucket_seconds,
+            'retention_seconds': self.retention_seconds,
+            'relative_accuracy': self.relative_accuracy,
+            'tally_size': self.tally_size,
+            'buckets': [
+                {'start': bucket_start, 'sketch': sketch.to_dict(), 'tallies': tallies.tolist()}
+                for bucket_start, (sketch, tallies) in sorted(self.buckets.items())
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SketchSeries':
+        series = cls(data['bucket_seconds'], data['retention_seconds'], data['relative_accuracy'], data['tally_size'])
+        for bucket in data['buckets']:
+            series.buckets[bucket['start']] = (
+                QuantileSketch.from_dict(bucket['sketch']), np.asarray(bucket['tallies'], dtype=np.int64)
+            )
+        if series.buckets:
+            series.newest_bucket = max(series.buckets)
+        return series
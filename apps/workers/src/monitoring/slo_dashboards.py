@@ -2,10 +2,13 @@
 import json
 import time
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass
+from collections import deque
 from enum import Enum
-import statistics
+import numpy as np
+from monitoring.quantile_sketch import SketchSeries
+from monitoring.openmetrics import MetricsRegistry, REGISTRY
 
 class MetricType(Enum):
     COUNTER = "counter"
@@ -18,14 +21,90 @@ class SLOStatus(Enum):
     YELLOW = "yellow"
     RED = "red"
 
-@dataclass
-class SLOMetric:
-    name: str
-    value: float
-    unit: str
-    timestamp: datetime
-    labels: Dict[str, str]
-    status: SLOStatus
+# Status codes stored in metric ring buffers
+STATUS_CODES = [SLOStatus.GREEN, SLOStatus.YELLOW, SLOStatus.RED]
+STATUS_INDEX = {status: code for code, status in enumerate(STATUS_CODES)}
+
+EPOCH = datetime(1970, 1, 1)
+
+def _to_epoch(timestamp: datetime) -> float:
+    """Seconds since the epoch for naive UTC or timezone-aware datetimes"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - EPOCH).total_seconds()
+
+class MetricRingBuffer:
+    """Fixed-size ring of (timestamp, value, status code, labels) samples for one metric
+
+    Appends overwrite the oldest sample in O(1). While samples arrive in time order
+    the ring holds at most two sorted runs, so window starts are found by binary search.
+    Labels share the ring's slots, so they are bounded by the same capacity.
+    """
+
+    def __init__(self, capacity: int, unit: str):
+        self.capacity = capacity
+        self.unit = unit
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.statuses = np.zeros(capacity, dtype=np.int8)
+        self.labels: List[Optional[Dict[str, str]]] = [None] * capacity
+        self.start = 0
+        self.size = 0
+        self.ordered = True
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, timestamp: float, value: float, status_code: int, labels: Optional[Dict[str, str]] = None):
+        index = (self.start + self.size) % self.capacity
+        if self.size and timestamp < self.timestamps[(index - 1) % self.capacity]:
+            self.ordered = False
+
+        self.timestamps[index] = timestamp
+        self.values[index] = value
+        self.statuses[index] = status_code
+        self.labels[index] = labels
+
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def _runs(self):
+        """The occupied slots as up to two (start, stop) runs, oldest first"""
+        end = self.start + self.size
+        if end <= self.capacity:
+            return [(self.start, end)]
+        return [(self.start, self.capacity), (0, end - self.capacity)]
+
+    def window(self, since: float):
+        """Return (timestamps, values, statuses) of samples at or after since, oldest first"""
+        if not self.ordered:
+            # Out-of-order timestamps were recorded; fall back to a mask over the ring
+            order = np.concatenate([np.arange(a, b) for a, b in self._runs()])
+            order = order[self.timestamps[order] >= since]
+            return self.timestamps[order], self.values[order], self.statuses[order]
+
+        parts = []
+        for run_start, run_stop in self._runs():
+            offset = np.searchsorted(self.timestamps[run_start:run_stop], since, side='left')
+            parts.append(slice(run_start + offset, run_stop))
+
+        return tuple(
+            np.concatenate([array[part] for part in parts])
+            for array in (self.timestamps, self.values, self.statuses)
+        )
+
+    def latest(self, count: int):
+        """Return (timestamps, values, statuses) of the newest count samples, oldest first"""
+        count = min(count, self.size)
+        indices = (self.start + self.size - count + np.arange(count)) % self.capacity
+        return self.timestamps[indices], self.values[indices], self.statuses[indices]
+
+    def latest_labels(self, count: int) -> List[Optional[Dict[str, str]]]:
+        """Labels of the newest count samples, oldest first"""
+        count = min(count, self.size)
+        return [self.labels[(self.start + self.size - count + i) % self.capacity] for i in range(count)]
 
 @dataclass
 class SLOThreshold:
@@ -35,8 +114,18 @@ class SLOThreshold:
     unit: str
 
 class SLODashboard:
-    def __init__(self):
-        self.metrics: Dict[str, List[SLOMetric]] = {}
+    def __init__(self, capacity: int = 10000, bucket_seconds: int = 300, retention_hours: int = 720,
+                 profile_history: int = 50):
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self.retention_hours = retention_hours
+        # Recent raw samples for alerts and current status
+        self.metrics: Dict[str, MetricRingBuffer] = {}
+        # Per-bucket quantile sketches for window summaries over any number of samples
+        self.sketches: Dict[str, SketchSeries] = {}
+        self.units: Dict[str, str] = {}
+        # Summaries of recently profiled model runs, newest last
+        self.profiles = deque(maxlen=profile_history)
         self.thresholds = self._create_thresholds()
         self.slos = self._create_slos()
     
@@ -142,32 +231,42 @@ class SLODashboard:
     def record_metric(self, name: str, value: float, unit: str, 
                      labels: Dict[str, str] = None, timestamp: datetime = None):
         """Record a new metric value"""
-        if name not in self.metrics:
-            self.metrics[name] = []
+        buffer = self.metrics.get(name)
+        if buffer is None:
+            buffer = self.metrics[name] = MetricRingBuffer(self.capacity, unit)
+            self.units.setdefault(name, unit)
         
         if timestamp is None:
             timestamp = datetime.utcnow()
         
-        if labels is None:
-            labels = {}
-        
         # Determine status based on thresholds
         status = self._calculate_status(name, value)
         
-        metric = SLOMetric(
-            name=name,
-            value=value,
-            unit=unit,
-            timestamp=timestamp,
-            labels=labels,
-            status=status
-        )
-        
-        self.metrics[name].append(metric)
-        
-        # Keep only last 1000 metrics per name
-        if len(self.metrics[name]) > 1000:
-            self.metrics[name] = self.metrics[name][-1000:]
+        # Labels stay with the raw sample in the ring; sketches aggregate over all labels
+        epoch_seconds = _to_epoch(timestamp)
+        buffer.append(epoch_seconds, value, STATUS_INDEX[status], dict(labels) if labels else None)
+        self._series(name).add(epoch_seconds, value, STATUS_INDEX[status])
+    
+    def _series(self, name: str) -> SketchSeries:
+        series = self.sketches.get(name)
+        if series is None:
+            series = self.sketches[name] = SketchSeries(
+                self.bucket_seconds, self.retention_hours * 3600, tally_size=len(STATUS_CODES)
+            )
+        return series
+    
+    def export_sketches(self) -> Dict[str, Any]:
+        """Serializable sketches for merging this process's metrics into another dashboard"""
+        return {
+            name: {"unit": self.units.get(name), "series": series.to_dict()}
+            for name, series in self.sketches.items()
+        }
+    
+    def merge_sketches(self, exported: Dict[str, Any]):
+        """Merge sketches exported by another worker process into this dashboard"""
+        for name, data in exported.items():
+            self.units.setdefault(name, data["unit"])
+            self._series(name).merge(SketchSeries.from_dict(data["series"]))
     
     def _calculate_status(self, metric_name: str, value: float) -> SLOStatus:
         """Calculate status based on thresholds"""
@@ -195,52 +294,63 @@ class SLODashboard:
     
     def get_metric_summary(self, name: str, window_hours: int = 24) -> Dict[str, Any]:
         """Get summary statistics for a metric over time window"""
-        if name not in self.metrics:
+        if name not in self.sketches:
             return {}
         
-        cutoff_time = datetime.utcnow() - timedelta(hours=window_hours)
-        recent_metrics = [
-            m for m in self.metrics[name] 
-            if m.timestamp >= cutoff_time
-        ]
+        cutoff_time = _to_epoch(datetime.utcnow() - timedelta(hours=window_hours))
+        sketch, status_counts = self.sketches[name].window(cutoff_time)
         
-        if not recent_metrics:
+        if not sketch.count:
             return {}
         
-        values = [m.value for m in recent_metrics]
-        statuses = [m.status for m in recent_metrics]
+        p50, p95, p99 = sketch.quantiles([0.5, 0.95, 0.99])
+        
+        # Only this process's ring knows the latest sample
+        buffer = self.metrics.get(name)
+        current_status = None
+        if buffer is not None and len(buffer):
+            timestamps, _, statuses = buffer.latest(1)
+            if timestamps[0] < cutoff_time:
+                # The newest sample was backdated; use the newest one inside the window
+                timestamps, _, statuses = buffer.window(cutoff_time)
+            if len(statuses):
+                current_status = STATUS_CODES[statuses[-1]]
         
         return {
             "metric_name": name,
             "window_hours": window_hours,
-            "count": len(recent_metrics),
-            "min": min(values),
-            "max": max(values),
-            "mean": statistics.mean(values),
-            "median": statistics.median(values),
-            "p95": self._percentile(values, 95),
-            "p99": self._percentile(values, 99),
+            "count": int(sketch.count),
+            "min": float(sketch.min),
+            "max": float(sketch.max),
+            "mean": sketch.sum / sketch.count,
+            "median": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
             "status_distribution": {
-                "green": statuses.count(SLOStatus.GREEN),
-                "yellow": statuses.count(SLOStatus.YELLOW),
-                "red": statuses.count(SLOStatus.RED)
+                "green": int(status_counts[STATUS_INDEX[SLOStatus.GREEN]]),
+                "yellow": int(status_counts[STATUS_INDEX[SLOStatus.YELLOW]]),
+                "red": int(status_counts[STATUS_INDEX[SLOStatus.RED]])
             },
-            "current_status": recent_metrics[-1].status if recent_metrics else None,
-            "unit": recent_metrics[0].unit if recent_metrics else None
+            "current_status": current_status,
+            "unit": self.units.get(name)
         }
     
-    def _percentile(self, values: List[float], percentile: int) -> float:
-        """Calculate percentile of values"""
-        if not values:
-            return 0.0
-        sorted_values = sorted(values)
-        index = (percentile / 100) * (len(sorted_values) - 1)
-        if index.is_integer():
-            return sorted_values[int(index)]
-        else:
-            lower = sorted_values[int(index)]
-            upper = sorted_values[int(index) + 1]
-            return lower + (upper - lower) * (index - int(index))
+    def get_recent_samples(self, name: str, count: int = 20) -> List[Dict[str, Any]]:
+        """Newest raw samples of a metric with the labels they were recorded with, oldest first"""
+        buffer = self.metrics.get(name)
+        if buffer is None:
+            return []
+        
+        timestamps, values, statuses = buffer.latest(count)
+        return [
+            {
+                "timestamp": datetime.utcfromtimestamp(timestamp).isoformat(),
+                "value": float(value),
+                "status": STATUS_CODES[status].value,
+                "labels": labels or {}
+            }
+            for timestamp, value, status, labels in zip(timestamps, values, statuses, buffer.latest_labels(count))
+        ]
     
     def get_slo_dashboard(self, window_hours: int = 24) -> Dict[str, Any]:
         """Get comprehensive SLO dashboard data"""
@@ -249,11 +359,12 @@ class SLODashboard:
             "window_hours": window_hours,
             "slo_status": {},
             "metric_summaries": {},
-            "alerts": []
+            "alerts": [],
+            "profiles": self.get_profiles()
         }
         
         # Get summaries for all metrics
-        for metric_name in self.metrics.keys():
+        for metric_name in self.sketches.keys():
             summary = self.get_metric_summary(metric_name, window_hours)
             if summary:
                 dashboard["metric_summaries"][metric_name] = summary
@@ -269,6 +380,17 @@ class SLODashboard:
         
         return dashboard
     
+    def record_profile(self, summary: Dict[str, Any]):
+        """Keep a profiled run's summary for the dashboard"""
+        self.profiles.append(summary)
+    
+    def get_profiles(self, limit: int = 10, top_n: int = 10) -> List[Dict[str, Any]]:
+        """Most recent profiled runs with their top_n hottest functions, newest first"""
+        return [
+            dict(summary, top_functions=summary["top_functions"][:top_n])
+            for summary in list(self.profiles)[::-1][:limit]
+        ]
+    
     def _calculate_slo_status(self, service: str, slo_config: Dict[str, Any], 
                             window_hours: int) -> Dict[str, Any]:
         """Calculate SLO status for a service"""
@@ -297,38 +419,42 @@ class SLODashboard:
         """Generate alerts based on current metrics"""
         alerts = []
         
-        for metric_name, metrics in self.metrics.items():
-            if not metrics:
+        cutoff_time = _to_epoch(datetime.utcnow() - timedelta(hours=window_hours))
+        red_code = STATUS_INDEX[SLOStatus.RED]
+        yellow_code = STATUS_INDEX[SLOStatus.YELLOW]
+        
+        for metric_name, buffer in self.metrics.items():
+            if not len(buffer):
                 continue
             
-            recent_metrics = [
-                m for m in metrics[-100:]  # Last 100 metrics
-                if m.timestamp >= datetime.utcnow() - timedelta(hours=window_hours)
-            ]
+            # Last 100 metrics
+            timestamps, _, statuses = buffer.latest(100)
+            recent = timestamps >= cutoff_time
+            timestamps, statuses = timestamps[recent], statuses[recent]
             
-            if not recent_metrics:
+            if not len(timestamps):
                 continue
             
             # Check for consecutive failures
-            red_metrics = [m for m in recent_metrics if m.status == SLOStatus.RED]
-            if len(red_metrics) >= 3:
+            red_timestamps = timestamps[statuses == red_code]
+            if len(red_timestamps) >= 3:
                 alerts.append({
                     "severity": "critical",
                     "metric": metric_name,
                     "message": f"Critical threshold exceeded for {metric_name}",
-                    "count": len(red_metrics),
-                    "timestamp": red_metrics[-1].timestamp.isoformat()
+                    "count": int(len(red_timestamps)),
+                    "timestamp": (EPOCH + timedelta(seconds=float(red_timestamps[-1]))).isoformat()
                 })
             
             # Check for degradation trend
-            yellow_metrics = [m for m in recent_metrics if m.status == SLOStatus.YELLOW]
-            if len(yellow_metrics) >= 5:
+            yellow_timestamps = timestamps[statuses == yellow_code]
+            if len(yellow_timestamps) >= 5:
                 alerts.append({
                     "severity": "warning",
                     "metric": metric_name,
                     "message": f"Performance degradation detected for {metric_name}",
-                    "count": len(yellow_metrics),
-                    "timestamp": yellow_metrics[-1].timestamp.isoformat()
+                    "count": int(len(yellow_timestamps)),
+                    "timestamp": (EPOCH + timedelta(seconds=float(yellow_timestamps[-1]))).isoformat()
                 })
         
         return alerts
@@ -342,10 +468,78 @@ class SLODashboard:
         else:
             raise ValueError(f"Unsupported format: {format}")
 
+# Histogram upper bounds per operation; each includes the SLO target, warning and critical
+# thresholds so breaches can be counted exactly from the exported buckets
+# Process-wide dashboard shared by UrbanPlannerMonitor and the worker timing recorder
+DASHBOARD = SLODashboard()
+
+DEFAULT_BUCKETS = {
+    "parcelization_duration": (1, 5, 10, 30, 60, 120, 300, 600),
+    "model_run_duration": (30, 60, 120, 300, 600, 1200, 1800, 3600),
+    "optimizer_duration": (300, 900, 1800, 3600, 7200, 14400),
+    "export_duration": (5, 15, 30, 60, 120, 300, 600),
+    "export_file_size": tuple(mb * 1024 * 1024 for mb in (1, 10, 50, 100, 200, 500))
+}
+
 # Example usage and monitoring functions
 class UrbanPlannerMonitor:
-    def __init__(self):
-        self.dashboard = SLODashboard()
+    def __init__(self, registry: MetricsRegistry = None, buckets: Dict[str, Any] = None,
+                 dashboard: SLODashboard = None):
+        self.dashboard = dashboard if dashboard is not None else DASHBOARD
+        self.registry = registry if registry is not None else REGISTRY
+        self.buckets = dict(DEFAULT_BUCKETS, **(buckets or {}))
+        self._create_metrics()
+    
+    def _create_metrics(self):
+        """Register the OpenMetrics families exported for every monitored operation"""
+        registry = self.registry
+        buckets = self.buckets
+        # Site and scenario IDs stay on the dashboard's raw samples (get_recent_samples);
+        # as metric labels they would create an unbounded number of series
+        self.parcelization_seconds = registry.histogram(
+            "urban_planner_parcelization_duration_seconds", "Parcelization run time",
+            buckets["parcelization_duration"], unit="seconds"
+        )
+        self.parcelizations = registry.counter(
+            "urban_planner_parcelizations", "Parcelization runs by outcome", ["outcome"]
+        )
+        self.parcelization_accuracy = registry.gauge(
+            "urban_planner_parcelization_accuracy_percent", "Accuracy of the latest parcelization", unit="percent"
+        )
+        
+        self.model_run_seconds = registry.histogram(
+            "urban_planner_model_run_duration_seconds", "Model run time",
+            buckets["model_run_duration"], ["model_type"], unit="seconds"
+        )
+        self.model_runs = registry.counter(
+            "urban_planner_model_runs", "Model runs by outcome", ["model_type", "outcome"]
+        )
+        self.model_run_queue_depth = registry.gauge(
+            "urban_planner_model_run_queue_depth", "Jobs queued behind the latest model run", ["model_type"]
+        )
+        
+        self.optimizer_seconds = registry.histogram(
+            "urban_planner_optimizer_duration_seconds", "Optimizer run time",
+            buckets["optimizer_duration"], unit="seconds"
+        )
+        self.optimizer_runs = registry.counter(
+            "urban_planner_optimizer_runs", "Optimizer runs by outcome", ["outcome"]
+        )
+        self.optimizer_pareto_points = registry.gauge(
+            "urban_planner_optimizer_pareto_points", "Pareto front size of the latest optimizer run"
+        )
+        
+        self.export_seconds = registry.histogram(
+            "urban_planner_export_duration_seconds", "Export run time",
+            buckets["export_duration"], ["export_type"], unit="seconds"
+        )
+        self.exports = registry.counter(
+            "urban_planner_exports", "Exports by outcome", ["export_type", "outcome"]
+        )
+        self.export_file_size = registry.histogram(
+            "urban_planner_export_file_size_bytes", "Size of exported files",
+            buckets["export_file_size"], ["export_type"], unit="bytes"
+        )
     
     def monitor_parcelization(self, site_id: str, duration: float, 
                             success: bool, accuracy: float = None):
@@ -361,11 +555,15 @@ class UrbanPlannerMonitor:
             {"site_id": site_id, "operation": "parcelization"}
         )
         
+        self.parcelization_seconds.observe(duration)
+        self.parcelizations.labels("success" if success else "failure").inc()
+        
         if accuracy is not None:
             self.dashboard.record_metric(
                 "parcelization_accuracy", accuracy, "percent",
                 {"site_id": site_id, "operation": "parcelization"}
             )
+            self.parcelization_accuracy.set(accuracy)
     
     def monitor_model_run(self, model_type: str, duration: float, 
                          success: bool, queue_depth: int = None):
@@ -381,11 +579,15 @@ class UrbanPlannerMonitor:
             {"model_type": model_type}
         )
         
+        self.model_run_seconds.labels(model_type).observe(duration)
+        self.model_runs.labels(model_type, "success" if success else "failure").inc()
+        
         if queue_depth is not None:
             self.dashboard.record_metric(
                 "model_run_queue_depth", queue_depth, "jobs",
                 {"model_type": model_type}
             )
+            self.model_run_queue_depth.labels(model_type).set(queue_depth)
     
     def monitor_optimizer(self, scenario_id: str, duration: float, 
                          success: bool, pareto_points: int = None):
@@ -401,11 +603,15 @@ class UrbanPlannerMonitor:
             {"scenario_id": scenario_id}
         )
         
+        self.optimizer_seconds.observe(duration)
+        self.optimizer_runs.labels("success" if success else "failure").inc()
+        
         if pareto_points is not None:
             self.dashboard.record_metric(
                 "optimizer_pareto_points", pareto_points, "points",
                 {"scenario_id": scenario_id}
             )
+            self.optimizer_pareto_points.set(pareto_points)
     
     def monitor_export(self, export_type: str, duration: float, 
                       success: bool, file_size_mb: float = None):
@@ -421,11 +627,15 @@ class UrbanPlannerMonitor:
             {"export_type": export_type}
         )
         
+        self.export_seconds.labels(export_type).observe(duration)
+        self.exports.labels(export_type, "success" if success else "failure").inc()
+        
         if file_size_mb is not None:
             self.dashboard.record_metric(
                 "export_file_size", file_size_mb, "MB",
                 {"export_type": export_type}
             )
+            self.export_file_size.labels(export_type).observe(file_size_mb * 1024 * 1024)
     
     def get_dashboard(self) -> Dict[str, Any]:
         """Get current dashboard state"""
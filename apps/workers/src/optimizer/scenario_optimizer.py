@@ -10,6 +10,9 @@ import numpy as np
 from scipy.optimize import minimize, differential_evolution
 from itertools import combinations
 import random
+from sustainability.sustainability_score import SustainabilityScore
+from monitoring.instrumentation import instrumented, annotate
+from monitoring.profiling import profiled
 
 load_dotenv()
 
@@ -57,6 +60,12 @@ class ScenarioOptimizer:
             'min_parking_spaces': 0.8  # 80% of calculated need
         }
 
+        # 'simplified' uses the built-in stand-in; 'full' batch-scores candidates with SustainabilityScore
+        self.sustainability_model = os.getenv('OPTIMIZER_SUSTAINABILITY_MODEL', 'simplified')
+        self.sustainability_scorer = SustainabilityScore()
+
+    @instrumented('optimizer')
+    @profiled('optimizer')
     def optimize_scenario(self, scenario_id: str, optimization_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate Pareto optimal solutions for a scenario"""
         try:
@@ -103,6 +112,7 @@ class ScenarioOptimizer:
             logger.error(f"Error optimizing scenario: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    @instrumented('optimizer', 'db_fetch')
     def _get_scenario_data(self, scenario_id: str) -> Optional[Dict[str, Any]]:
         """Get scenario data for optimization"""
         conn = psycopg2.connect(**self.db_config)
@@ -145,6 +155,7 @@ class ScenarioOptimizer:
             """
             cursor.execute(query, (scenario_id,))
             links = cursor.fetchall()
+            annotate(rows=1 + len(parcels) + len(links))
 
             return {
                 'scenario': scenario,
@@ -165,28 +176,26 @@ class ScenarioOptimizer:
             self.objectives.update(params['objectives'])
         if 'constraints' in params:
             self.constraints.update(params['constraints'])
+        if 'sustainability_model' in params:
+            self.sustainability_model = params['sustainability_model']
 
     def _generate_pareto_solutions(self, baseline_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate Pareto optimal solutions using multi-objective optimization"""
-        solutions = []
-        
-        # Generate baseline solution
-        baseline_solution = self._evaluate_solution(baseline_data, baseline_data)
-        baseline_solution['name'] = 'Baseline'
-        baseline_solution['parameters'] = self._extract_baseline_parameters(baseline_data)
-        solutions.append(baseline_solution)
-
-        # Generate random parameter combinations
+        # Baseline parameters followed by random parameter combinations within ranges
         num_solutions = 20
+        parameter_sets = [self._extract_baseline_parameters(baseline_data)]
         for i in range(num_solutions):
-            # Generate random parameters within ranges
             params = {}
             for param, range_info in self.parameter_ranges.items():
                 params[param] = random.uniform(range_info['min'], range_info['max'])
-            
-            # Evaluate solution
-            solution = self._evaluate_solution(baseline_data, baseline_data, params)
-            solution['name'] = f'Solution {i+1}'
+            parameter_sets.append(params)
+
+        sustainability_scores = self._score_candidates(baseline_data, parameter_sets)
+
+        solutions = []
+        for i, (params, sustainability_score) in enumerate(zip(parameter_sets, sustainability_scores)):
+            solution = self._evaluate_solution(baseline_data, baseline_data, params, sustainability_score)
+            solution['name'] = 'Baseline' if i == 0 else f'Solution {i}'
             solution['parameters'] = params
             solutions.append(solution)
 
@@ -195,8 +204,18 @@ class ScenarioOptimizer:
         
         return pareto_solutions
 
+    def _score_candidates(self, baseline_data: Dict[str, Any], parameter_sets: List[Dict[str, Any]]) -> List[Optional[float]]:
+        """Batch-score candidate scenarios with the full sustainability model when enabled"""
+        if self.sustainability_model != 'full':
+            return [None] * len(parameter_sets)
+        
+        candidates = [self._apply_parameters_to_scenario(baseline_data, params) for params in parameter_sets]
+        batch = self.sustainability_scorer.score_scenario_data_batch(candidates)
+        return [float(score) for score in batch['overall_scores']]
+
     def _evaluate_solution(self, baseline_data: Dict[str, Any], scenario_data: Dict[str, Any], 
-                          parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                          parameters: Optional[Dict[str, Any]] = None,
+                          sustainability_score: Optional[float] = None) -> Dict[str, Any]:
         """Evaluate a solution and calculate objectives"""
         
         # Use baseline data if no parameters provided
@@ -206,8 +225,9 @@ class ScenarioOptimizer:
         # Calculate modified scenario based on parameters
         modified_scenario = self._apply_parameters_to_scenario(scenario_data, parameters)
         
-        # Calculate objectives
-        sustainability_score = self._calculate_sustainability_score(modified_scenario)
+        # Calculate objectives; a precomputed sustainability score comes from the batch model
+        if sustainability_score is None:
+            sustainability_score = self._calculate_sustainability_score(modified_scenario)
         cost_efficiency = self._calculate_cost_efficiency(modified_scenario)
         density = self._calculate_density(modified_scenario)
         accessibility = self._calculate_accessibility(modified_scenario)
@@ -531,6 +551,7 @@ class ScenarioOptimizer:
             'baseline_score': baseline_solution['total_score']
         }
 
+    @instrumented('optimizer', 'store')
     def _store_optimization_results(self, scenario_id: str, results: Dict[str, Any]):
         """Store optimization results in database"""
         conn = psycopg2.connect(**self.db_config)
@@ -548,9 +569,11 @@ class ScenarioOptimizer:
             updated_at = NOW()
             WHERE id = %s
             """
-            cursor.execute(query, (json.dumps(results), scenario_id))
+            payload = json.dumps(results)
+            cursor.execute(query, (payload, scenario_id))
             
             conn.commit()
+            annotate(payload_bytes=len(payload))
             
         except Exception as e:
             conn.rollback()
@@ -0,0 +1,50 @@
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ChartCache:
+    """Byte-bounded LRU of rendered chart images keyed by (chart type, input revision, theme, format)"""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv('REPORT_CHART_CACHE_BYTES', 64 * 1024 * 1024))
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        """Return cached image bytes (b'' for a chart with no data), or None on a miss"""
+        with self.lock:
+            image = self.entries.get(key)
+            if image is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return image
+
+    def put(self, key: Tuple, image: bytes):
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= len(self.entries.pop(key))
+            self.entries[key] = image
+            self.total_bytes += len(image)
+
+            while self.total_bytes > self.max_bytes and self.entries:
+                evicted_key, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+                self.stats['evictions'] += 1
+                logger.info(f"Evicted cached chart {evicted_key[0]} ({len(evicted)} bytes)")
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
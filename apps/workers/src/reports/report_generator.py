@@ -1,16 +1,28 @@
 # Created automatically by Cursor AI (2025-08-25)
 import json
 import logging
-from typing import Dict, Any, List, Optional
+import multiprocessing
+from typing import Dict, Any, List, Optional, BinaryIO, Tuple, Callable
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+import atexit
 import base64
 from io import BytesIO
-import matplotlib.pyplot as plt
+import hashlib
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.patches as patches
+from matplotlib.collections import PolyCollection, LineCollection
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_pdf import PdfPages
 import numpy as np
 import pandas as pd
@@ -20,16 +32,227 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.utils import ImageReader
 import geopandas as gpd
+import shapely
 from shapely.geometry import Point, Polygon
-import folium
-from folium import plugins
+from reports.chart_cache import ChartCache
+from reports.section_cache import SectionCache
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bar colours per chart theme; 'print' keeps charts legible on greyscale printers
+CHART_THEMES = {
+    'default': ['#3B82F6', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6', '#06B6D4'],
+    'print': ['#1F2937', '#4B5563', '#6B7280', '#9CA3AF', '#374151', '#D1D5DB']
+}
+
+def _figure_bytes(fig: Figure, image_format: str, dpi: int) -> bytes:
+    """Serialize a figure; figures are created without pyplot so threads can render concurrently"""
+    img_buffer = BytesIO()
+    fig.savefig(img_buffer, format=image_format, dpi=dpi, bbox_inches='tight')
+    return img_buffer.getvalue()
+
+def _render_capacity_chart(kpis: Dict[str, Any], palette: List[str], image_format: str, dpi: int) -> Optional[bytes]:
+    """Render the development capacity chart"""
+    if 'capacity_analysis' not in kpis:
+        return None
+
+    capacity = kpis['capacity_analysis']
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+
+    categories = ['Units', 'Population', 'Jobs']
+    values = [
+        capacity.get('total_units', 0),
+        capacity.get('total_population', 0),
+        capacity.get('total_jobs', 0)
+    ]
+
+    bars = ax.bar(categories, values, color=palette[:3])
+    ax.set_title('Development Capacity', fontsize=16, fontweight='bold')
+    ax.set_ylabel('Count', fontsize=12)
+
+    # Add value labels on bars
+    for bar, value in zip(bars, values):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
+               f'{value:,}', ha='center', va='bottom', fontweight='bold')
+
+    fig.tight_layout()
+    return _figure_bytes(fig, image_format, dpi)
+
+def _render_sustainability_chart(kpis: Dict[str, Any], palette: List[str], image_format: str, dpi: int) -> Optional[bytes]:
+    """Render the sustainability score chart"""
+    if 'sustainability_score' not in kpis:
+        return None
+
+    category_scores = kpis['sustainability_score'].get('category_scores', {})
+    if not category_scores:
+        return None
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+
+    categories = list(category_scores.keys())
+    scores = [category_scores[cat]['score'] for cat in categories]
+
+    bars = ax.bar(categories, scores, color=palette)
+    ax.set_title('Sustainability Scores by Category', fontsize=16, fontweight='bold')
+    ax.set_ylabel('Score', fontsize=12)
+    ax.set_ylim(0, 100)
+
+    # Add value labels on bars
+    for bar, score in zip(bars, scores):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 1,
+               f'{score:.1f}', ha='center', va='bottom', fontweight='bold')
+
+    ax.tick_params(axis='x', rotation=45)
+    fig.tight_layout()
+    return _figure_bytes(fig, image_format, dpi)
+
+def _render_budget_chart(kpis: Dict[str, Any], palette: List[str], image_format: str, dpi: int) -> Optional[bytes]:
+    """Render the budget breakdown chart"""
+    if 'budget_analysis' not in kpis:
+        return None
+
+    breakdown = kpis['budget_analysis'].get('total', {}).get('breakdown', {})
+    if not breakdown:
+        return None
+
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+
+    categories = list(breakdown.keys())
+
+    # Convert to millions for readability
+    values_millions = [breakdown[cat] / 1000000 for cat in categories]
+
+    bars = ax.bar(categories, values_millions, color=palette[:3])
+    ax.set_title('Budget Breakdown', fontsize=16, fontweight='bold')
+    ax.set_ylabel('Cost (Millions USD)', fontsize=12)
+
+    # Add value labels on bars
+    for bar, value in zip(bars, values_millions):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
+               f'${value:.1f}M', ha='center', va='bottom', fontweight='bold')
+
+    ax.tick_params(axis='x', rotation=45)
+    fig.tight_layout()
+    return _figure_bytes(fig, image_format, dpi)
+
+# Chart type -> (renderer, title, description), in report order
+CHART_RENDERERS = {
+    'capacity': (_render_capacity_chart, 'Development Capacity',
+                 'Total development capacity in units, population, and jobs'),
+    'sustainability': (_render_sustainability_chart, 'Sustainability Scores',
+                       'Sustainability performance by category'),
+    'budget': (_render_budget_chart, 'Budget Breakdown', 'Project budget breakdown by category')
+}
+
+# Scenario inputs each chart reads
+CHART_DEPENDENCIES = {
+    'capacity': ('kpis.capacity_analysis',),
+    'sustainability': ('kpis.sustainability_score',),
+    'budget': ('kpis.budget_analysis',)
+}
+
+def _render_chart(chart_type: str, kpis: Dict[str, Any], theme: str, image_format: str, dpi: int) -> bytes:
+    """Process pool entry point; returns b'' when the scenario has no data for the chart"""
+    renderer = CHART_RENDERERS[chart_type][0]
+    return renderer(kpis, CHART_THEMES[theme], image_format, dpi) or b''
+
+# Land use fill colours and link class (colour, line width) for static report maps
+LAND_USE_COLORS = {
+    'residential': '#3B82F6',
+    'commercial': '#EF4444',
+    'mixed_use': '#10B981'
+}
+
+LINK_STYLES = {
+    'arterial': ('#DC2626', 2.0),
+    'collector': ('#F97316', 1.4),
+    'local': ('#EAB308', 0.8)
+}
+
+def _parcel_land_use(properties: Optional[Dict[str, Any]]) -> str:
+    use_mix = (properties or {}).get('useMix', {})
+    if use_mix.get('residential', 0) > 0.5:
+        return 'residential'
+    if use_mix.get('commercial', 0) > 0.5:
+        return 'commercial'
+    return 'mixed_use'
+
+def _geometry_paths(geojson: List[Optional[str]], polygons: bool):
+    """Parse GeoJSON geometries in one pass into vertex arrays plus the row index of each path
+
+    Polygons contribute their exterior rings; holes are not drawn at report scale.
+    """
+    geometries = shapely.from_geojson(np.array(geojson, dtype=object), on_invalid='ignore')
+    parts, owners = shapely.get_parts(geometries, return_index=True)
+
+    keep = shapely.get_type_id(parts) == (3 if polygons else 1)
+    keep &= ~shapely.is_empty(parts)
+    parts, owners = parts[keep], owners[keep]
+    if polygons:
+        parts = shapely.get_exterior_ring(parts)
+
+    if len(parts) == 0:
+        return [], owners
+
+    coords, path_index = shapely.get_coordinates(parts, return_index=True)
+    paths = np.split(coords, np.flatnonzero(np.diff(path_index)) + 1)
+    return paths, owners
+
+def _render_site_map(parcel_paths: List[np.ndarray], parcel_colors: List[str], link_paths: List[np.ndarray],
+                     link_colors: List[str], link_widths: List[float], title: str, image_format: str, dpi: int) -> bytes:
+    """Draw parcels and links as two batched collections"""
+    fig = Figure(figsize=(8, 8))
+    ax = fig.subplots()
+
+    if parcel_paths:
+        ax.add_collection(PolyCollection(
+            parcel_paths, facecolors=parcel_colors, edgecolors='#1F2937', linewidths=0.2, alpha=0.75
+        ))
+    if link_paths:
+        ax.add_collection(LineCollection(link_paths, colors=link_colors, linewidths=link_widths, alpha=0.9))
+
+    ax.autoscale_view()
+    # Geometries are WGS84 degrees; stretch latitude so shapes are not squashed
+    y_min, y_max = ax.get_ylim()
+    ax.set_aspect(1 / max(np.cos(np.radians((y_min + y_max) / 2)), 0.1))
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_axis_off()
+
+    return _figure_bytes(fig, image_format, dpi)
+
+# Scenario inputs each section reads; sections with no inputs are static text.
+# 'scenario' is the scenario summary row, 'parcels'/'links' the active rows and
+# 'kpis.<name>' a single analysis result.
+SECTION_DEPENDENCIES = {
+    'overview': ('scenario', 'parcels'),
+    'key_findings': ('kpis.capacity_analysis', 'kpis.budget_analysis', 'kpis.sustainability_score', 'kpis.network_analysis'),
+    'recommendations': (),
+    'next_steps': (),
+    'methodology': (),
+    'data_analysis': ('parcels', 'links'),
+    'results': ('kpis.capacity_analysis', 'kpis.network_analysis', 'kpis.sustainability_score'),
+    'discussion': (),
+    'conclusions': (),
+    'impacts': (),
+    'benefits': (),
+    'timeline': (),
+    'engagement': (),
+    'community_benefits': (),
+    'feedback': ()
+}
+
 class ReportGenerator:
     def __init__(self):
         self.db_config = {
@@ -40,6 +263,26 @@ class ReportGenerator:
             'password': os.getenv('POSTGRES_PASSWORD', 'dev_password')
         }
 
+        # Chart rendering configuration
+        self.chart_config = {
+            'workers': int(os.getenv('REPORT_CHART_WORKERS', 3)),
+            'dpi': int(os.getenv('REPORT_CHART_DPI', 300)),
+            'map_dpi': int(os.getenv('REPORT_MAP_DPI', 150)),
+            'cache_enabled': os.getenv('REPORT_CHART_CACHE_ENABLED', 'true').lower() == 'true'
+        }
+        self.chart_cache = ChartCache()
+        self.section_cache = SectionCache()
+        self._chart_pool = None
+        self._chart_pool_lock = threading.Lock()
+        self._pdf_styles = None
+
+        # PDF assembly configuration
+        self.pdf_config = {
+            'spool_max_bytes': int(os.getenv('REPORT_SPOOL_MAX_BYTES', 32 * 1024 * 1024)),
+            'copy_chunk_bytes': 1024 * 1024,
+            'batch_workers': int(os.getenv('REPORT_BATCH_WORKERS', 4))
+        }
+
         # Report templates
         self.report_templates = {
             'executive_summary': {
@@ -69,9 +312,26 @@ class ReportGenerator:
         }
 
     def generate_report(self, scenario_id: str, report_type: str = 'executive_summary', 
-                       output_format: str = 'pdf') -> Dict[str, Any]:
-        """Generate a comprehensive report for a scenario"""
+                       output_format: str = 'pdf', theme: str = 'default', delivery: str = 'bytes',
+                       output: Optional[BinaryIO] = None) -> Dict[str, Any]:
+        """Generate a comprehensive report for a scenario
+
+        delivery 'bytes' returns the raw PDF, 'stream' writes it to output, and
+        'base64' returns the legacy pdf_base64 string.
+        """
         try:
+            if output_format != 'pdf':
+                return {
+                    'success': False,
+                    'error': f'Unsupported output format: {output_format}'
+                }
+
+            if delivery not in ('bytes', 'stream', 'base64'):
+                return {'success': False, 'error': f'Unsupported delivery mode: {delivery}'}
+
+            if delivery == 'stream' and output is None:
+                return {'success': False, 'error': 'Stream delivery requires an output stream'}
+
             # Get scenario data
             scenario_data = self._get_scenario_data(scenario_id)
             if not scenario_data:
@@ -81,52 +341,207 @@ class ReportGenerator:
             if report_type not in self.report_templates:
                 return {'success': False, 'error': f'Invalid report type: {report_type}'}
 
-            template = self.report_templates[report_type]
-            
-            # Generate report content
-            report_content = self._generate_report_content(scenario_data, template)
-            
-            # Generate charts and maps
-            charts = []
-            maps = []
-            if template['include_charts']:
-                charts = self._generate_charts(scenario_data)
-            if template['include_maps']:
-                maps = self._generate_maps(scenario_data)
+            if theme not in CHART_THEMES:
+                return {'success': False, 'error': f'Invalid chart theme: {theme}'}
 
-            # Create PDF report
-            if output_format == 'pdf':
-                pdf_path = self._create_pdf_report(report_content, charts, maps, template)
-                
-                # Read PDF file and encode as base64
-                with open(pdf_path, 'rb') as f:
-                    pdf_content = f.read()
-                pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
-                
-                # Clean up temporary file
-                os.remove(pdf_path)
-                
-                return {
-                    'success': True,
-                    'message': f'Generated {template["name"]} report',
-                    'data': {
-                        'report_type': report_type,
-                        'template_name': template['name'],
-                        'pdf_base64': pdf_base64,
-                        'file_size': len(pdf_content),
-                        'generated_at': datetime.now().isoformat()
-                    }
-                }
-            else:
-                return {
-                    'success': False,
-                    'error': f'Unsupported output format: {output_format}'
-                }
+            data = self._render_report(scenario_data, report_type, theme, delivery, output, {})
+
+            return {
+                'success': True,
+                'message': f'Generated {data["template_name"]} report',
+                'data': data
+            }
 
         except Exception as e:
             logger.error(f"Error generating report: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    def generate_reports_batch(self, requests: List[Tuple[str, str]], theme: str = 'default',
+                               delivery: str = 'bytes', output_factory: Optional[Callable[[str, str], BinaryIO]] = None,
+                               max_workers: Optional[int] = None,
+                               on_report: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Generate reports for (scenario_id, report_type) pairs and return a manifest
+
+        Each scenario is fetched once and all of its templates are rendered by the same
+        worker, so at most max_workers scenarios are held in memory. With 'stream'
+        delivery, output_factory(scenario_id, report_type) opens the stream each report
+        is written to; the batch closes it afterwards.
+
+        With 'bytes' or 'base64' delivery every PDF stays in the manifest until the batch
+        returns, so memory grows with the batch. Pass on_report to receive each successful
+        entry, PDF included, as soon as it is rendered (called from the batch's worker
+        threads); the manifest then keeps only its metadata, and memory stays bounded by
+        max_workers scenarios plus the PDFs being rendered.
+        """
+        try:
+            if delivery not in ('bytes', 'stream', 'base64'):
+                return {'success': False, 'error': f'Unsupported delivery mode: {delivery}'}
+
+            if delivery == 'stream' and output_factory is None:
+                return {'success': False, 'error': 'Stream delivery requires an output factory'}
+
+            if theme not in CHART_THEMES:
+                return {'success': False, 'error': f'Invalid chart theme: {theme}'}
+
+            start_time = time.perf_counter()
+
+            # Group templates by scenario, keeping request order in the manifest
+            report_types_by_scenario = {}
+            for index, (scenario_id, report_type) in enumerate(requests):
+                report_types_by_scenario.setdefault(scenario_id, []).append((index, report_type))
+
+            # Shared by every worker so styles are built once
+            self._get_pdf_styles()
+
+            entries = [None] * len(requests)
+            workers = max(1, min(max_workers or self.pdf_config['batch_workers'], len(report_types_by_scenario) or 1))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._render_scenario_reports, scenario_id, report_types, theme, delivery,
+                                    output_factory, on_report)
+                    for scenario_id, report_types in report_types_by_scenario.items()
+                ]
+                for future in futures:
+                    for index, entry in future.result():
+                        entries[index] = entry
+
+            failed = sum(1 for entry in entries if not entry['success'])
+            return {
+                'success': True,
+                'message': f'Generated {len(entries) - failed} of {len(entries)} reports',
+                'data': {
+                    'reports': entries,
+                    'report_count': len(entries),
+                    'failed_count': failed,
+                    'scenario_count': len(report_types_by_scenario),
+                    'workers': workers,
+                    'total_ms': (time.perf_counter() - start_time) * 1000
+                }
+            }
+
+        except Exception as e:
+            logger.error(f"Error generating report batch: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    def _render_scenario_reports(self, scenario_id: str, report_types: List[Tuple[int, str]], theme: str,
+                                 delivery: str, output_factory: Optional[Callable[[str, str], BinaryIO]],
+                                 on_report: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """Fetch one scenario and render each requested template for it, handing reports to on_report"""
+        entries = []
+        fetch_start = time.perf_counter()
+        try:
+            scenario_data = self._get_scenario_data(scenario_id)
+            error = None if scenario_data else 'No scenario data found'
+        except Exception as e:
+            logger.error(f"Error loading scenario {scenario_id} for batch reports: {str(e)}")
+            scenario_data, error = None, str(e)
+        fetch_ms = (time.perf_counter() - fetch_start) * 1000
+
+        # Section and chart input revisions are shared by all templates of the scenario
+        revisions = {}
+
+        # Maps depend only on geometry, so they are drawn once for every template that includes them
+        maps, map_error = None, None
+        if not error and any(self.report_templates.get(report_type, {}).get('include_maps') for _, report_type in report_types):
+            try:
+                maps = self._generate_maps(scenario_data)
+            except Exception as e:
+                logger.error(f"Error generating maps for scenario {scenario_id}: {str(e)}")
+                map_error = str(e)
+
+        for index, report_type in report_types:
+            entry = {'scenario_id': scenario_id, 'report_type': report_type}
+            if error:
+                entries.append((index, dict(entry, success=False, error=error, timings={'fetch_ms': fetch_ms})))
+                continue
+            if report_type not in self.report_templates:
+                entries.append((index, dict(entry, success=False, error=f'Invalid report type: {report_type}')))
+                continue
+            if map_error and self.report_templates[report_type]['include_maps']:
+                entries.append((index, dict(entry, success=False, error=map_error)))
+                continue
+
+            output = None
+            try:
+                if delivery == 'stream':
+                    output = output_factory(scenario_id, report_type)
+                data = self._render_report(scenario_data, report_type, theme, delivery, output, revisions, maps)
+                data['timings']['fetch_ms'] = fetch_ms
+                report = dict(entry, success=True, **data)
+                if on_report is not None:
+                    # The sink owns the PDF from here; the manifest keeps the metadata only
+                    on_report(report)
+                    report = {key: value for key, value in report.items() if key not in ('pdf_bytes', 'pdf_base64')}
+                entries.append((index, report))
+            except Exception as e:
+                logger.error(f"Error generating {report_type} report for scenario {scenario_id}: {str(e)}")
+                entries.append((index, dict(entry, success=False, error=str(e))))
+            finally:
+                if output is not None:
+                    output.close()
+
+        return entries
+
+    def _render_report(self, scenario_data: Dict[str, Any], report_type: str, theme: str, delivery: str,
+                       output: Optional[BinaryIO], revisions: Dict[str, str],
+                       maps: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Build one report from loaded scenario data and deliver the PDF, reusing maps when given"""
+        template = self.report_templates[report_type]
+        timings = {}
+
+        # Generate report content
+        step_start = time.perf_counter()
+        report_content = self._generate_report_content(scenario_data, template, revisions)
+        timings['content_ms'] = (time.perf_counter() - step_start) * 1000
+        
+        # Generate charts and maps
+        charts = []
+        step_start = time.perf_counter()
+        if template['include_charts']:
+            charts = self._generate_charts(scenario_data, theme, revisions=revisions)
+        timings['charts_ms'] = (time.perf_counter() - step_start) * 1000
+
+        step_start = time.perf_counter()
+        if not template['include_maps']:
+            maps = []
+        elif maps is None:
+            maps = self._generate_maps(scenario_data)
+        timings['maps_ms'] = (time.perf_counter() - step_start) * 1000
+
+        # Build the PDF in memory, spilling to disk only for very large reports
+        step_start = time.perf_counter()
+        with tempfile.SpooledTemporaryFile(max_size=self.pdf_config['spool_max_bytes']) as pdf_buffer:
+            self._create_pdf_report(report_content, charts, maps, template, pdf_buffer)
+            content_length = pdf_buffer.tell()
+            pdf_buffer.seek(0)
+
+            data = {
+                'report_type': report_type,
+                'template_name': template['name'],
+                'content_type': 'application/pdf',
+                'content_length': content_length,
+                'file_size': content_length,
+                'delivery': delivery,
+                'sections': report_content['section_cache'],
+                'charts': {
+                    'reused': [chart['chart_type'] for chart in charts if chart['cached']],
+                    'regenerated': [chart['chart_type'] for chart in charts if not chart['cached']]
+                },
+                'generated_at': datetime.now().isoformat()
+            }
+
+            if delivery == 'stream':
+                shutil.copyfileobj(pdf_buffer, output, self.pdf_config['copy_chunk_bytes'])
+            elif delivery == 'base64':
+                data['pdf_base64'] = base64.b64encode(pdf_buffer.read()).decode('utf-8')
+            else:
+                data['pdf_bytes'] = pdf_buffer.read()
+        timings['pdf_ms'] = (time.perf_counter() - step_start) * 1000
+
+        timings['total_ms'] = sum(timings.values())
+        data['timings'] = timings
+        return data
+
     def _get_scenario_data(self, scenario_id: str) -> Optional[Dict[str, Any]]:
         """Get comprehensive scenario data for report generation"""
         conn = psycopg2.connect(**self.db_config)
@@ -139,7 +554,10 @@ class ReportGenerator:
                    COUNT(p.id) as parcel_count,
                    SUM(ST_Area(p.geometry)) as total_area,
                    AVG(p.properties->>'far')::float as avg_far,
-                   AVG(p.properties->>'height')::float as avg_height
+                   AVG(p.properties->>'height')::float as avg_height,
+                   MAX(p.updated_at) as parcels_updated_at,
+                   (SELECT COUNT(*) FROM links l WHERE l.scenario_id = s.id AND l.status = 'active') as link_count,
+                   (SELECT MAX(l.updated_at) FROM links l WHERE l.scenario_id = s.id AND l.status = 'active') as links_updated_at
             FROM scenarios s
             LEFT JOIN parcels p ON s.id = p.scenario_id AND p.status = 'active'
             WHERE s.id = %s
@@ -180,52 +598,64 @@ class ReportGenerator:
             cursor.close()
             conn.close()
 
-    def _generate_report_content(self, scenario_data: Dict[str, Any], template: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate report content based on template"""
+    def _generate_report_content(self, scenario_data: Dict[str, Any], template: Dict[str, Any],
+                                 revisions: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Generate report content based on template, reusing sections whose inputs are unchanged"""
         scenario = scenario_data['scenario']
-        kpis = scenario_data['kpis']
+        revisions = {} if revisions is None else revisions
         
         content = {
             'title': f"Urban Planning Report - {scenario['name']}",
             'subtitle': f"Generated on {datetime.now().strftime('%B %d, %Y')}",
-            'sections': {}
+            'sections': {},
+            'section_cache': {'reused': [], 'regenerated': []}
         }
 
         # Generate sections based on template
         for section in template['sections']:
-            if section == 'overview':
-                content['sections']['overview'] = self._generate_overview_section(scenario_data)
-            elif section == 'key_findings':
-                content['sections']['key_findings'] = self._generate_key_findings_section(scenario_data)
-            elif section == 'recommendations':
-                content['sections']['recommendations'] = self._generate_recommendations_section(scenario_data)
-            elif section == 'next_steps':
-                content['sections']['next_steps'] = self._generate_next_steps_section(scenario_data)
-            elif section == 'methodology':
-                content['sections']['methodology'] = self._generate_methodology_section(scenario_data)
-            elif section == 'data_analysis':
-                content['sections']['data_analysis'] = self._generate_data_analysis_section(scenario_data)
-            elif section == 'results':
-                content['sections']['results'] = self._generate_results_section(scenario_data)
-            elif section == 'discussion':
-                content['sections']['discussion'] = self._generate_discussion_section(scenario_data)
-            elif section == 'conclusions':
-                content['sections']['conclusions'] = self._generate_conclusions_section(scenario_data)
-            elif section == 'impacts':
-                content['sections']['impacts'] = self._generate_impacts_section(scenario_data)
-            elif section == 'benefits':
-                content['sections']['benefits'] = self._generate_benefits_section(scenario_data)
-            elif section == 'timeline':
-                content['sections']['timeline'] = self._generate_timeline_section(scenario_data)
-            elif section == 'engagement':
-                content['sections']['engagement'] = self._generate_engagement_section(scenario_data)
-            elif section == 'community_benefits':
-                content['sections']['community_benefits'] = self._generate_community_benefits_section(scenario_data)
-            elif section == 'feedback':
-                content['sections']['feedback'] = self._generate_feedback_section(scenario_data)
+            if section not in SECTION_DEPENDENCIES:
+                continue
+
+            key = (section, self._dependency_revision(scenario_data, SECTION_DEPENDENCIES[section], revisions))
+            section_data = self.section_cache.get(key)
+            if section_data is None:
+                section_data = getattr(self, f'_generate_{section}_section')(scenario_data)
+                self.section_cache.put(key, section_data)
+                content['section_cache']['regenerated'].append(section)
+            else:
+                content['section_cache']['reused'].append(section)
+
+            content['sections'][section] = section_data
 
         return content
 
+    def _dependency_revision(self, scenario_data: Dict[str, Any], inputs: Tuple[str, ...],
+                             revisions: Dict[str, str]) -> str:
+        """Combine the revisions of the given inputs, computing each at most once per report"""
+        parts = []
+        for name in inputs:
+            if name not in revisions:
+                revisions[name] = self._input_revision(scenario_data, name)
+            parts.append(f"{name}={revisions[name]}")
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def _input_revision(self, scenario_data: Dict[str, Any], name: str) -> str:
+        """Digest of one section or chart input"""
+        scenario = scenario_data['scenario']
+        if name == 'scenario':
+            value = {key: scenario.get(key) for key in ('id', 'name', 'total_area', 'avg_far', 'avg_height')}
+        elif name in ('parcels', 'links'):
+            rows = scenario_data[name]
+            updated_at = scenario.get(f'{name}_updated_at')
+            # Row count plus latest edit identifies the rows without hashing them all
+            value = {'id': scenario.get('id'), 'count': len(rows), 'updated_at': updated_at} if updated_at else rows
+        elif name.startswith('kpis.'):
+            value = (scenario_data['kpis'] or {}).get(name[len('kpis.'):])
+        else:
+            raise ValueError(f"Unknown report input: {name}")
+
+        return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
     def _generate_overview_section(self, scenario_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate overview section"""
         scenario = scenario_data['scenario']
@@ -558,306 +988,225 @@ class ReportGenerator:
             }
         }
 
-    def _generate_charts(self, scenario_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate charts for the report"""
+    def _generate_charts(self, scenario_data: Dict[str, Any], theme: str = 'default', image_format: str = 'png',
+                         revisions: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """Generate charts for the report, rendering only those missing from the chart cache"""
+        if theme not in CHART_THEMES:
+            raise ValueError(f"Unsupported chart theme: {theme}")
+
+        kpis = scenario_data['kpis'] or {}
+        revisions = {} if revisions is None else revisions
+        keys = {
+            chart_type: (chart_type, self._dependency_revision(scenario_data, CHART_DEPENDENCIES[chart_type], revisions),
+                         theme, image_format)
+            for chart_type in CHART_RENDERERS
+        }
+
+        images = {}
+        missing = []
+        for chart_type in CHART_RENDERERS:
+            image = self.chart_cache.get(keys[chart_type]) if self.chart_config['cache_enabled'] else None
+            if image is None:
+                missing.append(chart_type)
+            else:
+                images[chart_type] = image
+
+        if missing:
+            rendered = self._render_charts(missing, kpis, theme, image_format)
+            for chart_type, image in rendered.items():
+                images[chart_type] = image
+                if self.chart_config['cache_enabled']:
+                    self.chart_cache.put(keys[chart_type], image)
+
         charts = []
-        
-        # Capacity chart
-        capacity_chart = self._create_capacity_chart(scenario_data)
-        if capacity_chart:
-            charts.append(capacity_chart)
-        
-        # Sustainability score chart
-        sustainability_chart = self._create_sustainability_chart(scenario_data)
-        if sustainability_chart:
-            charts.append(sustainability_chart)
-        
-        # Budget breakdown chart
-        budget_chart = self._create_budget_chart(scenario_data)
-        if budget_chart:
-            charts.append(budget_chart)
-        
+        for chart_type, (_, title, description) in CHART_RENDERERS.items():
+            if not images.get(chart_type):
+                continue
+            charts.append({
+                'chart_type': chart_type,
+                'title': title,
+                'description': description,
+                'image_bytes': images[chart_type],
+                'format': image_format,
+                'cached': chart_type not in missing,
+                'type': 'bar_chart'
+            })
+
         return charts
 
-    def _create_capacity_chart(self, scenario_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Create capacity analysis chart"""
-        kpis = scenario_data['kpis']
-        
-        if 'capacity_analysis' not in kpis:
-            return None
-        
-        capacity = kpis['capacity_analysis']
-        
-        # Create matplotlib figure
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        categories = ['Units', 'Population', 'Jobs']
-        values = [
-            capacity.get('total_units', 0),
-            capacity.get('total_population', 0),
-            capacity.get('total_jobs', 0)
-        ]
-        
-        bars = ax.bar(categories, values, color=['#3B82F6', '#10B981', '#F59E0B'])
-        ax.set_title('Development Capacity', fontsize=16, fontweight='bold')
-        ax.set_ylabel('Count', fontsize=12)
-        
-        # Add value labels on bars
-        for bar, value in zip(bars, values):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                   f'{value:,}', ha='center', va='bottom', fontweight='bold')
-        
-        plt.tight_layout()
-        
-        # Save to bytes
-        img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-        img_buffer.seek(0)
-        plt.close()
-        
-        return {
-            'title': 'Development Capacity',
-            'description': 'Total development capacity in units, population, and jobs',
-            'image_data': base64.b64encode(img_buffer.getvalue()).decode('utf-8'),
-            'type': 'bar_chart'
-        }
+    def _render_charts(self, chart_types: List[str], kpis: Dict[str, Any], theme: str,
+                       image_format: str) -> Dict[str, bytes]:
+        """Render independent charts concurrently in the chart process pool"""
+        dpi = self.chart_config['dpi']
+        if self.chart_config['workers'] <= 1 or len(chart_types) == 1:
+            return {chart_type: _render_chart(chart_type, kpis, theme, image_format, dpi) for chart_type in chart_types}
 
-    def _create_sustainability_chart(self, scenario_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Create sustainability score chart"""
-        kpis = scenario_data['kpis']
-        
-        if 'sustainability_score' not in kpis:
-            return None
-        
-        sustainability = kpis['sustainability_score']
-        category_scores = sustainability.get('category_scores', {})
-        
-        if not category_scores:
-            return None
-        
-        # Create matplotlib figure
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        categories = list(category_scores.keys())
-        scores = [category_scores[cat]['score'] for cat in categories]
-        
-        bars = ax.bar(categories, scores, color=['#10B981', '#3B82F6', '#F59E0B', '#EF4444', '#8B5CF6', '#06B6D4'])
-        ax.set_title('Sustainability Scores by Category', fontsize=16, fontweight='bold')
-        ax.set_ylabel('Score', fontsize=12)
-        ax.set_ylim(0, 100)
-        
-        # Add value labels on bars
-        for bar, score in zip(bars, scores):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 1,
-                   f'{score:.1f}', ha='center', va='bottom', fontweight='bold')
-        
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        # Save to bytes
-        img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-        img_buffer.seek(0)
-        plt.close()
-        
-        return {
-            'title': 'Sustainability Scores',
-            'description': 'Sustainability performance by category',
-            'image_data': base64.b64encode(img_buffer.getvalue()).decode('utf-8'),
-            'type': 'bar_chart'
-        }
+        pool = self._get_chart_pool()
+        futures = {}
+        for chart_type in chart_types:
+            try:
+                futures[chart_type] = pool.submit(_render_chart, chart_type, kpis, theme, image_format, dpi)
+            except (BrokenProcessPool, RuntimeError) as e:
+                # The pool broke or was shut down by another report; render the rest here
+                logger.error(f"Chart process pool unavailable: {str(e)}")
+                self.close(pool)
+                break
 
-    def _create_budget_chart(self, scenario_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Create budget breakdown chart"""
-        kpis = scenario_data['kpis']
-        
-        if 'budget_analysis' not in kpis:
-            return None
-        
-        budget = kpis['budget_analysis']
-        breakdown = budget.get('total', {}).get('breakdown', {})
-        
-        if not breakdown:
-            return None
-        
-        # Create matplotlib figure
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        categories = list(breakdown.keys())
-        values = [breakdown[cat] for cat in categories]
-        
-        # Convert to millions for readability
-        values_millions = [v / 1000000 for v in values]
-        
-        bars = ax.bar(categories, values_millions, color=['#3B82F6', '#10B981', '#F59E0B'])
-        ax.set_title('Budget Breakdown', fontsize=16, fontweight='bold')
-        ax.set_ylabel('Cost (Millions USD)', fontsize=12)
-        
-        # Add value labels on bars
-        for bar, value in zip(bars, values_millions):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                   f'${value:.1f}M', ha='center', va='bottom', fontweight='bold')
-        
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        # Save to bytes
-        img_buffer = BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
-        img_buffer.seek(0)
-        plt.close()
-        
-        return {
-            'title': 'Budget Breakdown',
-            'description': 'Project budget breakdown by category',
-            'image_data': base64.b64encode(img_buffer.getvalue()).decode('utf-8'),
-            'type': 'bar_chart'
-        }
+        rendered = {}
+        for chart_type in chart_types:
+            future = futures.get(chart_type)
+            try:
+                if future is None:
+                    rendered[chart_type] = _render_chart(chart_type, kpis, theme, image_format, dpi)
+                else:
+                    rendered[chart_type] = future.result()
+            except BrokenProcessPool as e:
+                # A worker died; start a fresh pool next time and render this chart here
+                logger.error(f"Chart process pool failed: {str(e)}")
+                self.close(pool)
+                rendered[chart_type] = _render_chart(chart_type, kpis, theme, image_format, dpi)
+            except Exception as e:
+                logger.error(f"Error rendering {chart_type} chart: {str(e)}")
+
+        return rendered
+
+    def _get_chart_pool(self) -> ProcessPoolExecutor:
+        # Workers are reused across reports so matplotlib is only imported once per process.
+        # Batches start the pool from a thread while others render, so children come from a
+        # forkserver instead of forking a process that may hold matplotlib or ReportLab locks.
+        with self._chart_pool_lock:
+            if self._chart_pool is None:
+                self._chart_pool = ProcessPoolExecutor(
+                    max_workers=self.chart_config['workers'], mp_context=multiprocessing.get_context('forkserver')
+                )
+                atexit.register(self._chart_pool.shutdown, wait=False, cancel_futures=True)
+            return self._chart_pool
+
+    def close(self, pool: Optional[ProcessPoolExecutor] = None):
+        """Shut down the chart process pool, or only the given pool if it is still current
+
+        A later report starts a new pool.
+        """
+        with self._chart_pool_lock:
+            if pool is not None and pool is not self._chart_pool:
+                return
+            pool, self._chart_pool = self._chart_pool, None
+        if pool is not None:
+            atexit.unregister(pool.shutdown)
+            pool.shutdown()
+
+    def _generate_maps(self, scenario_data: Dict[str, Any], image_format: str = 'png') -> List[Dict[str, Any]]:
+        """Generate static maps for the report"""
+        parcels = [p for p in scenario_data['parcels'] if p.get('geometry')]
+        links = [l for l in scenario_data['links'] if l.get('geometry')]
+
+        # Parse every geometry once and share the vertex arrays between both maps
+        parcel_paths, parcel_owners = _geometry_paths([p['geometry'] for p in parcels], polygons=True)
+        link_paths, link_owners = _geometry_paths([l['geometry'] for l in links], polygons=False)
 
-    def _generate_maps(self, scenario_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate maps for the report"""
         maps = []
         
         # Site overview map
-        overview_map = self._create_overview_map(scenario_data)
+        overview_map = self._create_overview_map(parcels, parcel_paths, parcel_owners, link_paths, image_format)
         if overview_map:
             maps.append(overview_map)
         
         # Network connectivity map
-        network_map = self._create_network_map(scenario_data)
+        network_map = self._create_network_map(links, parcel_paths, link_paths, link_owners, image_format)
         if network_map:
             maps.append(network_map)
         
         return maps
 
-    def _create_overview_map(self, scenario_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Create site overview map"""
-        parcels = scenario_data['parcels']
-        
-        if not parcels:
+    def _create_overview_map(self, parcels: List[Dict[str, Any]], parcel_paths: List[np.ndarray],
+                             parcel_owners: np.ndarray, link_paths: List[np.ndarray],
+                             image_format: str) -> Optional[Dict[str, Any]]:
+        """Create site overview map with parcels coloured by land use"""
+        if not parcel_paths:
             return None
-        
-        # Create folium map
-        m = folium.Map(location=[0, 0], zoom_start=15)
-        
-        # Add parcels
-        for parcel in parcels:
-            geometry = json.loads(parcel['geometry'])
-            properties = parcel['properties']
-            
-            # Determine color based on use mix
-            use_mix = properties.get('useMix', {})
-            if use_mix.get('residential', 0) > 0.5:
-                color = 'blue'
-            elif use_mix.get('commercial', 0) > 0.5:
-                color = 'red'
-            else:
-                color = 'green'
-            
-            folium.GeoJson(
-                geometry,
-                style_function=lambda x, color=color: {
-                    'fillColor': color,
-                    'color': 'black',
-                    'weight': 1,
-                    'fillOpacity': 0.7
-                },
-                tooltip=f"Parcel {parcel['id']}"
-            ).add_to(m)
-        
-        # Save map to HTML
-        map_html = m._repr_html_()
+
+        land_use_colors = [LAND_USE_COLORS[_parcel_land_use(parcel['properties'])] for parcel in parcels]
+        parcel_colors = [land_use_colors[owner] for owner in parcel_owners]
+
+        image = _render_site_map(
+            parcel_paths, parcel_colors, link_paths, ['#9CA3AF'] * len(link_paths), [0.5] * len(link_paths),
+            'Site Overview', image_format, self.chart_config['map_dpi']
+        )
         
         return {
             'title': 'Site Overview',
             'description': 'Development parcels and land use distribution',
-            'html_content': map_html,
-            'type': 'interactive_map'
+            'image_bytes': image,
+            'format': image_format,
+            'type': 'static_map'
         }
 
-    def _create_network_map(self, scenario_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Create network connectivity map"""
-        links = scenario_data['links']
-        
-        if not links:
+    def _create_network_map(self, links: List[Dict[str, Any]], parcel_paths: List[np.ndarray],
+                            link_paths: List[np.ndarray], link_owners: np.ndarray,
+                            image_format: str) -> Optional[Dict[str, Any]]:
+        """Create network connectivity map with links styled by class"""
+        if not link_paths:
             return None
-        
-        # Create folium map
-        m = folium.Map(location=[0, 0], zoom_start=15)
-        
-        # Add network links
-        for link in links:
-            geometry = json.loads(link['geometry'])
-            link_class = link['link_class']
-            
-            # Determine color based on link class
-            if link_class == 'arterial':
-                color = 'red'
-                weight = 4
-            elif link_class == 'collector':
-                color = 'orange'
-                weight = 3
-            else:
-                color = 'yellow'
-                weight = 2
-            
-            folium.GeoJson(
-                geometry,
-                style_function=lambda x, color=color, weight=weight: {
-                    'color': color,
-                    'weight': weight,
-                    'opacity': 0.8
-                },
-                tooltip=f"{link_class.title()} road"
-            ).add_to(m)
-        
-        # Save map to HTML
-        map_html = m._repr_html_()
+
+        styles = [LINK_STYLES.get(link['link_class'], LINK_STYLES['local']) for link in links]
+        link_colors = [styles[owner][0] for owner in link_owners]
+        link_widths = [styles[owner][1] for owner in link_owners]
+
+        image = _render_site_map(
+            parcel_paths, ['#E5E7EB'] * len(parcel_paths), link_paths, link_colors, link_widths,
+            'Network Connectivity', image_format, self.chart_config['map_dpi']
+        )
         
         return {
             'title': 'Network Connectivity',
             'description': 'Street network and connectivity analysis',
-            'html_content': map_html,
-            'type': 'interactive_map'
+            'image_bytes': image,
+            'format': image_format,
+            'type': 'static_map'
         }
 
+    def _get_pdf_styles(self):
+        """Build the report style sheet once; ReportLab only reads styles while building"""
+        if self._pdf_styles is None:
+            styles = getSampleStyleSheet()
+            
+            # Create custom styles
+            styles.add(ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=24,
+                spaceAfter=30,
+                alignment=TA_CENTER
+            ))
+            
+            styles.add(ParagraphStyle(
+                'CustomSubtitle',
+                parent=styles['Heading2'],
+                fontSize=16,
+                spaceAfter=20,
+                alignment=TA_CENTER
+            ))
+            
+            styles.add(ParagraphStyle(
+                'CustomHeading',
+                parent=styles['Heading2'],
+                fontSize=14,
+                spaceAfter=12,
+                spaceBefore=20
+            ))
+            self._pdf_styles = styles
+
+        return self._pdf_styles
+
     def _create_pdf_report(self, report_content: Dict[str, Any], charts: List[Dict[str, Any]], 
-                          maps: List[Dict[str, Any]], template: Dict[str, Any]) -> str:
-        """Create PDF report"""
-        # Create temporary file
-        temp_file = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        
+                          maps: List[Dict[str, Any]], template: Dict[str, Any], output: BinaryIO):
+        """Create PDF report in a writable binary stream"""
         # Create PDF document
-        doc = SimpleDocTemplate(temp_file, pagesize=A4)
-        styles = getSampleStyleSheet()
-        
-        # Create custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
-        subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Heading2'],
-            fontSize=16,
-            spaceAfter=20,
-            alignment=TA_CENTER
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=12,
-            spaceBefore=20
-        )
+        doc = SimpleDocTemplate(output, pagesize=A4)
+        styles = self._get_pdf_styles()
+        title_style = styles['CustomTitle']
+        subtitle_style = styles['CustomSubtitle']
+        heading_style = styles['CustomHeading']
         
         # Build story
         story = []
@@ -896,16 +1245,25 @@ class ReportGenerator:
                 story.append(Paragraph(chart['title'], styles['Heading3']))
                 story.append(Paragraph(chart['description'], styles['Normal']))
                 
-                # Convert base64 image to file-like object
-                img_data = base64.b64decode(chart['image_data'])
-                img_buffer = BytesIO(img_data)
-                
                 # Add image to PDF
-                img = Image(img_buffer, width=6*inch, height=4*inch)
+                img = Image(BytesIO(chart['image_bytes']), width=6*inch, height=4*inch)
                 story.append(img)
                 story.append(Spacer(1, 12))
+
+        # Add maps
+        if maps:
+            story.append(PageBreak())
+            story.append(Paragraph('Maps', heading_style))
+
+            for site_map in maps:
+                story.append(Paragraph(site_map['title'], styles['Heading3']))
+                story.append(Paragraph(site_map['description'], styles['Normal']))
+
+                # Keep the map's aspect ratio within a 6 inch square
+                width, height = ImageReader(BytesIO(site_map['image_bytes'])).getSize()
+                scale = 6 * inch / max(width, height)
+                story.append(Image(BytesIO(site_map['image_bytes']), width=width * scale, height=height * scale))
+                story.append(Spacer(1, 12))
         
         # Build PDF
         doc.build(story)
-        
-        return temp_file
@@ -0,0 +1,53 @@
+import copy
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SectionCache:
+    """LRU of generated report sections keyed by (section, digest of the inputs it reads)
+
+    Section content is a pure function of its inputs, so entries are shared by any
+    scenario or template that produces the same digest. A size of 0 disables caching.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv('REPORT_SECTION_CACHE_SIZE', 1024))
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            section = self.entries.get(key)
+            if section is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+
+        # Hand out copies so callers cannot edit the cached section
+        return copy.deepcopy(section)
+
+    def put(self, key: Tuple, section: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+
+        with self.lock:
+            self.entries[key] = copy.deepcopy(section)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
@@ -1,7 +1,8 @@
 # Created automatically by Cursor AI (2025-08-25)
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 from datetime import datetime
+import numpy as np
 
 class CostLibrary:
     def __init__(self):
@@ -14,6 +15,9 @@ class CostLibrary:
             'landscaping': self._create_landscaping_costs()
         }
 
+        # Flattened (category, item) catalog for batch estimation, built on first use
+        self._item_catalog = None
+
     def get_cost_data(self, category: str = None) -> Dict[str, Any]:
         """Get cost data by category or all costs"""
         if category:
@@ -24,37 +28,105 @@ class CostLibrary:
         """Calculate total cost based on quantities and location"""
         total_cost = 0
         cost_breakdown = {}
+        location_factor = self.get_location_factor(location)
         
         for category, items in quantities.items():
             category_cost = 0
+            category_items = {}
             category_data = self.cost_data.get(category, {})
             
             for item, quantity in items.items():
                 if item in category_data:
                     base_cost = category_data[item]['base_cost']
-                    location_factor = self._get_location_factor(location)
                     item_cost = base_cost * quantity * location_factor
                     category_cost += item_cost
                     
-                    cost_breakdown[f"{category}_{item}"] = {
+                    category_items[f"{category}_{item}"] = {
                         'quantity': quantity,
                         'unit_cost': base_cost * location_factor,
                         'total_cost': item_cost
                     }
             
+            cost_breakdown.update(category_items)
             total_cost += category_cost
             cost_breakdown[category] = {
                 'total': category_cost,
-                'items': {k: v for k, v in cost_breakdown.items() if k.startswith(f"{category}_")}
+                'items': category_items
             }
         
         return {
             'total_cost': total_cost,
             'cost_breakdown': cost_breakdown,
-            'location_factor': self._get_location_factor(location),
+            'location_factor': location_factor,
             'calculated_at': datetime.now().isoformat()
         }
 
+    def calculate_total_cost_batch(self, quantity_sets: List[Dict[str, Dict[str, float]]], locations: Union[str, List[str]] = 'national') -> Dict[str, Any]:
+        """Price many quantity sets at once and return totals and breakdowns as columnar arrays
+        
+        Row i of every returned array corresponds to quantity_sets[i] priced at locations[i].
+        """
+        n_sets = len(quantity_sets)
+        if isinstance(locations, str):
+            locations = [locations] * n_sets
+        if len(locations) != n_sets:
+            raise ValueError('locations must be a single location or one per quantity set')
+        
+        catalog = self._get_item_catalog()
+        item_index = catalog['index']
+        
+        # Dense (sets x items) quantity matrix; unknown items are ignored as in calculate_total_cost
+        quantity_matrix = np.zeros((n_sets, len(catalog['names'])))
+        for row, quantities in enumerate(quantity_sets):
+            for category, items in quantities.items():
+                for item, quantity in items.items():
+                    column = item_index.get((category, item))
+                    if column is not None:
+                        quantity_matrix[row, column] += quantity
+        
+        # Resolve each distinct location factor once
+        unique_locations, location_idx = np.unique(np.array(locations, dtype=str), return_inverse=True)
+        location_factors = np.array([self.get_location_factor(loc) for loc in unique_locations])[location_idx]
+        
+        base_item_costs = quantity_matrix * catalog['base_cost']
+        item_costs = base_item_costs * location_factors[:, None]
+        category_totals = item_costs @ catalog['category_matrix']
+        used = quantity_matrix.any(axis=0)
+        
+        return {
+            'locations': list(locations),
+            'location_factor': location_factors,
+            'total_cost': category_totals.sum(axis=1),
+            'category_totals': {
+                category: category_totals[:, j] for j, category in enumerate(catalog['categories'])
+            },
+            'item_costs': {
+                name: item_costs[:, j] for j, name in enumerate(catalog['names']) if used[j]
+            },
+            'quantities': {
+                name: quantity_matrix[:, j] for j, name in enumerate(catalog['names']) if used[j]
+            },
+            'calculated_at': datetime.now().isoformat()
+        }
+
+    def _get_item_catalog(self) -> Dict[str, Any]:
+        """Flatten cost_data into item columns with base costs and a category indicator matrix"""
+        if self._item_catalog is None:
+            categories = list(self.cost_data.keys())
+            keys = [(category, item) for category in categories for item in self.cost_data[category]]
+            category_matrix = np.zeros((len(keys), len(categories)))
+            for column, (category, _) in enumerate(keys):
+                category_matrix[column, categories.index(category)] = 1.0
+            
+            self._item_catalog = {
+                'categories': categories,
+                'names': [f"{category}_{item}" for category, item in keys],
+                'index': {key: column for column, key in enumerate(keys)},
+                'base_cost': np.array([self.cost_data[c][i]['base_cost'] for c, i in keys], dtype=float),
+                'category_matrix': category_matrix
+            }
+        return self._item_catalog
+
     def _create_infrastructure_costs(self) -> Dict[str, Any]:
         """Create infrastructure cost data"""
         return {
@@ -527,7 +599,7 @@ class CostLibrary:
             }
         }
 
-    def _get_location_factor(self, location: str) -> float:
+    def get_location_factor(self, location: str) -> float:
         """Get location factor for cost adjustment"""
         location_factors = {
             'northeast': 1.2,
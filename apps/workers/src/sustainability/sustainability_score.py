@@ -1,7 +1,8 @@
 # Created automatically by Cursor AI (2025-08-25)
 import json
 import logging
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Union
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
@@ -14,6 +15,51 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SustainabilityScore:
+    # Metric layout for the vectorized engine: (category, metric, sub-weight, lower_is_better)
+    METRIC_LAYOUT = [
+        ('energy', 'self_sufficiency', 0.4, False),
+        ('energy', 'emissions_reduction', 0.4, False),
+        ('energy', 'renewable_ratio', 0.2, False),
+        ('mobility', 'walkability', 0.4, False),
+        ('mobility', 'transit_access', 0.4, False),
+        ('mobility', 'bike_infrastructure', 0.2, False),
+        ('land_use', 'density', 0.4, True),
+        ('land_use', 'mixed_use', 0.4, False),
+        ('land_use', 'green_space', 0.2, False),
+        ('water', 'stormwater_management', 0.4, False),
+        ('water', 'water_efficiency', 0.4, False),
+        ('water', 'water_reuse', 0.2, False),
+        ('materials', 'recycled_content', 0.4, False),
+        ('materials', 'local_sourcing', 0.4, False),
+        ('materials', 'embodied_carbon', 0.2, False),
+        ('resilience', 'climate_adaptation', 0.4, False),
+        ('resilience', 'disaster_preparedness', 0.3, False),
+        ('resilience', 'social_equity', 0.3, False)
+    ]
+
+    # Placeholder metric values used until the corresponding analyses exist
+    PLACEHOLDER_METRICS = {
+        'transit_access': 0.6,
+        'bike_infrastructure': 0.5,
+        'green_space': 0.15,
+        'stormwater_management': 0.6,
+        'water_efficiency': 0.7,
+        'water_reuse': 0.3,
+        'recycled_content': 0.5,
+        'local_sourcing': 0.6,
+        'embodied_carbon': 0.2,
+        'climate_adaptation': 0.6,
+        'disaster_preparedness': 0.5,
+        'social_equity': 0.7
+    }
+
+    # Threshold levels in order excellent, good, fair, poor; anything else scores the floor
+    METRIC_LEVELS = [1.0, 0.8, 0.6, 0.4]
+    METRIC_FLOOR = 0.2
+
+    GRADE_BREAKS = [40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90]
+    GRADE_LABELS = ['F', 'D', 'D+', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A', 'A+']
+
     def __init__(self):
         self.db_config = {
             'host': os.getenv('POSTGRES_HOST', 'localhost'),
@@ -157,52 +203,36 @@ class SustainabilityScore:
             }
         }
 
+        # Threshold tables for the vectorized engine, built on first use
+        self._metric_tables = None
+
+        # Per-scenario category scores keyed by input revision, so re-weighting skips recomputation
+        self.category_cache_size = int(os.getenv('SUSTAINABILITY_CACHE_SIZE', 256))
+        self._category_score_cache = OrderedDict()
+
+        # Compute scoring inputs in SQL and transfer one aggregate row per scenario
+        self.aggregate_pushdown = os.getenv('SUSTAINABILITY_AGGREGATE_PUSHDOWN', 'false').lower() == 'true'
+
     def calculate_sustainability_score(self, scenario_id: str, weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """Calculate comprehensive sustainability score for a scenario"""
         try:
-            # Get scenario data
-            scenario_data = self._get_scenario_data(scenario_id)
-            if not scenario_data:
-                return {'success': False, 'error': 'No scenario data found'}
+            revision = self._get_scenario_revision(scenario_id)
 
-            # Update weights if provided
+            # Weights apply to this call only
+            scoring_weights = dict(self.scoring_weights)
             if weights:
                 self._validate_weights(weights)
-                self.scoring_weights.update(weights)
-
-            # Calculate category scores
-            category_scores = {}
-            total_score = 0
-
-            # Energy Score
-            energy_score = self._calculate_energy_score(scenario_data)
-            category_scores['energy'] = energy_score
-            total_score += energy_score['score'] * self.scoring_weights['energy']
-
-            # Mobility Score
-            mobility_score = self._calculate_mobility_score(scenario_data)
-            category_scores['mobility'] = mobility_score
-            total_score += mobility_score['score'] * self.scoring_weights['mobility']
-
-            # Land Use Score
-            land_use_score = self._calculate_land_use_score(scenario_data)
-            category_scores['land_use'] = land_use_score
-            total_score += land_use_score['score'] * self.scoring_weights['land_use']
-
-            # Water Score
-            water_score = self._calculate_water_score(scenario_data)
-            category_scores['water'] = water_score
-            total_score += water_score['score'] * self.scoring_weights['water']
-
-            # Materials Score
-            materials_score = self._calculate_materials_score(scenario_data)
-            category_scores['materials'] = materials_score
-            total_score += materials_score['score'] * self.scoring_weights['materials']
-
-            # Resilience Score
-            resilience_score = self._calculate_resilience_score(scenario_data)
-            category_scores['resilience'] = resilience_score
-            total_score += resilience_score['score'] * self.scoring_weights['resilience']
+                scoring_weights.update(weights)
+
+            # Get scenario data and calculate category scores
+            category_scores = self._load_category_scores(scenario_id)
+            if category_scores is None:
+                return {'success': False, 'error': 'No scenario data found'}
+            self._cache_category_scores(scenario_id, revision, category_scores)
+            total_score = sum(
+                category_scores[category]['score'] * scoring_weights[category]
+                for category in category_scores
+            )
 
             # Calculate overall grade
             overall_grade = self._calculate_grade(total_score)
@@ -212,7 +242,7 @@ class SustainabilityScore:
                 'overall_score': total_score,
                 'overall_grade': overall_grade,
                 'category_scores': category_scores,
-                'weights': self.scoring_weights
+                'weights': scoring_weights
             }
 
             self._store_sustainability_score(scenario_id, results)
@@ -227,6 +257,156 @@ class SustainabilityScore:
             logger.error(f"Error calculating sustainability score: {str(e)}")
             return {'success': False, 'error': str(e)}
 
+    def reweight_sustainability_score(self, scenario_id: str, weights: Union[Dict[str, float], List[Dict[str, float]]]) -> Dict[str, Any]:
+        """Apply one or many weight vectors to cached category scores without recomputing them"""
+        try:
+            weight_sets = [weights] if isinstance(weights, dict) else list(weights)
+            for weight_set in weight_sets:
+                self._validate_weights(weight_set)
+
+            category_scores = self._get_category_scores(scenario_id)
+            if category_scores is None:
+                return {'success': False, 'error': 'No scenario data found'}
+
+            categories = list(category_scores.keys())
+            weight_matrix = np.array([
+                [{**self.scoring_weights, **weight_set}[category] for category in categories]
+                for weight_set in weight_sets
+            ])
+            overall_scores = self._apply_weight_matrix(category_scores, weight_matrix)
+            grades = self._grade_array(overall_scores)
+
+            return {
+                'success': True,
+                'data': {
+                    'category_scores': category_scores,
+                    'results': [
+                        {
+                            'weights': dict(zip(categories, weight_matrix[i].tolist())),
+                            'overall_score': float(overall_scores[i]),
+                            'overall_grade': str(grades[i])
+                        }
+                        for i in range(len(weight_sets))
+                    ]
+                }
+            }
+
+        except Exception as e:
+            logger.error(f"Error reweighting sustainability score: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    def sweep_sustainability_weight(self, scenario_id: str, category: str, steps: int = 21) -> Dict[str, Any]:
+        """Sweep one category weight from 0 to 1, rescaling the others proportionally"""
+        try:
+            if category not in self.scoring_weights:
+                raise ValueError(f"Unknown category: {category}")
+
+            category_scores = self._get_category_scores(scenario_id)
+            if category_scores is None:
+                return {'success': False, 'error': 'No scenario data found'}
+
+            categories = list(category_scores.keys())
+            base = np.array([self.scoring_weights[c] for c in categories])
+            target = categories.index(category)
+            others = base.copy()
+            others[target] = 0
+            others = others / others.sum() if others.sum() > 0 else others
+
+            # Row i gives the swept category weight sweep[i] and shares the remainder
+            sweep = np.linspace(0, 1, steps)
+            weight_matrix = (1 - sweep)[:, None] * others[None, :]
+            weight_matrix[:, target] = sweep
+            overall_scores = self._apply_weight_matrix(category_scores, weight_matrix)
+
+            return {
+                'success': True,
+                'data': {
+                    'category': category,
+                    'categories': categories,
+                    'weights': weight_matrix.tolist(),
+                    'overall_scores': overall_scores.tolist(),
+                    'overall_grades': self._grade_array(overall_scores).tolist()
+                }
+            }
+
+        except Exception as e:
+            logger.error(f"Error sweeping sustainability weight: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    def calculate_sustainability_scores_batch(self, scenario_ids: List[str], weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Score many scenarios in one vectorized pass and store all results in one transaction"""
+        try:
+            scenario_ids = list(dict.fromkeys(scenario_ids))
+            if self.aggregate_pushdown:
+                summaries = self._get_scenario_summaries(scenario_ids)
+            else:
+                summaries = {
+                    scenario_id: self._summarize_scenario_data(data)
+                    for scenario_id, data in self._get_scenarios_data(scenario_ids).items()
+                }
+            found_ids = [scenario_id for scenario_id in scenario_ids if scenario_id in summaries]
+            if not found_ids:
+                return {'success': False, 'error': 'No scenario data found'}
+
+            batch = self.score_summaries_batch([summaries[sid] for sid in found_ids], weights)
+            results = {
+                scenario_id: self._batch_result(batch, i)
+                for i, scenario_id in enumerate(found_ids)
+            }
+
+            self._store_sustainability_scores(results)
+
+            return {
+                'success': True,
+                'message': f'Calculated sustainability scores for {len(found_ids)} scenarios',
+                'data': results,
+                'missing': [scenario_id for scenario_id in scenario_ids if scenario_id not in summaries]
+            }
+
+        except Exception as e:
+            logger.error(f"Error calculating sustainability scores: {str(e)}")
+            return {'success': False, 'error': str(e)}
+
+    def score_scenario_data_batch(self, scenario_data_list: List[Dict[str, Any]], weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Score already-loaded scenario data (e.g. optimizer candidates) as arrays
+        
+        Returns metric values and scores (N x metrics), category scores (N x categories),
+        overall scores and grades, with columns ordered as METRIC_LAYOUT and categories.
+        """
+        return self.score_summaries_batch(
+            [self._summarize_scenario_data(data) for data in scenario_data_list], weights
+        )
+
+    def score_summaries_batch(self, summaries: List[Dict[str, Any]], weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Score scenario aggregates (see _summarize_scenario_data) as arrays"""
+        scoring_weights = dict(self.scoring_weights)
+        if weights:
+            self._validate_weights(weights)
+            scoring_weights.update(weights)
+        
+        tables = self._get_metric_tables()
+        values = np.array(
+            [self._metric_values(summary) for summary in summaries],
+            dtype=float
+        ).reshape(len(summaries), len(self.METRIC_LAYOUT))
+        
+        metric_scores = self._score_metric_array(values, tables['thresholds'], tables['reverse'])
+        category_scores = (metric_scores @ tables['category_matrix']) * 100
+        weight_vector = np.array([scoring_weights[category] for category in tables['categories']])
+        overall_scores = category_scores @ weight_vector
+        
+        return {
+            'categories': tables['categories'],
+            'metrics': tables['metrics'],
+            'metric_values': values,
+            'metric_scores': metric_scores,
+            'category_scores': category_scores,
+            'overall_scores': overall_scores,
+            'overall_grades': self._grade_array(overall_scores),
+            'category_grades': self._grade_array(category_scores),
+            'weights': scoring_weights
+        }
+
     def _validate_weights(self, weights: Dict[str, float]):
         """Validate that weights sum to 1.0"""
         total_weight = sum(weights.values())
@@ -268,7 +448,7 @@ class SustainabilityScore:
 
             # Get links for mobility analysis
             query = """
-            SELECT properties, link_class
+            SELECT properties, link_class, ST_Length(geometry) as length
             FROM links
             WHERE scenario_id = %s AND status = 'active'
             """
@@ -286,6 +466,328 @@ class SustainabilityScore:
             cursor.close()
             conn.close()
 
+    def _calculate_category_scores(self, scenario_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Calculate every category score for loaded scenario data"""
+        return {
+            'energy': self._calculate_energy_score(scenario_data),
+            'mobility': self._calculate_mobility_score(scenario_data),
+            'land_use': self._calculate_land_use_score(scenario_data),
+            'water': self._calculate_water_score(scenario_data),
+            'materials': self._calculate_materials_score(scenario_data),
+            'resilience': self._calculate_resilience_score(scenario_data)
+        }
+
+    def _get_category_scores(self, scenario_id: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Return category scores for the scenario's current revision, computing them on a cache miss"""
+        revision = self._get_scenario_revision(scenario_id)
+        if revision is None:
+            return None
+
+        cached = self._category_score_cache.get(scenario_id)
+        if cached and cached['revision'] == revision:
+            self._category_score_cache.move_to_end(scenario_id)
+            return cached['category_scores']
+
+        category_scores = self._load_category_scores(scenario_id)
+        if category_scores is not None:
+            self._cache_category_scores(scenario_id, revision, category_scores)
+        return category_scores
+
+    def _load_category_scores(self, scenario_id: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Load scenario inputs and calculate every category score"""
+        if self.aggregate_pushdown:
+            summary = self._get_scenario_summaries([scenario_id]).get(str(scenario_id))
+            if summary is None:
+                return None
+            return self._batch_result(self.score_summaries_batch([summary]), 0)['category_scores']
+
+        scenario_data = self._get_scenario_data(scenario_id)
+        if not scenario_data:
+            return None
+        return self._calculate_category_scores(scenario_data)
+
+    def _cache_category_scores(self, scenario_id: str, revision: Optional[str], category_scores: Dict[str, Dict[str, Any]]):
+        """Cache category scores under a revision, evicting the least recently used scenario"""
+        if revision is None:
+            return
+        self._category_score_cache[scenario_id] = {'revision': revision, 'category_scores': category_scores}
+        self._category_score_cache.move_to_end(scenario_id)
+        while len(self._category_score_cache) > self.category_cache_size:
+            self._category_score_cache.popitem(last=False)
+
+    def _apply_weight_matrix(self, category_scores: Dict[str, Dict[str, Any]], weight_matrix: np.ndarray) -> np.ndarray:
+        """Overall scores for each weight row as one matrix product against the category scores"""
+        score_vector = np.array([category_scores[category]['score'] for category in category_scores])
+        return weight_matrix @ score_vector
+
+    def _get_scenario_revision(self, scenario_id: str) -> Optional[str]:
+        """Get a cheap revision token covering the scenario KPIs, parcels and links the category scores read
+        
+        Stored sustainability results are excluded so that writing a score does not invalidate it.
+        """
+        conn = psycopg2.connect(**self.db_config)
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        
+        try:
+            query = """
+            SELECT md5((COALESCE(s.kpis, '{}'::jsonb) - 'sustainability_score')::text) as kpis_hash,
+                   p.parcel_count, p.parcels_updated_at,
+                   l.link_count, l.links_updated_at
+            FROM scenarios s
+            LEFT JOIN LATERAL (
+                SELECT COUNT(*) as parcel_count, MAX(updated_at) as parcels_updated_at
+                FROM parcels
+                WHERE scenario_id = s.id AND status = 'active'
+            ) p ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT COUNT(*) as link_count, MAX(updated_at) as links_updated_at
+                FROM links
+                WHERE scenario_id = s.id AND status = 'active'
+            ) l ON TRUE
+            WHERE s.id = %s
+            """
+            cursor.execute(query, (scenario_id,))
+            row = cursor.fetchone()
+            
+            if not row:
+                return None
+            return (f"{row['kpis_hash']}:{row['parcel_count']}:{row['parcels_updated_at']}:"
+                    f"{row['link_count']}:{row['links_updated_at']}")
+            
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _get_scenarios_data(self, scenario_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get scoring data for several scenarios with one query per table"""
+        conn = psycopg2.connect(**self.db_config)
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        
+        try:
+            query = """
+            SELECT s.*, 
+                   COUNT(p.id) as parcel_count,
+                   SUM(ST_Area(p.geometry)) as total_area,
+                   AVG(p.properties->>'far')::float as avg_far,
+                   AVG(p.properties->>'height')::float as avg_height
+            FROM scenarios s
+            LEFT JOIN parcels p ON s.id = p.scenario_id AND p.status = 'active'
+            WHERE s.id = ANY(%s)
+            GROUP BY s.id
+            """
+            cursor.execute(query, (list(scenario_ids),))
+            scenarios = {str(row['id']): row for row in cursor.fetchall()}
+            
+            data = {
+                scenario_id: {
+                    'scenario': scenario,
+                    'parcels': [],
+                    'links': [],
+                    'kpis': scenario.get('kpis') or {}
+                }
+                for scenario_id, scenario in scenarios.items()
+            }
+            
+            query = """
+            SELECT scenario_id, properties, capacity
+            FROM parcels
+            WHERE scenario_id = ANY(%s) AND status = 'active'
+            """
+            cursor.execute(query, (list(scenarios),))
+            for row in cursor.fetchall():
+                data[str(row['scenario_id'])]['parcels'].append(row)
+            
+            query = """
+            SELECT scenario_id, properties, link_class, ST_Length(geometry) as length
+            FROM links
+            WHERE scenario_id = ANY(%s) AND status = 'active'
+            """
+            cursor.execute(query, (list(scenarios),))
+            for row in cursor.fetchall():
+                data[str(row['scenario_id'])]['links'].append(row)
+            
+            return data
+            
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _get_scenario_summaries(self, scenario_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Compute scoring aggregates in one SQL statement, returning one small row per scenario"""
+        conn = psycopg2.connect(**self.db_config)
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        
+        try:
+            query = """
+            SELECT s.id, s.kpis,
+                   COALESCE(ps.parcel_count, 0) as parcel_count,
+                   COALESCE(ps.total_area, 0) as total_area,
+                   ps.avg_far,
+                   ps.avg_height,
+                   COALESCE(ps.total_population, 0) as total_population,
+                   COALESCE(ps.mixed_use_parcels, 0) as mixed_use_parcels,
+                   COALESCE(ls.total_link_length, 0) as total_link_length,
+                   COALESCE(ls.bike_link_length, 0) as bike_link_length
+            FROM scenarios s
+            LEFT JOIN LATERAL (
+                SELECT COUNT(*) as parcel_count,
+                       SUM(ST_Area(p.geometry)) as total_area,
+                       AVG((p.properties->>'far')::float) as avg_far,
+                       AVG((p.properties->>'height')::float) as avg_height,
+                       SUM((p.capacity->>'population')::float) as total_population,
+                       COUNT(*) FILTER (
+                           WHERE CASE WHEN jsonb_typeof(p.properties->'useMix') = 'object'
+                                      THEN (SELECT COUNT(*) FROM jsonb_object_keys(p.properties->'useMix'))
+                                      ELSE 0 END > 1
+                       ) as mixed_use_parcels
+                FROM parcels p
+                WHERE p.scenario_id = s.id AND p.status = 'active'
+            ) ps ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT SUM(ST_Length(l.geometry)) as total_link_length,
+                       SUM(ST_Length(l.geometry)) FILTER (
+                           WHERE CASE jsonb_typeof(l.properties->'bike_lanes')
+                                     WHEN 'boolean' THEN (l.properties->>'bike_lanes')::boolean
+                                     WHEN 'number' THEN (l.properties->>'bike_lanes')::float > 0
+                                     ELSE false END
+                       ) as bike_link_length
+                FROM links l
+                WHERE l.scenario_id = s.id AND l.status = 'active'
+            ) ls ON TRUE
+            WHERE s.id = ANY(%s)
+            """
+            cursor.execute(query, (list(scenario_ids),))
+            
+            summaries = {}
+            for row in cursor.fetchall():
+                total_link_length = float(row['total_link_length'])
+                summaries[str(row['id'])] = {
+                    'kpis': row['kpis'] or {},
+                    'total_area': float(row['total_area']),
+                    'parcel_count': int(row['parcel_count']),
+                    'total_population': float(row['total_population']),
+                    'mixed_use_parcels': int(row['mixed_use_parcels']),
+                    'avg_far': row['avg_far'],
+                    'avg_height': row['avg_height'],
+                    'bike_coverage': float(row['bike_link_length']) / total_link_length if total_link_length > 0 else None
+                }
+            return summaries
+            
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _summarize_scenario_data(self, scenario_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Reduce loaded scenario data to the aggregates the metrics need"""
+        parcels = scenario_data['parcels']
+        
+        return {
+            'kpis': scenario_data.get('kpis') or {},
+            'total_area': scenario_data['scenario'].get('total_area') or 0,
+            'parcel_count': len(parcels),
+            'total_population': sum((p.get('capacity') or {}).get('population', 0) for p in parcels),
+            'mixed_use_parcels': sum(1 for p in parcels if len((p.get('properties') or {}).get('useMix', {})) > 1),
+            'bike_coverage': self._bike_coverage(scenario_data['links'])
+        }
+
+    def _bike_coverage(self, links: List[Dict[str, Any]]) -> Optional[float]:
+        """Share of network length with bike lanes, or None without link lengths"""
+        total_length = bike_length = 0.0
+        for link in links:
+            length = link.get('length') or 0
+            total_length += length
+            # Seeds store a boolean, other sources a lane count; mirrors the pushdown CASE
+            bike_lanes = (link.get('properties') or {}).get('bike_lanes')
+            if isinstance(bike_lanes, bool):
+                has_bike_lanes = bike_lanes
+            else:
+                has_bike_lanes = isinstance(bike_lanes, (int, float)) and bike_lanes > 0
+            if has_bike_lanes:
+                bike_length += length
+        return bike_length / total_length if total_length > 0 else None
+
+    def _metric_values(self, summary: Dict[str, Any]) -> List[float]:
+        """Metric values in METRIC_LAYOUT order, mirroring the per-category score methods"""
+        kpis = summary['kpis']
+        energy_data = kpis.get('energy_analysis', {})
+        network_data = kpis.get('network_analysis', {})
+        total_area_ha = summary['total_area'] / 10000
+        
+        values = dict(self.PLACEHOLDER_METRICS)
+        values.update({
+            'self_sufficiency': energy_data.get('demand', {}).get('self_sufficiency_ratio', 0),
+            'emissions_reduction': energy_data.get('emissions', {}).get('reduction_percent', 0),
+            'renewable_ratio': energy_data.get('solar', {}).get('renewable_ratio', 0),
+            'walkability': network_data.get('intersection_density', 0) / 100,
+            'density': summary['total_population'] / total_area_ha if total_area_ha > 0 else 0,
+            'mixed_use': summary['mixed_use_parcels'] / summary['parcel_count'] if summary['parcel_count'] else 0
+        })
+        if summary.get('bike_coverage') is not None:
+            values['bike_infrastructure'] = summary['bike_coverage']
+        return [values[metric] for _, metric, _, _ in self.METRIC_LAYOUT]
+
+    def _get_metric_tables(self) -> Dict[str, Any]:
+        """Compile scoring criteria into threshold and category weight tables"""
+        if self._metric_tables is None:
+            categories = list(self.scoring_weights.keys())
+            thresholds = np.array([
+                [self.scoring_criteria[category][metric][level] for level in ('excellent', 'good', 'fair', 'poor')]
+                for category, metric, _, _ in self.METRIC_LAYOUT
+            ], dtype=float)
+            
+            # Metric sub-weights mapped onto their category columns
+            category_matrix = np.zeros((len(self.METRIC_LAYOUT), len(categories)))
+            for i, (category, _, sub_weight, _) in enumerate(self.METRIC_LAYOUT):
+                category_matrix[i, categories.index(category)] = sub_weight
+            
+            self._metric_tables = {
+                'categories': categories,
+                'metrics': [f'{category}.{metric}' for category, metric, _, _ in self.METRIC_LAYOUT],
+                'thresholds': thresholds,
+                'reverse': np.array([reverse for _, _, _, reverse in self.METRIC_LAYOUT]),
+                'category_matrix': category_matrix
+            }
+        return self._metric_tables
+
+    def _score_metric_array(self, values: np.ndarray, thresholds: np.ndarray, reverse: np.ndarray) -> np.ndarray:
+        """Vectorized _score_metric over an (N x metrics) value matrix"""
+        levels = np.array(self.METRIC_LEVELS)
+        # hits[n, m, k] is True when metric m of scenario n reaches threshold level k
+        hits = np.where(
+            reverse[None, :, None],
+            values[:, :, None] <= thresholds[None, :, :],
+            values[:, :, None] >= thresholds[None, :, :]
+        )
+        first_hit = hits.argmax(axis=2)
+        return np.where(hits.any(axis=2), levels[first_hit], self.METRIC_FLOOR)
+
+    def _grade_array(self, scores: np.ndarray) -> np.ndarray:
+        """Vectorized _calculate_grade"""
+        labels = np.array(self.GRADE_LABELS)
+        return labels[np.searchsorted(self.GRADE_BREAKS, scores, side='right')]
+
+    def _batch_result(self, batch: Dict[str, Any], row: int) -> Dict[str, Any]:
+        """Expand one row of a batch scoring result into the calculate_sustainability_score format"""
+        category_scores = {}
+        for j, category in enumerate(batch['categories']):
+            category_scores[category] = {
+                'score': float(batch['category_scores'][row, j]),
+                'grade': str(batch['category_grades'][row, j]),
+                'metrics': {}
+            }
+        for i, (category, metric, _, _) in enumerate(self.METRIC_LAYOUT):
+            category_scores[category]['metrics'][metric] = {
+                'value': float(batch['metric_values'][row, i]),
+                'score': float(batch['metric_scores'][row, i] * 100)
+            }
+        
+        return {
+            'overall_score': float(batch['overall_scores'][row]),
+            'overall_grade': str(batch['overall_grades'][row]),
+            'category_scores': category_scores,
+            'weights': batch['weights']
+        }
+
     def _calculate_energy_score(self, scenario_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate energy sustainability score"""
         kpis = scenario_data['kpis']
@@ -322,7 +824,9 @@ class SustainabilityScore:
         # Get mobility metrics (simplified - would need more detailed analysis)
         walkability = network_data.get('intersection_density', 0) / 100  # Normalize to 0-1
         transit_access = 0.6  # Placeholder - would need transit data
-        bike_infrastructure = 0.5  # Placeholder - would need bike lane data
+        bike_infrastructure = self._bike_coverage(scenario_data.get('links') or [])
+        if bike_infrastructure is None:
+            bike_infrastructure = self.PLACEHOLDER_METRICS['bike_infrastructure']  # No link geometry to measure
 
         # Calculate subscores
         walkability_score = self._score_metric(walkability, self.scoring_criteria['mobility']['walkability'])
@@ -534,6 +1038,35 @@ class SustainabilityScore:
             cursor.close()
             conn.close()
 
+    def _store_sustainability_scores(self, results: Dict[str, Dict[str, Any]]):
+        """Store sustainability scores for several scenarios in one transaction"""
+        conn = psycopg2.connect(**self.db_config)
+        cursor = conn.cursor()
+        
+        try:
+            query = """
+            UPDATE scenarios 
+            SET kpis = jsonb_set(
+                COALESCE(kpis, '{}'::jsonb),
+                '{sustainability_score}',
+                %s::jsonb
+            ),
+            updated_at = NOW()
+            WHERE id = %s
+            """
+            cursor.executemany(query, [
+                (json.dumps(score_data), scenario_id) for scenario_id, score_data in results.items()
+            ])
+            
+            conn.commit()
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+
     def get_sustainability_summary(self, scenario_id: str) -> Dict[str, Any]:
         """Get sustainability score summary for a scenario"""
         try:
@@ -1,12 +1,14 @@
 # Created automatically by Cursor AI (2025-08-25)
 import json
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
 from dotenv import load_dotenv
 import numpy as np
+from seeds.cost_library import CostLibrary
 
 load_dotenv()
 
@@ -14,6 +16,10 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class BudgetModel:
+    # Building type thresholds on height (m): low_rise <= 12 < mid_rise <= 30 < high_rise
+    BUILDING_TYPES = ['low_rise', 'mid_rise', 'high_rise']
+    BUILDING_HEIGHT_BREAKS = [12, 30]
+
     def __init__(self):
         self.db_config = {
             'host': os.getenv('POSTGRES_HOST', 'localhost'),
@@ -88,6 +94,41 @@ class BudgetModel:
             }
         }
 
+        # Dense rate arrays compiled from cost_library; rebuilt when the library changes
+        self._cost_tables = None
+
+        # Monte Carlo risk parameters (coefficients of variation are 1-sigma)
+        self.risk_defaults = {
+            'samples': 10000,
+            'seed': None,
+            'chunk_size': 10000,
+            'rate_cv': {
+                'infrastructure': 0.15,
+                'buildings': 0.10,
+                'sustainability': 0.20
+            },
+            'quantity_cv': 0.05,
+            'base_year': datetime.now().year,
+            'completion_years': 3,  # Completion sampled uniformly over this many years
+            'percentiles': [5, 10, 50, 80, 90, 95],
+            'histogram_bins': 50
+        }
+
+        # Phased cash-flow parameters; spend profiles split a phase's cost over its years
+        self.cash_flow_defaults = {
+            'base_year': datetime.now().year,
+            'phase_duration_years': 2,
+            'location': 'national',
+            'spend_profile': {
+                'infrastructure': [0.6, 0.4],
+                'buildings': [0.3, 0.7],
+                'sustainability': [0.0, 1.0]
+            }
+        }
+
+        # Per-scenario, per-phase cash-flow rows keyed by the phase's row ids and updated_at revisions
+        self._cash_flow_cache: Dict[str, Dict[int, Dict[str, Any]]] = {}
+
     def calculate_budget(self, scenario_id: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Calculate comprehensive budget for a scenario"""
         try:
@@ -150,6 +191,74 @@ class BudgetModel:
                 'error': str(e)
             }
 
+    def calculate_budget_risk(self, scenario_id: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run a Monte Carlo cost-risk simulation and return budget percentiles"""
+        try:
+            parcels = self._get_parcels(scenario_id)
+            links = self._get_links(scenario_id)
+            
+            if not parcels:
+                return {'success': False, 'error': 'No parcels found for scenario'}
+
+            risk_params = dict(self.risk_defaults)
+            if params:
+                cost_params = {k: v for k, v in params.items() if k in self.cost_library}
+                if cost_params:
+                    self._update_cost_library(cost_params)
+                risk_params.update({k: v for k, v in params.items() if k in self.risk_defaults})
+
+            line_items = self._build_line_items(parcels, links)
+            risk_analysis = self._simulate_budget_risk(line_items, risk_params)
+
+            self._store_budget_analysis(scenario_id, risk_analysis, key='budget_risk')
+
+            return {
+                'success': True,
+                'message': f"Simulated {risk_analysis['samples']} budget outcomes for {len(parcels)} parcels",
+                'data': risk_analysis
+            }
+
+        except Exception as e:
+            logger.error(f"Error calculating budget risk: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def calculate_cash_flow(self, scenario_id: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Calculate a phased, escalated cash flow, recomputing only phases whose inputs changed"""
+        try:
+            parcels = self._get_parcels(scenario_id)
+            links = self._get_links(scenario_id)
+            
+            if not parcels:
+                return {'success': False, 'error': 'No parcels found for scenario'}
+
+            cash_flow_params = dict(self.cash_flow_defaults)
+            if params:
+                cost_params = {k: v for k, v in params.items() if k in self.cost_library}
+                if cost_params:
+                    self._update_cost_library(cost_params)
+                cash_flow_params.update({k: v for k, v in params.items() if k in self.cash_flow_defaults})
+
+            cash_flow = self._calculate_phased_cash_flow(scenario_id, parcels, links, cash_flow_params)
+
+            self._store_budget_analysis(scenario_id, cash_flow, key='budget_cash_flow')
+
+            return {
+                'success': True,
+                'message': f"Calculated cash flow for {len(cash_flow['phases'])} phases "
+                           f"({len(cash_flow['recomputed_phases'])} recomputed)",
+                'data': cash_flow
+            }
+
+        except Exception as e:
+            logger.error(f"Error calculating cash flow: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
     def _get_parcels(self, scenario_id: str) -> List[Dict[str, Any]]:
         """Get parcels with capacity data from database"""
         conn = psycopg2.connect(**self.db_config)
@@ -157,7 +266,7 @@ class BudgetModel:
         
         try:
             query = """
-            SELECT id, ST_Area(geometry) as area, properties, capacity
+            SELECT id, ST_Area(geometry) as area, properties, capacity, updated_at
             FROM parcels
             WHERE scenario_id = %s AND status = 'active'
             """
@@ -175,7 +284,7 @@ class BudgetModel:
         
         try:
             query = """
-            SELECT id, ST_Length(geometry) as length, properties, link_class
+            SELECT id, ST_Length(geometry) as length, properties, link_class, updated_at
             FROM links
             WHERE scenario_id = %s AND status = 'active'
             """
@@ -194,34 +303,121 @@ class BudgetModel:
                     self.cost_library[category].update(values)
                 else:
                     self.cost_library[category] = values
+        
+        self._cost_tables = None
 
-    def _calculate_infrastructure_costs(self, links: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate infrastructure costs"""
-        street_costs = {}
-        utility_costs = {}
-        total_street_cost = 0
-        total_utility_cost = 0
+    def _get_cost_tables(self) -> Dict[str, Any]:
+        """Return the compiled cost tables, compiling them on first use"""
+        if self._cost_tables is None:
+            self._cost_tables = self._compile_cost_tables()
+        return self._cost_tables
+
+    def _compile_cost_tables(self) -> Dict[str, Any]:
+        """Compile the nested cost library into dense rate arrays"""
+        infrastructure = self.cost_library['infrastructure']
+        buildings = self.cost_library['buildings']
+        residential = buildings['residential']
         
-        for link in links:
-            properties = link['properties']
-            length = link['length']
-            link_class = link['link_class']
+        link_classes = list(infrastructure['streets'].keys())
+        
+        return {
+            'link_classes': link_classes,
+            'link_class_index': {link_class: i for i, link_class in enumerate(link_classes)},
+            'street_rates': np.array([infrastructure['streets'][c] for c in link_classes], dtype=float),
+            'utility_rate': float(sum(infrastructure['utilities'].values())),
+            'park_rate': float(infrastructure['parks']['neighborhood_park']),
+            'residential_rates': np.array([residential[t] for t in self.BUILDING_TYPES], dtype=float),
+            'affordable_rate': float(residential['affordable']),
+            'use_rates': {}
+        }
+
+    def _use_type_rates(self, use_types: List[str]) -> np.ndarray:
+        """Gather per-m² rates for non-residential use types from the compiled tables"""
+        tables = self._get_cost_tables()
+        use_rates = tables['use_rates']
+        
+        for use_type in use_types:
+            if use_type not in use_rates:
+                if use_type in self.cost_library['buildings']:
+                    use_rates[use_type] = float(self.cost_library['buildings'][use_type].get('office', 3000))
+                else:
+                    use_rates[use_type] = 2500.0  # Default commercial cost
+        
+        return np.array([use_rates[use_type] for use_type in use_types], dtype=float)
+
+    def _link_arrays(self, links: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Extract link lengths and compiled class indices (-1 for unpriced classes)"""
+        class_index = self._get_cost_tables()['link_class_index']
+        
+        return {
+            'length': np.array([link['length'] for link in links], dtype=float),
+            'class_idx': np.array([class_index.get(link['link_class'], -1) for link in links], dtype=np.int64)
+        }
+
+    def _parcel_arrays(self, parcels: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract parcel columns and a dense parcel x use mix matrix"""
+        n = len(parcels)
+        floor_area = np.zeros(n)
+        height = np.zeros(n)
+        inclusionary = np.zeros(n)
+        use_types: List[str] = []
+        use_index: Dict[str, int] = {}
+        mix_entries = []
+        
+        for i, parcel in enumerate(parcels):
+            properties = parcel['properties']
+            capacity = parcel.get('capacity') or {}
             
-            # Street costs
-            if link_class in self.cost_library['infrastructure']['streets']:
-                street_cost = length * self.cost_library['infrastructure']['streets'][link_class]
-                street_costs[link_class] = street_costs.get(link_class, 0) + street_cost
-                total_street_cost += street_cost
+            floor_area[i] = capacity.get('floor_area', 0)
+            height[i] = properties.get('height', 15)
+            inclusionary[i] = properties.get('inclusionary', 0)
             
-            # Utility costs (simplified - assume all streets have utilities)
-            utility_cost_per_meter = sum(self.cost_library['infrastructure']['utilities'].values())
-            utility_cost = length * utility_cost_per_meter
-            total_utility_cost += utility_cost
+            for use_type, mix_ratio in properties.get('useMix', {'residential': 1.0}).items():
+                if use_type not in use_index:
+                    use_index[use_type] = len(use_types)
+                    use_types.append(use_type)
+                mix_entries.append((i, use_index[use_type], mix_ratio))
+        
+        use_mix = np.zeros((n, len(use_types)))
+        for i, j, mix_ratio in mix_entries:
+            use_mix[i, j] = mix_ratio
+        
+        return {
+            'floor_area': floor_area,
+            'building_type_idx': np.searchsorted(self.BUILDING_HEIGHT_BREAKS, height, side='left'),
+            'affordable_share': np.where(inclusionary > 0, inclusionary / 100, 0.0),
+            'use_types': use_types,
+            'use_mix': use_mix
+        }
+
+    def _calculate_infrastructure_costs(self, links: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Calculate infrastructure costs"""
+        tables = self._get_cost_tables()
+        arrays = self._link_arrays(links)
+        length = arrays['length']
+        class_idx = arrays['class_idx']
+        
+        # Street costs: gather the per-class rate, then reduce per class
+        priced = class_idx >= 0
+        n_classes = len(tables['link_classes'])
+        class_lengths = np.bincount(class_idx[priced], weights=length[priced], minlength=n_classes)
+        class_counts = np.bincount(class_idx[priced], minlength=n_classes)
+        class_costs = class_lengths * tables['street_rates']
+        street_costs = {
+            link_class: float(class_costs[i])
+            for i, link_class in enumerate(tables['link_classes'])
+            if class_counts[i] > 0
+        }
+        total_street_cost = float(class_costs.sum())
+        
+        # Utility costs (simplified - assume all streets have utilities)
+        total_length = float(length.sum())
+        total_utility_cost = total_length * tables['utility_rate']
         
         # Park costs (simplified - assume 10% of total area for parks)
-        total_area = sum(link['length'] * 20 for link in links)  # Assume 20m average street width
+        total_area = total_length * 20  # Assume 20m average street width
         park_area = total_area * 0.1
-        park_cost = park_area * self.cost_library['infrastructure']['parks']['neighborhood_park']
+        park_cost = park_area * tables['park_rate']
         
         return {
             'streets': street_costs,
@@ -232,53 +428,274 @@ class BudgetModel:
 
     def _calculate_building_costs(self, parcels: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Calculate building costs by use type"""
-        building_costs = {}
-        total_cost = 0
+        tables = self._get_cost_tables()
+        arrays = self._parcel_arrays(parcels)
+        use_types = arrays['use_types']
+        use_mix = arrays['use_mix']
+        floor_area = arrays['floor_area']
+        
+        # Floor area per use type is a single dot product over parcels
+        use_floor_area = floor_area @ use_mix
+        use_costs = use_floor_area * self._use_type_rates(use_types)
+        
+        if 'residential' in use_types:
+            # Residential rate blends the height-based market rate with the affordable rate
+            res_idx = use_types.index('residential')
+            affordable_share = arrays['affordable_share']
+            market_rate = tables['residential_rates'][arrays['building_type_idx']]
+            blended_rate = affordable_share * tables['affordable_rate'] + (1 - affordable_share) * market_rate
+            use_costs[res_idx] = (floor_area * blended_rate) @ use_mix[:, res_idx]
         
+        building_costs = {use_type: float(use_costs[j]) for j, use_type in enumerate(use_types)}
+        building_costs['total'] = float(use_costs.sum())
+        return building_costs
+
+    def _build_line_items(self, parcels: List[Dict[str, Any]], links: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate parcels and links into priced line items (quantity x unit rate)"""
+        tables = self._get_cost_tables()
+        link_arrays = self._link_arrays(links)
+        parcel_arrays = self._parcel_arrays(parcels)
+        names, categories, quantities, rates = [], [], [], []
+        
+        def add(name: str, category: str, quantity: float, rate: float):
+            names.append(name)
+            categories.append(category)
+            quantities.append(quantity)
+            rates.append(rate)
+        
+        # Infrastructure
+        length = link_arrays['length']
+        class_idx = link_arrays['class_idx']
+        priced = class_idx >= 0
+        class_lengths = np.bincount(class_idx[priced], weights=length[priced], minlength=len(tables['link_classes']))
+        for i, link_class in enumerate(tables['link_classes']):
+            if class_lengths[i] > 0:
+                add(f'streets.{link_class}', 'infrastructure', class_lengths[i], tables['street_rates'][i])
+        total_length = float(length.sum())
+        add('utilities', 'infrastructure', total_length, tables['utility_rate'])
+        add('parks.neighborhood_park', 'infrastructure', total_length * 20 * 0.1, tables['park_rate'])
+        
+        # Buildings
+        use_types = parcel_arrays['use_types']
+        use_mix = parcel_arrays['use_mix']
+        floor_area = parcel_arrays['floor_area']
+        use_floor_area = floor_area @ use_mix
+        for j, (use_type, rate) in enumerate(zip(use_types, self._use_type_rates(use_types))):
+            if use_type == 'residential':
+                res_area = floor_area * use_mix[:, j]
+                affordable_share = parcel_arrays['affordable_share']
+                add('residential.affordable', 'buildings', float(res_area @ affordable_share), tables['affordable_rate'])
+                market_area = np.bincount(
+                    parcel_arrays['building_type_idx'],
+                    weights=res_area * (1 - affordable_share),
+                    minlength=len(self.BUILDING_TYPES)
+                )
+                for k, building_type in enumerate(self.BUILDING_TYPES):
+                    add(f'residential.{building_type}', 'buildings', market_area[k], tables['residential_rates'][k])
+            else:
+                add(f'{use_type}', 'buildings', use_floor_area[j], rate)
+        
+        # Sustainability quantities mirror _calculate_sustainability_costs
+        sustainability = self.cost_library['sustainability']
+        solar_kw = green_roof_area = ev_stations = 0.0
         for parcel in parcels:
             properties = parcel['properties']
-            capacity = parcel.get('capacity', {})
-            
-            use_mix = properties.get('useMix', {'residential': 1.0})
-            floor_area = capacity.get('floor_area', 0)
-            height = properties.get('height', 15)
+            capacity = parcel.get('capacity') or {}
+            if 'solar_potential' in capacity:
+                solar_kw += capacity['solar_potential'].get('system_size_kw', 0)
+            roof_area = capacity.get('floor_area', 0) / max(properties.get('floors', 1), 1)
+            green_roof_area += roof_area * properties.get('greenRoofPercent', 0) / 100
+            ev_stations += capacity.get('parking_spaces', 0) * 0.1
+        add('solar_pv', 'sustainability', solar_kw, sustainability['solar_pv'])
+        add('green_roof', 'sustainability', green_roof_area, sustainability['green_roof'])
+        add('ev_charging', 'sustainability', ev_stations, sustainability['ev_charging'])
+        
+        quantity = np.array(quantities, dtype=float)
+        rate = np.array(rates, dtype=float)
+        return {
+            'names': names,
+            'categories': categories,
+            'quantity': quantity,
+            'rate': rate,
+            'cost': quantity * rate,
+            'soft_cost_rate': float(sum(self.cost_library['soft_costs'].values()))
+        }
+
+    def _simulate_budget_risk(self, line_items: Dict[str, Any], risk_params: Dict[str, Any]) -> Dict[str, Any]:
+        """Sample rate, quantity and escalation uncertainty and reduce to budget percentiles"""
+        samples = int(risk_params['samples'])
+        chunk_size = max(1, int(risk_params['chunk_size']))
+        rng = np.random.default_rng(risk_params['seed'])
+        
+        base_cost = line_items['cost']
+        n_items = len(base_cost)
+        rate_cv = np.array([risk_params['rate_cv'].get(c, 0.0) for c in line_items['categories']])
+        quantity_cv = float(risk_params['quantity_cv'])
+        soft_multiplier = 1 + line_items['soft_cost_rate']
+        
+        # Escalation factors for each candidate completion year
+        cost_library = CostLibrary()
+        base_year = int(risk_params['base_year'])
+        escalation_table = np.array([
+            cost_library.get_cost_escalation(base_year, base_year + offset)
+            for offset in range(int(risk_params['completion_years']) + 1)
+        ])
+        
+        # Lognormal multipliers with unit mean so the expected cost equals the deterministic cost
+        rate_sigma = np.sqrt(np.log1p(rate_cv ** 2))
+        quantity_sigma = np.sqrt(np.log1p(quantity_cv ** 2))
+        sigma = np.sqrt(rate_sigma ** 2 + quantity_sigma ** 2)
+        mu = -0.5 * sigma ** 2
+        
+        totals = np.empty(samples)
+        for start in range(0, samples, chunk_size):
+            stop = min(start + chunk_size, samples)
+            # Rate and quantity multipliers combine into one (samples x line items) matrix
+            multipliers = np.exp(mu + sigma * rng.standard_normal((stop - start, n_items)))
+            escalation = escalation_table[rng.integers(0, len(escalation_table), stop - start)]
+            totals[start:stop] = (multipliers @ base_cost) * escalation * soft_multiplier
+        
+        deterministic = float(base_cost.sum() * soft_multiplier)
+        percentiles = risk_params['percentiles']
+        values = np.percentile(totals, percentiles) if samples else np.zeros(len(percentiles))
+        counts, bin_edges = np.histogram(totals, bins=int(risk_params['histogram_bins']))
+        
+        return {
+            'samples': samples,
+            'seed': risk_params['seed'],
+            'deterministic_total': deterministic,
+            'mean': float(totals.mean()) if samples else 0.0,
+            'std': float(totals.std()) if samples else 0.0,
+            'percentiles': {f'p{p}': float(v) for p, v in zip(percentiles, values)},
+            'contingency_p80': float(np.percentile(totals, 80) - deterministic) if samples else 0.0,
+            'histogram': {
+                'bin_edges': bin_edges.tolist(),
+                'counts': counts.tolist()
+            },
+            'line_items': [
+                {'name': name, 'category': category, 'quantity': float(q), 'unit_cost': float(r), 'cost': float(c)}
+                for name, category, q, r, c in zip(
+                    line_items['names'], line_items['categories'],
+                    line_items['quantity'], line_items['rate'], base_cost
+                )
+            ]
+        }
+
+    def _calculate_phased_cash_flow(self, scenario_id: str, parcels: List[Dict[str, Any]], links: List[Dict[str, Any]], cash_flow_params: Dict[str, Any]) -> Dict[str, Any]:
+        """Group line items by phase and year, reusing cached rows for unchanged phases"""
+        parcels_by_phase: Dict[int, List[Dict[str, Any]]] = {}
+        links_by_phase: Dict[int, List[Dict[str, Any]]] = {}
+        for parcel in parcels:
+            parcels_by_phase.setdefault(int(parcel['properties'].get('phase', 1)), []).append(parcel)
+        for link in links:
+            links_by_phase.setdefault(int((link['properties'] or {}).get('phase', 1)), []).append(link)
+        
+        # Anything that changes a phase's rows besides its own parcels and links
+        context_key = json.dumps({'cost_library': self.cost_library, 'params': cash_flow_params}, sort_keys=True, default=str)
+        
+        phase_cache = self._cash_flow_cache.setdefault(scenario_id, {})
+        phases = sorted(set(parcels_by_phase) | set(links_by_phase))
+        recomputed, reused = [], []
+        
+        for phase in phases:
+            phase_parcels = parcels_by_phase.get(phase, [])
+            phase_links = links_by_phase.get(phase, [])
+            fingerprint = self._phase_fingerprint(phase_parcels, phase_links, context_key)
             
-            # Determine building type based on height
-            if height <= 12:  # 3-4 stories
-                building_type = 'low_rise'
-            elif height <= 30:  # 5-10 stories
-                building_type = 'mid_rise'
-            else:
-                building_type = 'high_rise'
+            cached = phase_cache.get(phase)
+            if cached and fingerprint is not None and cached['fingerprint'] == fingerprint:
+                reused.append(phase)
+                continue
             
-            # Calculate costs by use type
-            for use_type, mix_ratio in use_mix.items():
-                use_floor_area = floor_area * mix_ratio
-                
-                if use_type == 'residential':
-                    # Check if affordable housing
-                    inclusionary = properties.get('inclusionary', 0)
-                    if inclusionary > 0:
-                        affordable_area = use_floor_area * (inclusionary / 100)
-                        market_area = use_floor_area - affordable_area
-                        
-                        affordable_cost = affordable_area * self.cost_library['buildings']['residential']['affordable']
-                        market_cost = market_area * self.cost_library['buildings']['residential'][building_type]
-                        use_cost = affordable_cost + market_cost
-                    else:
-                        use_cost = use_floor_area * self.cost_library['buildings']['residential'][building_type]
-                else:
-                    # Commercial/industrial/institutional
-                    if use_type in self.cost_library['buildings']:
-                        use_cost = use_floor_area * self.cost_library['buildings'][use_type].get('office', 3000)
-                    else:
-                        use_cost = use_floor_area * 2500  # Default commercial cost
-                
-                building_costs[use_type] = building_costs.get(use_type, 0) + use_cost
-                total_cost += use_cost
+            phase_cache[phase] = {
+                'fingerprint': fingerprint,
+                'parcel_count': len(phase_parcels),
+                'link_count': len(phase_links),
+                'rows': self._calculate_phase_rows(phase, phase_parcels, phase_links, cash_flow_params)
+            }
+            recomputed.append(phase)
         
-        building_costs['total'] = total_cost
-        return building_costs
+        # Drop phases that no longer exist
+        for phase in list(phase_cache):
+            if phase not in phases:
+                del phase_cache[phase]
+        
+        rows = [row for phase in phases for row in phase_cache[phase]['rows']]
+        by_year: Dict[int, float] = {}
+        for row in rows:
+            by_year[row['year']] = by_year.get(row['year'], 0) + row['escalated_cost']
+        
+        return {
+            'phases': {
+                str(phase): {
+                    'parcel_count': phase_cache[phase]['parcel_count'],
+                    'link_count': phase_cache[phase]['link_count'],
+                    'base_subtotal': sum(row['base_cost'] for row in phase_cache[phase]['rows']),
+                    'escalated_subtotal': sum(row['escalated_cost'] for row in phase_cache[phase]['rows'])
+                }
+                for phase in phases
+            },
+            'rows': rows,
+            'by_year': {str(year): by_year[year] for year in sorted(by_year)},
+            'total_base': sum(row['base_cost'] for row in rows),
+            'total_escalated': sum(row['escalated_cost'] for row in rows),
+            'location': cash_flow_params['location'],
+            'recomputed_phases': recomputed,
+            'reused_phases': reused
+        }
+
+    def _phase_fingerprint(self, parcels: List[Dict[str, Any]], links: List[Dict[str, Any]], context_key: str) -> Optional[Tuple]:
+        """Revision of one phase's inputs from row ids and updated_at, or None when rows carry no revision"""
+        # Every write to a parcel or link bumps updated_at, so this avoids serializing the rows
+        try:
+            return (
+                context_key,
+                frozenset((str(p['id']), p['updated_at']) for p in parcels),
+                frozenset((str(l['id']), l['updated_at']) for l in links)
+            )
+        except KeyError:
+            return None
+
+    def _calculate_phase_rows(self, phase: int, parcels: List[Dict[str, Any]], links: List[Dict[str, Any]], cash_flow_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Spread one phase's category costs over its years and apply escalation and location"""
+        line_items = self._build_line_items(parcels, links)
+        category_costs: Dict[str, float] = {}
+        for category, cost in zip(line_items['categories'], line_items['cost']):
+            category_costs[category] = category_costs.get(category, 0) + float(cost)
+        
+        cost_library = CostLibrary()
+        location_factor = cost_library.get_location_factor(cash_flow_params['location'])
+        base_year = int(cash_flow_params['base_year'])
+        duration = max(1, int(cash_flow_params['phase_duration_years']))
+        start_year = base_year + (phase - 1) * duration
+        
+        # Year-by-year spend per category; soft costs follow total construction spend
+        yearly = np.zeros((len(category_costs), duration))
+        for i, (category, cost) in enumerate(category_costs.items()):
+            profile = np.array(cash_flow_params['spend_profile'].get(category, []), dtype=float)
+            if len(profile) != duration or profile.sum() <= 0:
+                profile = np.ones(duration)  # Spread evenly when no matching profile is configured
+            profile = profile / profile.sum()
+            yearly[i] = cost * profile
+        
+        categories = list(category_costs) + ['soft_costs']
+        yearly = np.vstack([yearly, yearly.sum(axis=0) * line_items['soft_cost_rate']])
+        
+        rows = []
+        for offset in range(duration):
+            year = start_year + offset
+            factor = cost_library.get_cost_escalation(base_year, year) * location_factor
+            for i, category in enumerate(categories):
+                if yearly[i, offset] == 0:
+                    continue
+                rows.append({
+                    'phase': phase,
+                    'year': year,
+                    'category': category,
+                    'base_cost': float(yearly[i, offset]),
+                    'escalated_cost': float(yearly[i, offset] * factor)
+                })
+        return rows
 
     def _calculate_sustainability_costs(self, parcels: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Calculate sustainability feature costs"""
@@ -359,7 +776,7 @@ class BudgetModel:
             'total_floor_area': total_floor_area
         }
 
-    def _store_budget_analysis(self, scenario_id: str, analysis_data: Dict[str, Any]):
+    def _store_budget_analysis(self, scenario_id: str, analysis_data: Dict[str, Any], key: str = 'budget_analysis'):
         """Store budget analysis results in database"""
         conn = psycopg2.connect(**self.db_config)
         cursor = conn.cursor()
@@ -370,13 +787,13 @@ class BudgetModel:
             UPDATE scenarios 
             SET kpis = jsonb_set(
                 COALESCE(kpis, '{}'::jsonb),
-                '{budget_analysis}',
+                %s::text[],
                 %s::jsonb
             ),
             updated_at = NOW()
             WHERE id = %s
             """
-            cursor.execute(query, (json.dumps(analysis_data), scenario_id))
+            cursor.execute(query, ([key], json.dumps(analysis_data), scenario_id))
             
             conn.commit()
             
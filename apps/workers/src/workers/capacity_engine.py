@@ -6,6 +6,7 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
 from dotenv import load_dotenv
+from monitoring.instrumentation import instrumented, annotate
 
 load_dotenv()
 
@@ -38,6 +39,7 @@ class CapacityEngine:
             'parking_spaces_per_unit': 1.5
         }
 
+    @instrumented('capacity')
     def calculate_capacity(self, scenario_id: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Calculate capacity for all parcels in a scenario"""
         try:
@@ -89,6 +91,7 @@ class CapacityEngine:
                 'error': str(e)
             }
 
+    @instrumented('capacity', 'db_fetch')
     def _get_parcels(self, scenario_id: str) -> List[Dict[str, Any]]:
         """Get parcels from database"""
         conn = psycopg2.connect(**self.db_config)
@@ -169,6 +172,7 @@ class CapacityEngine:
             'lot_coverage': lot_coverage
         }
 
+    @instrumented('capacity', 'store')
     def _store_capacity_results(self, scenario_id: str, results: List[Dict[str, Any]]):
         """Store capacity results in database"""
         conn = psycopg2.connect(**self.db_config)
@@ -176,6 +180,7 @@ class CapacityEngine:
         
         try:
             # Update parcels with capacity data
+            payload_bytes = 0
             for result in results:
                 capacity_data = {
                     'units': result['units'],
@@ -192,9 +197,12 @@ class CapacityEngine:
                 SET capacity = %s, updated_at = NOW()
                 WHERE id = %s
                 """
-                cursor.execute(query, (json.dumps(capacity_data), result['parcel_id']))
+                payload = json.dumps(capacity_data)
+                payload_bytes += len(payload)
+                cursor.execute(query, (payload, result['parcel_id']))
             
             conn.commit()
+            annotate(rows=len(results), payload_bytes=payload_bytes)
             
         except Exception as e:
             conn.rollback()
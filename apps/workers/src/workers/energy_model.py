@@ -1,6 +1,7 @@
 # Created automatically by Cursor AI (2025-08-25)
 import json
 import logging
+import time
 from typing import Dict, Any, List, Optional
 import psycopg2
 from psycopg2.extras import RealDictCursor
@@ -89,6 +90,80 @@ class EnergyModel:
                 'error': str(e)
             }
 
+    def analyze_energy_batch(self, scenario_ids: List[str], params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Analyze energy for many scenarios with one fetch, one kernel pass and one store transaction"""
+        try:
+            batch_start = time.perf_counter()
+            scenario_ids = list(dict.fromkeys(scenario_ids))
+            if not scenario_ids:
+                return {'success': False, 'error': 'No scenario IDs provided'}
+
+            if params:
+                self.defaults.update(params)
+
+            # Load parcels for every scenario in a single query
+            fetch_start = time.perf_counter()
+            parcels = self._get_parcels_batch(scenario_ids)
+            fetch_ms = (time.perf_counter() - fetch_start) * 1000
+
+            # Run the energy kernels over the concatenated parcel arrays
+            compute_start = time.perf_counter()
+            arrays = self._build_energy_arrays(parcels, scenario_ids)
+            segments = self._calculate_energy_segments(arrays, len(scenario_ids))
+            compute_ms = (time.perf_counter() - compute_start) * 1000
+
+            total_parcels = max(len(parcels), 1)
+            results = {}
+            errors = {}
+            for idx, scenario_id in enumerate(scenario_ids):
+                assemble_start = time.perf_counter()
+                parcel_count = int(segments['parcel_count'][idx])
+                if parcel_count == 0:
+                    errors[scenario_id] = 'No parcels found for scenario'
+                    continue
+
+                demand_analysis = self._segment_energy_demand(arrays, segments, idx)
+                solar_analysis = self._segment_solar_potential(arrays, segments, idx)
+                storage_analysis = self._calculate_storage_requirements(demand_analysis, solar_analysis)
+                emissions_analysis = self._calculate_emissions_impact(demand_analysis, solar_analysis)
+
+                # Shared fetch/compute time is attributed by parcel share
+                shared_ms = (fetch_ms + compute_ms) * parcel_count / total_parcels
+                results[scenario_id] = {
+                    'demand': demand_analysis,
+                    'solar': solar_analysis,
+                    'storage': storage_analysis,
+                    'emissions': emissions_analysis,
+                    'parcel_count': parcel_count,
+                    'timing_ms': shared_ms + (time.perf_counter() - assemble_start) * 1000
+                }
+
+            # Store all results in one transaction
+            store_start = time.perf_counter()
+            if results:
+                self._store_energy_analyses(results)
+            store_ms = (time.perf_counter() - store_start) * 1000
+
+            return {
+                'success': bool(results),
+                'message': f'Analyzed energy for {len(results)} of {len(scenario_ids)} scenarios ({len(parcels)} parcels)',
+                'data': results,
+                'errors': errors,
+                'timing': {
+                    'fetch_ms': fetch_ms,
+                    'compute_ms': compute_ms,
+                    'store_ms': store_ms,
+                    'total_ms': (time.perf_counter() - batch_start) * 1000
+                }
+            }
+
+        except Exception as e:
+            logger.error(f"Error analyzing energy batch: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
     def _get_parcels(self, scenario_id: str) -> List[Dict[str, Any]]:
         """Get parcels with capacity data from database"""
         conn = psycopg2.connect(**self.db_config)
@@ -107,6 +182,166 @@ class EnergyModel:
             cursor.close()
             conn.close()
 
+    def _get_parcels_batch(self, scenario_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get parcels with capacity data for several scenarios in one query"""
+        conn = psycopg2.connect(**self.db_config)
+        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        
+        try:
+            query = """
+            SELECT id, scenario_id, ST_Area(geometry) as area, properties, capacity
+            FROM parcels
+            WHERE scenario_id = ANY(%s) AND status = 'active'
+            ORDER BY scenario_id
+            """
+            cursor.execute(query, (list(scenario_ids),))
+            return cursor.fetchall()
+            
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _build_energy_arrays(self, parcels: List[Dict[str, Any]], scenario_ids: List[str]) -> Dict[str, Any]:
+        """Flatten parcels of many scenarios into column arrays with a scenario segment index"""
+        scenario_index = {str(scenario_id): idx for idx, scenario_id in enumerate(scenario_ids)}
+        use_types: List[str] = []
+        use_index: Dict[str, int] = {}
+        mix_entries = []
+        
+        n = len(parcels)
+        segment = np.zeros(n, dtype=np.int64)
+        units = np.zeros(n)
+        floor_area = np.zeros(n)
+        floors = np.ones(n)
+        parcel_ids = []
+        
+        for i, parcel in enumerate(parcels):
+            properties = parcel.get('properties') or {}
+            capacity = parcel.get('capacity') or {}
+            
+            segment[i] = scenario_index[str(parcel['scenario_id'])]
+            units[i] = capacity.get('units', 0)
+            floor_area[i] = capacity.get('floor_area', 0)
+            floors[i] = capacity.get('floors', 1)
+            parcel_ids.append(parcel['id'])
+            
+            for use_type, mix_ratio in properties.get('useMix', {'residential': 1.0}).items():
+                if use_type not in use_index:
+                    use_index[use_type] = len(use_types)
+                    use_types.append(use_type)
+                mix_entries.append((i, use_index[use_type], mix_ratio))
+        
+        # Dense parcel x use matrices; presence tracks which uses a parcel declares
+        use_mix = np.zeros((n, len(use_types)))
+        use_present = np.zeros((n, len(use_types)), dtype=bool)
+        for i, j, mix_ratio in mix_entries:
+            use_mix[i, j] = mix_ratio
+            use_present[i, j] = True
+        
+        return {
+            'segment': segment,
+            'units': units,
+            'floor_area': floor_area,
+            'floors': floors,
+            'use_types': use_types,
+            'use_mix': use_mix,
+            'use_present': use_present,
+            'parcel_ids': parcel_ids
+        }
+
+    def _calculate_energy_segments(self, arrays: Dict[str, Any], n_scenarios: int) -> Dict[str, Any]:
+        """Compute per-parcel energy terms and reduce them per scenario segment"""
+        segment = arrays['segment']
+        units = arrays['units']
+        floor_area = arrays['floor_area']
+        floors = arrays['floors']
+        use_mix = arrays['use_mix']
+        use_present = arrays['use_present']
+        use_types = arrays['use_types']
+        
+        # Demand: residential scales with units, every other use with its share of floor area
+        use_demand = floor_area[:, None] * use_mix * self.defaults['energy_demand_per_sqm']
+        if 'residential' in use_types:
+            res_idx = use_types.index('residential')
+            use_demand[:, res_idx] = np.where(
+                use_present[:, res_idx], units * self.defaults['energy_demand_per_unit'], 0.0
+            )
+        parcel_demand = use_demand.sum(axis=1)
+        
+        # Solar: roof area equals ground floor area
+        roof_area = np.divide(floor_area, floors, out=np.zeros_like(floor_area), where=floors > 0)
+        available_area = roof_area * self.defaults['roof_coverage']
+        daily_energy = (
+            available_area *
+            self.defaults['solar_irradiance'] *
+            self.defaults['panel_efficiency'] *
+            (1 - self.defaults['system_losses'])
+        )
+        system_size = (daily_energy / self.defaults['solar_irradiance']) / self.defaults['panel_efficiency']
+        
+        demand_by_use = np.zeros((n_scenarios, len(use_types)))
+        use_present_count = np.zeros((n_scenarios, len(use_types)), dtype=np.int64)
+        for j in range(len(use_types)):
+            demand_by_use[:, j] = np.bincount(segment, weights=use_demand[:, j], minlength=n_scenarios)
+            use_present_count[:, j] = np.bincount(segment, weights=use_present[:, j], minlength=n_scenarios).astype(np.int64)
+        
+        return {
+            'parcel_count': np.bincount(segment, minlength=n_scenarios),
+            'total_demand': np.bincount(segment, weights=parcel_demand, minlength=n_scenarios),
+            'total_units': np.bincount(segment, weights=units, minlength=n_scenarios),
+            'demand_by_use': demand_by_use,
+            'use_present_count': use_present_count,
+            'total_roof_area': np.bincount(segment, weights=roof_area, minlength=n_scenarios),
+            'total_annual_energy': np.bincount(segment, weights=daily_energy * 365, minlength=n_scenarios),
+            'roof_area': roof_area,
+            'available_area': available_area,
+            'daily_energy': daily_energy,
+            'system_size': system_size
+        }
+
+    def _segment_energy_demand(self, arrays: Dict[str, Any], segments: Dict[str, Any], idx: int) -> Dict[str, Any]:
+        """Build the demand analysis for one scenario segment"""
+        total_demand = float(segments['total_demand'][idx])
+        total_units = float(segments['total_units'][idx])
+        demand_by_use = {
+            use_type: float(segments['demand_by_use'][idx, j])
+            for j, use_type in enumerate(arrays['use_types'])
+            if segments['use_present_count'][idx, j] > 0
+        }
+        
+        return {
+            'total_demand_kwh_day': total_demand,
+            'total_demand_kwh_year': total_demand * 365,
+            'demand_by_use': demand_by_use,
+            'avg_demand_per_unit': total_demand / total_units if total_units else 0
+        }
+
+    def _segment_solar_potential(self, arrays: Dict[str, Any], segments: Dict[str, Any], idx: int) -> Dict[str, Any]:
+        """Build the solar analysis for one scenario segment"""
+        rows = np.flatnonzero(arrays['segment'] == idx)
+        parcel_count = len(rows)
+        total_potential = float(segments['total_annual_energy'][idx])
+        
+        solar_by_parcel = [
+            {
+                'parcel_id': arrays['parcel_ids'][i],
+                'roof_area': float(segments['roof_area'][i]),
+                'available_area': float(segments['available_area'][i]),
+                'system_size_kw': float(segments['system_size'][i]),
+                'daily_energy_kwh': float(segments['daily_energy'][i]),
+                'annual_energy_kwh': float(segments['daily_energy'][i] * 365)
+            }
+            for i in rows
+        ]
+        
+        return {
+            'total_annual_energy_kwh': total_potential,
+            'total_roof_area_m2': float(segments['total_roof_area'][idx]),
+            'total_system_size_kw': total_potential / (365 * self.defaults['solar_irradiance'] * self.defaults['panel_efficiency']),
+            'solar_by_parcel': solar_by_parcel,
+            'avg_system_size_kw': total_potential / (parcel_count * 365 * self.defaults['solar_irradiance'] * self.defaults['panel_efficiency']) if parcel_count else 0
+        }
+
     def _calculate_energy_demand(self, parcels: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Calculate energy demand by use type"""
         total_demand = 0
@@ -283,6 +518,41 @@ class EnergyModel:
             cursor.close()
             conn.close()
 
+    def _store_energy_analyses(self, results: Dict[str, Dict[str, Any]]):
+        """Store energy analysis results for several scenarios in one transaction"""
+        conn = psycopg2.connect(**self.db_config)
+        cursor = conn.cursor()
+        
+        try:
+            query = """
+            UPDATE scenarios 
+            SET kpis = jsonb_set(
+                COALESCE(kpis, '{}'::jsonb),
+                '{energy_analysis}',
+                %s::jsonb
+            ),
+            updated_at = NOW()
+            WHERE id = %s
+            """
+            cursor.executemany(query, [
+                (json.dumps({
+                    'demand': result['demand'],
+                    'solar': result['solar'],
+                    'storage': result['storage'],
+                    'emissions': result['emissions']
+                }), scenario_id)
+                for scenario_id, result in results.items()
+            ])
+            
+            conn.commit()
+            
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+
     def get_energy_summary(self, scenario_id: str) -> Dict[str, Any]:
         """Get energy analysis summary for a scenario"""
         try:
@@ -6,6 +6,8 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
 from dotenv import load_dotenv
+from monitoring.instrumentation import instrumented, annotate
+from monitoring.profiling import profiled
 import networkx as nx
 from shapely.geometry import Point, LineString
 import numpy as np
@@ -64,6 +66,8 @@ class MobilityModel:
             'fifteen_minute_transit_distance': 8000,  # meters (15 min * 8.9 m/s)
         }
 
+    @instrumented('mobility')
+    @profiled('mobility')
     def analyze_mobility(self, scenario_id: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze mobility patterns and accessibility for a scenario"""
         try:
@@ -133,6 +137,7 @@ class MobilityModel:
                 'error': str(e)
             }
 
+    @instrumented('mobility', 'db_fetch')
     def _get_scenario_data(self, scenario_id: str) -> Optional[Dict[str, Any]]:
         """Get scenario data including population and land use"""
         conn = psycopg2.connect(**self.db_config)
@@ -152,6 +157,7 @@ class MobilityModel:
             cursor.close()
             conn.close()
 
+    @instrumented('mobility', 'db_fetch')
     def _get_network_data(self, scenario_id: str) -> List[Dict[str, Any]]:
         """Get network links and their properties"""
         conn = psycopg2.connect(**self.db_config)
@@ -170,6 +176,7 @@ class MobilityModel:
             cursor.close()
             conn.close()
 
+    @instrumented('mobility', 'db_fetch')
     def _get_parcels(self, scenario_id: str) -> List[Dict[str, Any]]:
         """Get parcels with capacity and land use data"""
         conn = psycopg2.connect(**self.db_config)
@@ -189,6 +196,7 @@ class MobilityModel:
             cursor.close()
             conn.close()
 
+    @instrumented('mobility', 'db_fetch')
     def _get_amenities(self, scenario_id: str) -> List[Dict[str, Any]]:
         """Get amenities and their locations"""
         conn = psycopg2.connect(**self.db_config)
@@ -679,6 +687,7 @@ class MobilityModel:
         overall_score = (distance_score * 0.4 + density_score * 0.4 + network_score * 0.2)
         return max(0, min(100, overall_score))
 
+    @instrumented('mobility', 'store')
     def _store_mobility_analysis(self, scenario_id: str, analysis_data: Dict[str, Any]):
         """Store mobility analysis results in database"""
         conn = psycopg2.connect(**self.db_config)
@@ -696,9 +705,11 @@ class MobilityModel:
             updated_at = NOW()
             WHERE id = %s
             """
-            cursor.execute(query, (json.dumps(analysis_data), scenario_id))
+            payload = json.dumps(analysis_data)
+            cursor.execute(query, (payload, scenario_id))
             
             conn.commit()
+            annotate(payload_bytes=len(payload))
             
         except Exception as e:
             conn.rollback()
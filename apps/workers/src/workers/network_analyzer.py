@@ -6,6 +6,7 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
 from dotenv import load_dotenv
+from monitoring.instrumentation import instrumented, annotate
 import networkx as nx
 from shapely.geometry import LineString, Point
 from shapely.ops import unary_union
@@ -26,6 +27,7 @@ class NetworkAnalyzer:
             'password': os.getenv('POSTGRES_PASSWORD', 'dev_password')
         }
 
+    @instrumented('network')
     def analyze_network(self, scenario_id: str) -> Dict[str, Any]:
         """Analyze street network and calculate block statistics"""
         try:
@@ -72,6 +74,7 @@ class NetworkAnalyzer:
                 'error': str(e)
             }
 
+    @instrumented('network', 'db_fetch')
     def _get_links(self, scenario_id: str) -> List[Dict[str, Any]]:
         """Get network links from database"""
         conn = psycopg2.connect(**self.db_config)
@@ -90,6 +93,7 @@ class NetworkAnalyzer:
             cursor.close()
             conn.close()
 
+    @instrumented('network', 'db_fetch')
     def _get_parcels(self, scenario_id: str) -> List[Dict[str, Any]]:
         """Get parcels from database"""
         conn = psycopg2.connect(**self.db_config)
@@ -270,6 +274,7 @@ class NetworkAnalyzer:
             'avg_distance_between_intersections': total_length / len(unique_intersections) if unique_intersections else 0
         }
 
+    @instrumented('network', 'store')
     def _store_network_analysis(self, scenario_id: str, analysis_data: Dict[str, Any]):
         """Store network analysis results in database"""
         conn = psycopg2.connect(**self.db_config)
@@ -287,9 +292,11 @@ class NetworkAnalyzer:
             updated_at = NOW()
             WHERE id = %s
             """
-            cursor.execute(query, (json.dumps(analysis_data), scenario_id))
+            payload = json.dumps(analysis_data)
+            cursor.execute(query, (payload, scenario_id))
             
             conn.commit()
+            annotate(payload_bytes=len(payload))
             
         except Exception as e:
             conn.rollback()
@@ -0,0 +1,111 @@
+import copy
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from workers.budget_model import BudgetModel
+
+class TestBudgetCashFlow(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.model = BudgetModel()
+        self.params = dict(self.model.cash_flow_defaults, base_year=2025)
+
+        self.parcels = [
+            {
+                'id': 'parcel-1',
+                'updated_at': '2025-01-01T00:00:00',
+                'area': 1000,
+                'properties': {'useMix': {'residential': 1.0}, 'height': 10, 'phase': 1},
+                'capacity': {'floor_area': 4000, 'units': 40}
+            },
+            {
+                'id': 'parcel-2',
+                'updated_at': '2025-01-01T00:00:00',
+                'area': 1500,
+                'properties': {'useMix': {'commercial': 1.0}, 'height': 24, 'phase': 2},
+                'capacity': {'floor_area': 6000}
+            },
+            {
+                'id': 'parcel-3',
+                'updated_at': '2025-01-01T00:00:00',
+                'area': 900,
+                'properties': {'height': 40, 'phase': 2},
+                'capacity': {'floor_area': 3000, 'units': 30}
+            }
+        ]
+        self.links = [
+            {'id': 'link-1', 'length': 120.0, 'properties': {'phase': 1}, 'link_class': 'arterial',
+             'updated_at': '2025-01-01T00:00:00'},
+            {'id': 'link-2', 'length': 80.0, 'properties': {}, 'link_class': 'local',
+             'updated_at': '2025-01-01T00:00:00'}
+        ]
+
+    def test_base_cash_flow_matches_deterministic_budget(self):
+        """Test unescalated phase subtotals sum to the deterministic budget"""
+        cash_flow = self.model._calculate_phased_cash_flow('scenario-1', self.parcels, self.links, self.params)
+
+        infrastructure = self.model._calculate_infrastructure_costs(self.links)
+        buildings = self.model._calculate_building_costs(self.parcels)
+        sustainability = self.model._calculate_sustainability_costs(self.parcels)
+        soft_costs = self.model._calculate_soft_costs(infrastructure, buildings, sustainability)
+        total = self.model._calculate_total_budget(infrastructure, buildings, sustainability, soft_costs)['total']
+
+        self.assertAlmostEqual(cash_flow['total_base'], total, places=2)
+        self.assertEqual(set(cash_flow['phases']), {'1', '2'})
+        self.assertEqual(set(cash_flow['by_year']), {'2025', '2026', '2027', '2028'})
+        # Later years are escalated above their base cost
+        self.assertGreater(cash_flow['total_escalated'], cash_flow['total_base'])
+
+    def test_location_factor_applied(self):
+        """Test the CostLibrary location factor scales escalated costs"""
+        national = self.model._calculate_phased_cash_flow('scenario-1', self.parcels, self.links, self.params)
+        northeast = self.model._calculate_phased_cash_flow(
+            'scenario-2', self.parcels, self.links, dict(self.params, location='northeast')
+        )
+
+        self.assertAlmostEqual(northeast['total_escalated'], national['total_escalated'] * 1.2, places=2)
+
+    def test_editing_one_phase_recomputes_only_that_phase(self):
+        """Test cached per-phase rows are reused when a phase is unchanged"""
+        first = self.model._calculate_phased_cash_flow('scenario-1', self.parcels, self.links, self.params)
+        self.assertEqual(first['recomputed_phases'], [1, 2])
+
+        edited = copy.deepcopy(self.parcels)
+        edited[1]['capacity']['floor_area'] = 8000
+        edited[1]['updated_at'] = '2025-01-02T00:00:00'
+
+        with patch.object(self.model, '_calculate_phase_rows', wraps=self.model._calculate_phase_rows) as phase_rows:
+            second = self.model._calculate_phased_cash_flow('scenario-1', edited, self.links, self.params)
+
+        self.assertEqual(second['recomputed_phases'], [2])
+        self.assertEqual(second['reused_phases'], [1])
+        self.assertEqual(phase_rows.call_count, 1)
+        self.assertEqual(second['phases']['1'], first['phases']['1'])
+        self.assertGreater(second['phases']['2']['base_subtotal'], first['phases']['2']['base_subtotal'])
+
+    def test_cost_library_change_invalidates_all_phases(self):
+        """Test cost overrides force every phase to be recomputed"""
+        self.model._calculate_phased_cash_flow('scenario-1', self.parcels, self.links, self.params)
+        self.model._update_cost_library({'soft_costs': {'contingency': 0.2}})
+
+        second = self.model._calculate_phased_cash_flow('scenario-1', self.parcels, self.links, self.params)
+
+        self.assertEqual(second['recomputed_phases'], [1, 2])
+
+    def test_rows_without_revision_are_always_recomputed(self):
+        """Test phases whose rows carry no updated_at never reuse cached rows"""
+        parcels = [{k: v for k, v in parcel.items() if k != 'updated_at'} for parcel in self.parcels]
+        self.model._calculate_phased_cash_flow('scenario-1', parcels, self.links, self.params)
+
+        second = self.model._calculate_phased_cash_flow('scenario-1', parcels, self.links, self.params)
+
+        self.assertEqual(second['recomputed_phases'], [1, 2])
+        self.assertEqual(second['reused_phases'], [])
+
+if __name__ == '__main__':
+    unittest.main()
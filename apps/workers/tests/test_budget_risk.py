@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from workers.budget_model import BudgetModel
+
+class TestBudgetRisk(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.model = BudgetModel()
+
+        self.parcels = [
+            {
+                'id': 'parcel-1',
+                'area': 1000,
+                'properties': {'useMix': {'residential': 0.8, 'retail': 0.2}, 'height': 10, 'inclusionary': 15},
+                'capacity': {'floor_area': 4000, 'units': 40, 'solar_potential': {'system_size_kw': 30}}
+            },
+            {
+                'id': 'parcel-2',
+                'area': 1500,
+                'properties': {'height': 24, 'greenRoofPercent': 40},
+                'capacity': {'floor_area': 6000, 'units': 60, 'parking_spaces': 50}
+            }
+        ]
+        self.links = [
+            {'id': 'link-1', 'length': 120.0, 'properties': {}, 'link_class': 'arterial'},
+            {'id': 'link-2', 'length': 80.0, 'properties': {}, 'link_class': 'local'}
+        ]
+
+    def _deterministic_total(self):
+        infrastructure = self.model._calculate_infrastructure_costs(self.links)
+        buildings = self.model._calculate_building_costs(self.parcels)
+        sustainability = self.model._calculate_sustainability_costs(self.parcels)
+        soft_costs = self.model._calculate_soft_costs(infrastructure, buildings, sustainability)
+        return self.model._calculate_total_budget(infrastructure, buildings, sustainability, soft_costs)['total']
+
+    def test_line_items_reproduce_deterministic_budget(self):
+        """Test line items priced at base rates equal the deterministic total"""
+        line_items = self.model._build_line_items(self.parcels, self.links)
+
+        total = line_items['cost'].sum() * (1 + line_items['soft_cost_rate'])
+        self.assertAlmostEqual(total, self._deterministic_total(), places=2)
+
+    def test_simulation_is_seeded_and_ordered(self):
+        """Test seeded simulations are reproducible with ordered percentiles"""
+        line_items = self.model._build_line_items(self.parcels, self.links)
+        risk_params = dict(self.model.risk_defaults, samples=20000, seed=7, chunk_size=3000)
+
+        first = self.model._simulate_budget_risk(line_items, risk_params)
+        second = self.model._simulate_budget_risk(line_items, risk_params)
+
+        self.assertEqual(first['percentiles'], second['percentiles'])
+        self.assertLess(first['percentiles']['p50'], first['percentiles']['p80'])
+        self.assertLess(first['percentiles']['p80'], first['percentiles']['p95'])
+        self.assertEqual(sum(first['histogram']['counts']), 20000)
+        self.assertEqual(len(first['histogram']['bin_edges']), risk_params['histogram_bins'] + 1)
+
+    def test_zero_uncertainty_collapses_to_deterministic(self):
+        """Test no uncertainty and no escalation returns the deterministic total"""
+        line_items = self.model._build_line_items(self.parcels, self.links)
+        risk_params = dict(
+            self.model.risk_defaults,
+            samples=100, seed=1, rate_cv={}, quantity_cv=0.0, completion_years=0
+        )
+
+        result = self.model._simulate_budget_risk(line_items, risk_params)
+
+        self.assertAlmostEqual(result['percentiles']['p95'], self._deterministic_total(), places=2)
+        self.assertAlmostEqual(result['std'], 0.0, places=4)
+
+    @patch('workers.budget_model.psycopg2.connect')
+    def test_calculate_budget_risk(self, mock_connect):
+        """Test the public Monte Carlo entry point"""
+        mock_cursor = Mock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.side_effect = [self.parcels, self.links]
+
+        result = self.model.calculate_budget_risk('test-scenario-1', {'samples': 5000, 'seed': 3})
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data']['samples'], 5000)
+        self.assertIn('p80', result['data']['percentiles'])
+        store_args = mock_cursor.execute.call_args_list[-1][0][1]
+        self.assertEqual(store_args[0], ['budget_risk'])
+
+if __name__ == '__main__':
+    unittest.main()
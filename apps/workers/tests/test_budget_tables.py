@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from workers.budget_model import BudgetModel
+
+class TestBudgetCostTables(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.model = BudgetModel()
+
+        self.parcels = [
+            {
+                'id': 'parcel-1',
+                'area': 1000,
+                'properties': {
+                    'useMix': {'residential': 0.6, 'commercial': 0.3, 'institutional': 0.1},
+                    'height': 10,
+                    'inclusionary': 20
+                },
+                'capacity': {'floor_area': 4000, 'units': 40}
+            },
+            {
+                'id': 'parcel-2',
+                'area': 1500,
+                'properties': {'height': 24},
+                'capacity': {'floor_area': 6000, 'units': 60}
+            },
+            {
+                'id': 'parcel-3',
+                'area': 900,
+                'properties': {'useMix': {'retail': 1.0}, 'height': 45},
+                'capacity': {'floor_area': 3000}
+            },
+            {
+                'id': 'parcel-4',
+                'area': 900,
+                'properties': {'useMix': {'residential': 1.0}, 'height': 45},
+                'capacity': {'floor_area': 5000}
+            }
+        ]
+
+        self.links = [
+            {'id': 'link-1', 'length': 120.0, 'properties': {}, 'link_class': 'arterial'},
+            {'id': 'link-2', 'length': 80.5, 'properties': {}, 'link_class': 'local'},
+            {'id': 'link-3', 'length': 40.0, 'properties': {}, 'link_class': 'alley'},
+            {'id': 'link-4', 'length': 60.0, 'properties': {}, 'link_class': 'local'}
+        ]
+
+    def test_building_costs_match_library_rates(self):
+        """Test vectorized building costs by use type"""
+        costs = self.model._calculate_building_costs(self.parcels)
+
+        self.assertEqual(list(costs), ['residential', 'commercial', 'institutional', 'retail', 'total'])
+        self.assertAlmostEqual(costs['residential'], 37204000.0)
+        self.assertAlmostEqual(costs['commercial'], 3600000.0)
+        self.assertAlmostEqual(costs['institutional'], 1200000.0)
+        self.assertAlmostEqual(costs['retail'], 7500000.0)
+        self.assertAlmostEqual(costs['total'], 49504000.0)
+
+    def test_infrastructure_costs_match_library_rates(self):
+        """Test vectorized infrastructure costs by link class"""
+        costs = self.model._calculate_infrastructure_costs(self.links)
+
+        # Unpriced link classes contribute utilities and parks but no street cost
+        self.assertEqual(costs['streets'], {'arterial': 300000.0, 'local': 168600.0})
+        self.assertAlmostEqual(costs['utilities']['total'], 991650.0)
+        self.assertAlmostEqual(costs['parks']['total'], 90150.0)
+        self.assertAlmostEqual(costs['total'], 1550400.0)
+
+    def test_empty_inputs(self):
+        """Test compiled calculations on empty parcel and link sets"""
+        self.assertEqual(self.model._calculate_building_costs([]), {'total': 0.0})
+        self.assertEqual(self.model._calculate_infrastructure_costs([])['total'], 0.0)
+
+    def test_cost_library_update_recompiles_tables(self):
+        """Test overrides from params invalidate the compiled tables"""
+        before = self.model._calculate_infrastructure_costs(self.links)
+
+        self.model._update_cost_library({'infrastructure': {'streets': {'arterial': 5000, 'local': 1200}}})
+        after = self.model._calculate_infrastructure_costs(self.links)
+
+        self.assertAlmostEqual(after['streets']['arterial'], 600000.0)
+        self.assertAlmostEqual(after['total'] - before['total'], 300000.0)
+
+if __name__ == '__main__':
+    unittest.main()
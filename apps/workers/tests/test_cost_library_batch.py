@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from seeds.cost_library import CostLibrary
+
+class TestCostLibraryBatch(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.library = CostLibrary()
+
+        self.quantity_sets = [
+            {
+                'infrastructure': {'road_construction': 5000, 'water_main': 1200},
+                'buildings': {'residential_multifamily': 20000}
+            },
+            {
+                'buildings': {'commercial_office': 8000, 'unknown_item': 100},
+                'sustainability': {'solar_pv_rooftop': 250}
+            },
+            {
+                'landscaping': {'tree_planting': 300}
+            }
+        ]
+        self.locations = ['northeast', 'midwest', 'West']
+
+    def test_batch_matches_single_estimates(self):
+        """Test each batch row equals calculate_total_cost for the same inputs"""
+        batch = self.library.calculate_total_cost_batch(self.quantity_sets, self.locations)
+
+        for row, (quantities, location) in enumerate(zip(self.quantity_sets, self.locations)):
+            single = self.library.calculate_total_cost(quantities, location)
+
+            self.assertAlmostEqual(batch['total_cost'][row], single['total_cost'])
+            self.assertAlmostEqual(batch['location_factor'][row], single['location_factor'])
+            for category in quantities:
+                self.assertAlmostEqual(
+                    batch['category_totals'][category][row],
+                    single['cost_breakdown'][category]['total']
+                )
+                for name, item in single['cost_breakdown'][category]['items'].items():
+                    self.assertAlmostEqual(batch['item_costs'][name][row], item['total_cost'])
+
+    def test_single_location_broadcasts(self):
+        """Test a single location string applies to every quantity set"""
+        batch = self.library.calculate_total_cost_batch(self.quantity_sets, 'southeast')
+
+        self.assertEqual(list(batch['location_factor']), [0.9, 0.9, 0.9])
+        self.assertNotIn('buildings_unknown_item', batch['item_costs'])
+
+    def test_mismatched_locations_rejected(self):
+        """Test a location list of the wrong length is rejected"""
+        with self.assertRaises(ValueError):
+            self.library.calculate_total_cost_batch(self.quantity_sets, ['west'])
+
+    def test_single_breakdown_groups_items_by_category(self):
+        """Test category breakdowns only contain their own items"""
+        result = self.library.calculate_total_cost(self.quantity_sets[0], 'national')
+
+        self.assertEqual(
+            set(result['cost_breakdown']['infrastructure']['items']),
+            {'infrastructure_road_construction', 'infrastructure_water_main'}
+        )
+        self.assertAlmostEqual(result['total_cost'], 5000 * 250 + 1200 * 220 + 20000 * 2200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from workers.energy_model import EnergyModel
+
+class TestEnergyBatch(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.model = EnergyModel()
+
+        self.parcels_a = [
+            {
+                'id': 'parcel-a1',
+                'area': 1000,
+                'properties': {'useMix': {'residential': 0.7, 'commercial': 0.3}},
+                'capacity': {'units': 20, 'floor_area': 3000, 'floors': 4}
+            },
+            {
+                'id': 'parcel-a2',
+                'area': 800,
+                'properties': {},
+                'capacity': {'units': 10, 'floor_area': 1200, 'floors': 3}
+            }
+        ]
+        self.parcels_b = [
+            {
+                'id': 'parcel-b1',
+                'area': 2000,
+                'properties': {'useMix': {'industrial': 1.0}},
+                'capacity': {'units': 0, 'floor_area': 5000, 'floors': 2}
+            }
+        ]
+
+    def _with_scenario(self, parcels, scenario_id):
+        return [dict(parcel, scenario_id=scenario_id) for parcel in parcels]
+
+    @patch('workers.energy_model.psycopg2.connect')
+    def test_batch_matches_single_scenario_results(self, mock_connect):
+        """Test batch results equal the per-scenario analysis"""
+        mock_cursor = Mock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = (
+            self._with_scenario(self.parcels_a, 'scenario-a') +
+            self._with_scenario(self.parcels_b, 'scenario-b')
+        )
+
+        result = self.model.analyze_energy_batch(['scenario-a', 'scenario-b'])
+
+        self.assertTrue(result['success'])
+        for scenario_id, parcels in (('scenario-a', self.parcels_a), ('scenario-b', self.parcels_b)):
+            batch = result['data'][scenario_id]
+            demand = self.model._calculate_energy_demand(parcels)
+            solar = self.model._calculate_solar_potential(parcels)
+
+            self.assertAlmostEqual(batch['demand']['total_demand_kwh_day'], demand['total_demand_kwh_day'])
+            self.assertAlmostEqual(batch['demand']['avg_demand_per_unit'], demand['avg_demand_per_unit'])
+            self.assertEqual(set(batch['demand']['demand_by_use']), set(demand['demand_by_use']))
+            for use_type, value in demand['demand_by_use'].items():
+                self.assertAlmostEqual(batch['demand']['demand_by_use'][use_type], value)
+            self.assertAlmostEqual(batch['solar']['total_annual_energy_kwh'], solar['total_annual_energy_kwh'])
+            self.assertAlmostEqual(batch['solar']['total_roof_area_m2'], solar['total_roof_area_m2'])
+            self.assertEqual(len(batch['solar']['solar_by_parcel']), len(parcels))
+            self.assertGreaterEqual(batch['timing_ms'], 0)
+
+    @patch('workers.energy_model.psycopg2.connect')
+    def test_batch_uses_single_fetch_and_single_transaction(self, mock_connect):
+        """Test batch loads parcels in one query and stores in one commit"""
+        mock_cursor = Mock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = self._with_scenario(self.parcels_a, 'scenario-a')
+
+        result = self.model.analyze_energy_batch(['scenario-a', 'scenario-empty'])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(mock_cursor.execute.call_count, 1)
+        self.assertEqual(mock_cursor.executemany.call_count, 1)
+        self.assertEqual(mock_connect.return_value.commit.call_count, 1)
+        self.assertEqual(result['errors'], {'scenario-empty': 'No parcels found for scenario'})
+        self.assertIn('fetch_ms', result['timing'])
+
+    def test_batch_empty_ids(self):
+        """Test batch analysis rejects an empty scenario list"""
+        result = self.model.analyze_energy_batch([])
+
+        self.assertFalse(result['success'])
+
+if __name__ == '__main__':
+    unittest.main()
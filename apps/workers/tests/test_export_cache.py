@@ -0,0 +1,134 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from io import BytesIO
+from unittest.mock import patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exports.data_exporter import DataExporter
+from exports.export_cache import ExportCache, LocalBlobStore
+
+class TestExportCache(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = ExportCache(LocalBlobStore(self.cache_dir.name), max_bytes=1024)
+
+        self.exporter = DataExporter()
+        self.exporter.export_cache = self.cache
+        self.scenario_data = {
+            'scenario': {'id': 'scenario-1', 'name': 'Downtown'},
+            'parcels': [],
+            'links': [],
+            'analysis': {}
+        }
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_key_covers_every_request_field(self):
+        """Test each request field changes the cache key"""
+        base = ('rev-1', 'csv', True, True, None)
+        keys = {
+            ExportCache.make_key(*base),
+            ExportCache.make_key('rev-2', 'csv', True, True, None),
+            ExportCache.make_key('rev-1', 'dxf', True, True, None),
+            ExportCache.make_key('rev-1', 'csv', False, True, None),
+            ExportCache.make_key('rev-1', 'csv', True, False, None),
+            ExportCache.make_key('rev-1', 'csv', True, True, 'executive')
+        }
+
+        self.assertEqual(len(keys), 6)
+        self.assertEqual(ExportCache.make_key(*base), ExportCache.make_key(*base))
+
+    def test_identical_content_is_stored_once(self):
+        """Test different keys with the same bytes share one blob"""
+        first = self.cache.put('key-a', BytesIO(b'same bytes'), {'file_url': 'a'})
+        second = self.cache.put('key-b', BytesIO(b'same bytes'), {'file_url': 'b'})
+
+        self.assertEqual(first['digest'], second['digest'])
+        self.assertEqual(len(self.cache.store.list('blobs')), 1)
+        self.assertEqual(self.cache.get('key-b')['file_url'], 'b')
+
+    def test_least_recently_used_blob_evicted(self):
+        """Test the cache stays within max_bytes by dropping the oldest blob"""
+        self.cache.put('old', BytesIO(b'a' * 600), {})
+        self.cache.put('new', BytesIO(b'b' * 600), {})
+
+        self.assertIsNone(self.cache.get('old'))
+        self.assertIsNotNone(self.cache.get('new'))
+        self.assertEqual(self.cache.stats['evictions'], 1)
+        self.assertFalse(self.cache.store.exists('keys/old'))
+
+    def test_hit_refreshes_index_without_touching_blobs(self):
+        """Test a hit keeps its blob by updating the index instead of rewriting or listing blobs"""
+        self.cache.put('first', BytesIO(b'a' * 400), {})
+        self.cache.put('second', BytesIO(b'b' * 400), {})
+
+        with patch.object(self.cache.store, 'write', wraps=self.cache.store.write) as write, \
+             patch.object(self.cache.store, 'list', wraps=self.cache.store.list) as listing:
+            self.cache.get('first')
+            self.cache.put('third', BytesIO(b'c' * 400), {})
+
+        blob_writes = [call for call in write.call_args_list if call[0][0].startswith('blobs/')]
+        self.assertEqual(len(blob_writes), 1)
+        listing.assert_not_called()
+        self.assertIsNotNone(self.cache.get('first'))
+        self.assertIsNone(self.cache.get('second'))
+        self.assertFalse(self.cache.store.exists('keys/second'))
+
+    def test_export_hit_skips_generation(self):
+        """Test a repeat request for an unchanged revision returns the stored URL"""
+        generated = {'success': True, 'data': b'id,type\n'}
+
+        with patch.object(self.exporter, '_get_export_revision', return_value='rev-1'), \
+             patch.object(self.exporter, '_get_scenario_data', return_value=self.scenario_data), \
+             patch.object(self.exporter, '_generate_export', return_value=generated) as generate, \
+             patch.object(self.exporter, '_store_export_metadata'):
+            first = self.exporter.export_scenario_data('scenario-1', 'csv')
+            second = self.exporter.export_scenario_data('scenario-1', 'csv')
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertFalse(first['data']['cached'])
+        self.assertTrue(second['data']['cached'])
+        self.assertEqual(second['data']['file_url'], first['data']['file_url'])
+        self.assertEqual(second['data']['file_size'], len(generated['data']))
+
+    def test_revision_change_regenerates(self):
+        """Test edits to the scenario miss the cache"""
+        generated = {'success': True, 'data': b'id,type\n'}
+
+        with patch.object(self.exporter, '_get_export_revision', side_effect=['rev-1', 'rev-2']), \
+             patch.object(self.exporter, '_get_scenario_data', return_value=self.scenario_data), \
+             patch.object(self.exporter, '_generate_export', return_value=generated) as generate, \
+             patch.object(self.exporter, '_store_export_metadata'):
+            self.exporter.export_scenario_data('scenario-1', 'csv')
+            second = self.exporter.export_scenario_data('scenario-1', 'csv')
+
+        self.assertEqual(generate.call_count, 2)
+        self.assertFalse(second['data']['cached'])
+
+    def test_expired_url_is_resigned_from_cached_blob(self):
+        """Test a hit with an expired signed URL re-signs without regenerating"""
+        key = ExportCache.make_key('rev-1', 'csv', True, True)
+        expired = (datetime.now() - timedelta(hours=1)).isoformat()
+        self.cache.put(key, BytesIO(b'id,type\n'), {
+            'export_format': 'csv', 'file_url': 'https://old', 'expires_at': expired, 'exported_at': expired
+        })
+
+        with patch.object(self.exporter, '_get_export_revision', return_value='rev-1'), \
+             patch.object(self.exporter, '_generate_export') as generate, \
+             patch.object(self.exporter, '_store_export_metadata'):
+            result = self.exporter.export_scenario_data('scenario-1', 'csv')
+
+        generate.assert_not_called()
+        self.assertTrue(result['data']['cached'])
+        self.assertNotEqual(result['data']['file_url'], 'https://old')
+        self.assertEqual(self.cache.get(key)['file_url'], result['data']['file_url'])
+
+if __name__ == '__main__':
+    unittest.main()
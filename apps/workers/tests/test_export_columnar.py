@@ -0,0 +1,109 @@
+import json
+import unittest
+from io import BytesIO
+from unittest.mock import MagicMock
+import sys
+import os
+import geopandas as gpd
+import pyarrow.parquet as pq
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exports.data_exporter import DataExporter, ScenarioRowStream
+
+class TestExportColumnar(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.exporter = DataExporter()
+
+        self.scenario_data = {
+            'scenario': {'id': 'scenario-1', 'name': 'Downtown'},
+            'parcels': [
+                {
+                    'id': 'parcel-1',
+                    'geometry': '{"type":"Polygon","coordinates":[[[0,0],[1,0],[1,1],[0,0]]]}',
+                    'properties': {'far': 2, 'height': 12.5, 'useMix': {'residential': 0.7, 'retail': 0.3}, 'tags': ['a']},
+                    'capacity': {'units': 12},
+                    'utilities': None
+                },
+                {
+                    'id': 'parcel-2',
+                    'geometry': '{"type":"Polygon","coordinates":[[[2,2],[3,2],[3,3],[2,2]]]}',
+                    'properties': {'far': 3.5, 'protected': True},
+                    'capacity': None,
+                    'utilities': None
+                }
+            ],
+            'links': [
+                {
+                    'id': 'link-1',
+                    'geometry': '{"type":"LineString","coordinates":[[0,0],[3,3]]}',
+                    'properties': {'lanes': 2},
+                    'link_class': 'arterial'
+                }
+            ],
+            'analysis': {}
+        }
+
+    def test_column_types_flatten_nested_properties(self):
+        """Test nested objects become typed scalar columns"""
+        column_types = self.exporter._column_types(self.scenario_data)
+
+        self.assertEqual(column_types['far'], 'float')
+        self.assertEqual(column_types['height'], 'float')
+        self.assertEqual(column_types['useMix_residential'], 'float')
+        self.assertEqual(column_types['capacity_units'], 'int')
+        self.assertEqual(column_types['protected'], 'bool')
+        self.assertEqual(column_types['lanes'], 'int')
+        self.assertEqual(column_types['tags'], 'str')
+        self.assertEqual(column_types['link_class'], 'str')
+
+    def test_geoparquet_round_trip(self):
+        """Test GeoParquet output reads back with typed columns and one row group per chunk"""
+        self.exporter.stream_config['row_group_rows'] = 2
+
+        result = self.exporter._export_geoparquet(self.scenario_data)
+
+        self.assertTrue(result['success'])
+        with result['data'] as spool:
+            spool.seek(0)
+            data = spool.read()
+        parquet_file = pq.ParquetFile(BytesIO(data))
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        self.assertEqual(json.loads(parquet_file.schema_arrow.metadata[b'urban_planner'])['parcel_count'], 2)
+
+        frame = gpd.read_parquet(BytesIO(data))
+        self.assertEqual(list(frame['id']), ['parcel-1', 'parcel-2', 'link-1'])
+        self.assertEqual(str(frame['far'].dtype), 'float64')
+        self.assertEqual(list(frame.geometry.geom_type), ['Polygon', 'Polygon', 'LineString'])
+        self.assertEqual(frame['tags'][0], '["a"]')
+        self.assertAlmostEqual(frame['useMix_retail'][0], 0.3)
+
+    def test_flatgeobuf_round_trip(self):
+        """Test FlatGeobuf output carries every feature and a spatial index"""
+        result = self.exporter._export_flatgeobuf(self.scenario_data)
+
+        self.assertTrue(result['success'])
+        with result['data'] as f:
+            data = f.read()
+        self.assertEqual(data[:3], b'fgb')
+        frame = gpd.read_file(BytesIO(data), engine='pyogrio')
+        self.assertEqual(sorted(frame['id']), ['link-1', 'parcel-1', 'parcel-2'])
+        self.assertEqual(frame.loc[frame['id'] == 'link-1', 'lanes'].iloc[0], 2)
+
+    def test_stream_schema_pass_skips_geometry(self):
+        """Test schema inference over streams re-queries without the geometry column"""
+        cursor = MagicMock()
+        cursor.__iter__.return_value = iter([{'attributes': {'id': 'parcel-1', 'properties': {'far': 2}}}])
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        stream = ScenarioRowStream(conn, 'export_parcels', 'SELECT * FROM parcels', ('scenario-1',), 1)
+
+        rows = list(self.exporter._attribute_rows(stream))
+
+        self.assertEqual(rows, [{'id': 'parcel-1', 'properties': {'far': 2}}])
+        self.assertIn("- 'geometry'", cursor.execute.call_args[0][0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import json
+import unittest
+import zipfile
+from io import BytesIO
+from unittest.mock import patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exports.data_exporter import DataExporter
+
+class TestExportMultiFormat(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.exporter = DataExporter()
+
+        self.scenario_data = {
+            'scenario': {'id': 'scenario-1', 'name': 'Downtown'},
+            'parcels': [
+                {
+                    'id': 'parcel-1',
+                    'geometry': '{"type":"Polygon","coordinates":[[[0,0],[1,0],[1,1],[0,0]]]}',
+                    'properties': {'zoning': 'R3'},
+                    'capacity': {'units': 12},
+                    'utilities': None
+                }
+            ],
+            'links': [
+                {
+                    'id': 'link-1',
+                    'geometry': '{"type":"LineString","coordinates":[[0,0],[1,1]]}',
+                    'properties': {},
+                    'link_class': 'local'
+                }
+            ],
+            'analysis': {}
+        }
+
+    def _write_shapefile(self, scenario_data, include_metadata, directory):
+        # A stand-in for the shapefile components written by geopandas
+        for name, data in (('parcels.shp', b'shape-bytes' * 200), ('parcels.dbf', b'table-bytes' * 50)):
+            with open(os.path.join(directory, name), 'wb') as f:
+                f.write(data)
+        return ['parcels.shp', 'parcels.dbf']
+
+    def _generate_export(self, scenario_data, export_format, include_metadata=True):
+        if export_format == 'shapefile':
+            raise AssertionError('shapefile components must not pass through a ZIP')
+        if export_format == 'gpkg':
+            return {'success': False, 'error': 'driver unavailable'}
+        return DataExporter._generate_export(self.exporter, scenario_data, export_format, include_metadata)
+
+    def test_bundle_contains_every_rendered_format(self):
+        """Test concurrent writers produce the same members as the sequential bundle"""
+        output = BytesIO()
+
+        with patch.object(self.exporter, '_generate_export', side_effect=self._generate_export), \
+             patch.object(self.exporter, '_write_shapefile', side_effect=self._write_shapefile):
+            self.exporter._create_multi_format_zip(self.scenario_data, ['geojson', 'shapefile', 'csv', 'gpkg'], output)
+
+        with zipfile.ZipFile(BytesIO(output.getvalue())) as bundle:
+            self.assertIsNone(bundle.testzip())
+            self.assertEqual(
+                bundle.namelist(),
+                ['geojson/data.geojson', 'shapefile/parcels.shp', 'shapefile/parcels.dbf', 'csv/data.csv', 'metadata.json']
+            )
+            geojson = json.loads(bundle.read('geojson/data.geojson'))
+            self.assertEqual(len(geojson['features']), 2)
+            self.assertEqual(bundle.read('shapefile/parcels.shp'), b'shape-bytes' * 200)
+            self.assertEqual(json.loads(bundle.read('metadata.json'))['parcel_count'], 1)
+
+    def test_shapefile_components_are_deflated_once(self):
+        """Test shapefile components go into the bundle as plain files rather than an inner archive"""
+        output = BytesIO()
+
+        with patch.object(self.exporter, '_write_shapefile', side_effect=self._write_shapefile), \
+             patch('exports.data_exporter.zipfile.ZipFile', wraps=zipfile.ZipFile) as zip_file:
+            self.exporter._create_multi_format_zip(self.scenario_data, ['shapefile'], output)
+
+        # Only the bundle itself is opened
+        self.assertEqual(zip_file.call_count, 1)
+        with zipfile.ZipFile(BytesIO(output.getvalue())) as bundle:
+            member = bundle.getinfo('shapefile/parcels.dbf')
+            self.assertEqual(member.compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(bundle.read(member), b'table-bytes' * 50)
+
+    def test_shapefile_export_writes_real_components(self):
+        """Test the single-format shapefile export zips the components geopandas writes"""
+        result = self.exporter._export_shapefile(self.scenario_data)
+
+        self.assertTrue(result['success'])
+        with result['data'] as spool:
+            spool.seek(0)
+            with zipfile.ZipFile(spool) as archive:
+                names = archive.namelist()
+        self.assertIn('parcels.shp', names)
+        self.assertIn('links.dbf', names)
+        self.assertIn('metadata.json', names)
+
+    def test_export_multiple_formats_fetches_one_snapshot(self):
+        """Test the bundle fetches rows once and stores the spooled archive"""
+        with patch.object(self.exporter, '_get_scenario_data', return_value=self.scenario_data) as get_data, \
+             patch.object(self.exporter, '_store_export_metadata') as store_metadata:
+            result = self.exporter.export_multiple_formats('scenario-1', ['geojson', 'csv', 'dxf'])
+
+        self.assertTrue(result['success'])
+        get_data.assert_called_once_with('scenario-1', True, chunked=False)
+        self.assertEqual(store_metadata.call_args[0][3], result['data']['file_size'])
+
+if __name__ == '__main__':
+    unittest.main()
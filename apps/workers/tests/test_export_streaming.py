@@ -0,0 +1,178 @@
+import json
+import unittest
+from io import BytesIO
+from unittest.mock import MagicMock, Mock, patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from psycopg2.extensions import ISOLATION_LEVEL_REPEATABLE_READ
+from exports.data_exporter import DataExporter, ScenarioRowStream
+
+class TestExportStreaming(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.exporter = DataExporter()
+
+        self.scenario = {'id': 'scenario-1', 'name': 'Downtown', 'parcel_count': 1, 'link_count': 1, 'kpis': {}}
+        self.parcels = [
+            {
+                'id': 'parcel-1',
+                'geometry': '{"type":"Polygon","coordinates":[[[0,0],[1,0],[1,1],[0,0]]]}',
+                'properties': {'zoning': 'R3'},
+                'capacity': {'units': 12},
+                'utilities': None
+            }
+        ]
+        self.links = [
+            {
+                'id': 'link-1',
+                'geometry': '{"type":"LineString","coordinates":[[0,0],[1,1]]}',
+                'properties': None,
+                'link_class': 'local'
+            }
+        ]
+
+    def _mock_connection(self, mock_connect):
+        """Return a connection whose named cursors iterate parcel then link rows"""
+        scenario_cursor = Mock()
+        scenario_cursor.fetchone.return_value = self.scenario
+        parcel_cursor = MagicMock()
+        parcel_cursor.__iter__.return_value = iter(self.parcels)
+        link_cursor = MagicMock()
+        link_cursor.__iter__.return_value = iter(self.links)
+
+        mock_connect.return_value.cursor.side_effect = [scenario_cursor, parcel_cursor, link_cursor]
+        return parcel_cursor, link_cursor
+
+    @patch('exports.data_exporter.psycopg2.connect')
+    def test_stream_writes_valid_compact_geojson(self, mock_connect):
+        """Test streamed output parses and keeps geometry text unchanged"""
+        parcel_cursor, link_cursor = self._mock_connection(mock_connect)
+        output = BytesIO()
+
+        result = self.exporter.export_geojson_stream('scenario-1', output)
+
+        self.assertTrue(result['success'])
+        raw = output.getvalue()
+        self.assertEqual(result['data']['bytes_written'], len(raw))
+        self.assertIn(self.parcels[0]['geometry'].encode(), raw)
+        self.assertNotIn(b'\n', raw)
+
+        geojson = json.loads(raw)
+        self.assertEqual(geojson['type'], 'FeatureCollection')
+        self.assertEqual(len(geojson['features']), 2)
+        self.assertEqual(geojson['features'][0]['properties'], {'id': 'parcel-1', 'type': 'parcel', 'zoning': 'R3', 'capacity': {'units': 12}})
+        self.assertEqual(geojson['features'][1]['properties'], {'id': 'link-1', 'type': 'link', 'link_class': 'local'})
+        self.assertEqual(geojson['metadata']['parcel_count'], 1)
+        self.assertEqual(geojson['metadata']['link_count'], 1)
+
+        # Rows come from server-side cursors
+        self.assertEqual(parcel_cursor.itersize, self.exporter.stream_config['itersize'])
+        self.assertIn('name', mock_connect.return_value.cursor.call_args_list[1][1])
+        parcel_cursor.close.assert_called_once()
+        link_cursor.close.assert_called_once()
+
+        # Both streams read one REPEATABLE READ snapshot, released once written
+        mock_connect.assert_called_once()
+        self.assertEqual(mock_connect.return_value.set_session.call_args[1]['isolation_level'],
+                         ISOLATION_LEVEL_REPEATABLE_READ)
+        mock_connect.return_value.close.assert_called_once()
+
+    def test_in_memory_export_matches_stream_layout(self):
+        """Test the in-memory GeoJSON writer produces the same feature collection"""
+        result = self.exporter._export_geojson(
+            {'scenario': self.scenario, 'parcels': self.parcels, 'links': self.links}, include_metadata=False
+        )
+
+        with result['data'] as spool:
+            spool.seek(0)
+            geojson = json.loads(spool.read())
+        self.assertNotIn('metadata', geojson)
+        self.assertEqual(geojson['features'][1]['geometry']['type'], 'LineString')
+
+    @patch('exports.data_exporter.psycopg2.connect')
+    def test_export_scenario_data_streams_geojson(self, mock_connect):
+        """Test GeoJSON exports are stored from the spooled stream"""
+        self._mock_connection(mock_connect)
+
+        with patch.object(self.exporter, '_store_export_metadata') as store_metadata, \
+             patch.object(self.exporter, '_get_export_revision', return_value=None):
+            result = self.exporter.export_scenario_data('scenario-1', 'geojson')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data']['feature_count'], 2)
+        self.assertEqual(store_metadata.call_args[0][3], result['data']['file_size'])
+
+    @patch('exports.data_exporter.psycopg2.connect')
+    def test_chunked_fetch_returns_lazy_streams(self, mock_connect):
+        """Test chunked mode defers row fetching to the writers"""
+        scenario_cursor = Mock()
+        scenario_cursor.fetchone.return_value = self.scenario
+        mock_connect.return_value.cursor.return_value = scenario_cursor
+
+        scenario_data = self.exporter._get_scenario_data('scenario-1', chunked=True, itersize=500)
+
+        self.assertIsInstance(scenario_data['parcels'], ScenarioRowStream)
+        self.assertEqual(len(scenario_data['parcels']), 1)
+        self.assertEqual(len(scenario_data['links']), 1)
+        self.assertEqual(scenario_data['parcels'].itersize, 500)
+        scenario_cursor.fetchall.assert_not_called()
+
+    def test_row_stream_is_reiterable(self):
+        """Test each pass over a stream opens its own server-side cursor on the shared connection"""
+        cursors = []
+        def named_cursor(**kwargs):
+            cursor = MagicMock()
+            cursor.__iter__.return_value = iter(self.parcels)
+            cursors.append(cursor)
+            return cursor
+        conn = Mock()
+        conn.cursor.side_effect = named_cursor
+
+        stream = ScenarioRowStream(conn, 'export_parcels', 'SELECT 1', ('scenario-1',), 1, itersize=50)
+
+        self.assertEqual(list(stream), self.parcels)
+        self.assertEqual(list(stream), self.parcels)
+        self.assertEqual([cursor.itersize for cursor in cursors], [50, 50])
+        self.assertTrue(all(cursor.close.called for cursor in cursors))
+        conn.close.assert_not_called()
+
+    def test_csv_writer_consumes_streams(self):
+        """Test CSV columns come from the stream key query and rows are written incrementally"""
+        parcels = Mock(spec=ScenarioRowStream)
+        parcels.__iter__ = Mock(return_value=iter(self.parcels))
+        parcels.property_keys.return_value = ['zoning']
+        links = Mock(spec=ScenarioRowStream)
+        links.__iter__ = Mock(return_value=iter(self.links))
+        links.property_keys.return_value = []
+
+        result = self.exporter._export_csv({'scenario': self.scenario, 'parcels': parcels, 'links': links})
+
+        with result['data'] as spool:
+            spool.seek(0)
+            lines = spool.read().decode('utf-8').splitlines()
+        self.assertEqual(lines[0], 'id,type,geometry_type,zoning,capacity_units,capacity_population,capacity_jobs,link_class')
+        self.assertEqual(lines[1], 'parcel-1,parcel,Polygon,R3,12,0,0,')
+        self.assertEqual(lines[2], 'link-1,link,LineString,,,,,local')
+
+    def test_csv_ignores_keys_missing_from_key_query(self):
+        """Test a properties key the key query did not report is dropped instead of failing the export"""
+        parcels = Mock(spec=ScenarioRowStream)
+        parcels.__iter__ = Mock(return_value=iter(self.parcels))
+        parcels.property_keys.return_value = []
+        links = Mock(spec=ScenarioRowStream)
+        links.__iter__ = Mock(return_value=iter(self.links))
+        links.property_keys.return_value = []
+
+        result = self.exporter._export_csv({'scenario': self.scenario, 'parcels': parcels, 'links': links})
+
+        self.assertTrue(result['success'])
+        with result['data'] as spool:
+            spool.seek(0)
+            self.assertNotIn(b'R3', spool.read())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import importlib
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import monitoring.instrumentation as instrumentation
+from monitoring.instrumentation import instrumented, annotate, TimingRecorder
+from monitoring.openmetrics import MetricsRegistry
+from monitoring.slo_dashboards import SLODashboard
+import workers.capacity_engine as capacity_engine
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.registry = MetricsRegistry()
+        self.recorder = TimingRecorder(SLODashboard(), registry=self.registry)
+        instrumentation.set_recorder(self.recorder)
+
+    def tearDown(self):
+        """Restore the process-wide recorder"""
+        instrumentation.set_recorder(None)
+
+    def _latest(self, name):
+        return self.recorder.dashboard.metrics[name].latest(1)[1][0]
+
+    def test_disabled_worker_is_not_wrapped(self):
+        """Test a disabled worker gets its function back unchanged"""
+        def calculate():
+            return 42
+
+        self.assertIs(instrumented('capacity', enabled=False)(calculate), calculate)
+        with patch.object(instrumentation, 'ENABLED_WORKERS', frozenset()):
+            self.assertIs(instrumented('capacity')(calculate), calculate)
+        with patch.object(instrumentation, 'ENABLED_WORKERS', frozenset({'all'})):
+            self.assertIsNot(instrumented('capacity')(calculate), calculate)
+
+    def test_phases_roll_up_into_entry_point(self):
+        """Test fetch and store phases record rows and bytes and the entry point records compute time"""
+        @instrumented('demo', 'db_fetch', enabled=True)
+        def get_rows():
+            return [1, 2, 3]
+
+        @instrumented('demo', 'store', enabled=True)
+        def store_rows(rows):
+            annotate(payload_bytes=128)
+
+        @instrumented('demo', enabled=True)
+        def run():
+            store_rows(get_rows())
+            return {'success': True}
+
+        run()
+
+        self.assertEqual(self._latest('demo_get_rows_rows'), 3)
+        self.assertEqual(self._latest('demo_store_rows_payload'), 128)
+        self.assertEqual(self._latest('demo_run_rows'), 3)
+        self.assertEqual(self._latest('demo_run_payload'), 128)
+        self.assertEqual(self._latest('demo_run_success_rate'), 100.0)
+        self.assertLessEqual(self._latest('demo_run_compute_duration'), self._latest('demo_run_duration'))
+
+        family = next(f for f in self.registry.snapshot()['families'] if f['name'] == 'urban_planner_worker_phase_duration_seconds')
+        phases = {tuple(sample['labels']) for sample in family['samples']}
+        self.assertIn(('demo', 'run', 'compute'), phases)
+        self.assertIn(('demo', 'get_rows', 'db_fetch'), phases)
+
+    def test_failures_are_recorded(self):
+        """Test error results and exceptions count against the success rate"""
+        @instrumented('demo', enabled=True)
+        def failing():
+            return {'success': False, 'error': 'No parcels found for scenario'}
+
+        @instrumented('demo', enabled=True)
+        def raising():
+            raise RuntimeError('boom')
+
+        failing()
+        with self.assertRaises(RuntimeError):
+            raising()
+
+        self.assertEqual(self._latest('demo_failing_success_rate'), 0.0)
+        self.assertEqual(self._latest('demo_raising_success_rate'), 0.0)
+
+    def test_annotate_outside_instrumented_call(self):
+        """Test annotate is a no-op when nothing is being timed"""
+        annotate(rows=10, payload_bytes=10)
+
+    def test_capacity_engine_records_phases_when_enabled(self):
+        """Test enabling the capacity worker times calculate_capacity and its DB phases"""
+        with patch.object(instrumentation, 'ENABLED_WORKERS', frozenset({'capacity'})):
+            module = importlib.reload(capacity_engine)
+        try:
+            engine = module.CapacityEngine()
+            cursor = MagicMock()
+            cursor.fetchall.return_value = [
+                {'id': 'p1', 'area': 1000.0, 'properties': {'useMix': {'residential': 1.0}}},
+                {'id': 'p2', 'area': 2000.0, 'properties': {'useMix': {'commercial': 1.0}}}
+            ]
+            with patch.object(module.psycopg2, 'connect') as connect:
+                connect.return_value.cursor.return_value = cursor
+                result = engine.calculate_capacity('scenario-1')
+        finally:
+            importlib.reload(capacity_engine)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(self._latest('capacity_get_parcels_rows'), 2)
+        self.assertEqual(self._latest('capacity_store_capacity_results_rows'), 2)
+        self.assertGreater(self._latest('capacity_store_capacity_results_payload'), 0)
+        self.assertEqual(self._latest('capacity_calculate_capacity_rows'), 4)
+        self.assertIn('capacity_calculate_capacity_compute_duration', self.recorder.dashboard.metrics)
+
+if __name__ == '__main__':
+    unittest.main()
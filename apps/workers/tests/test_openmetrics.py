@@ -0,0 +1,116 @@
+import unittest
+import json
+import sys
+import os
+import tempfile
+import time
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from monitoring.openmetrics import MetricsRegistry
+from monitoring.slo_dashboards import UrbanPlannerMonitor
+
+class TestOpenMetrics(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.registry = MetricsRegistry()
+
+    def _family(self, name):
+        return next(f for f in self.registry.snapshot()['families'] if f['name'] == name)
+
+    def test_histogram_buckets_use_upper_bounds(self):
+        """Test observations land in the first bucket whose bound is >= the value"""
+        histogram = self.registry.histogram('job_duration_seconds', 'Job time', [1, 5, 10], unit='seconds')
+        for value in [0.5, 1, 3, 10, 42]:
+            histogram.observe(value)
+
+        sample = self._family('job_duration_seconds')['samples'][0]
+        self.assertEqual(sample['counts'], [2, 1, 1, 1])
+        self.assertEqual(sample['count'], 5)
+        self.assertAlmostEqual(sample['sum'], 56.5)
+
+    def test_label_children_are_cached(self):
+        """Test repeated label values reuse the same child and validate the label count"""
+        counter = self.registry.counter('jobs', 'Jobs', ['kind', 'outcome'])
+
+        self.assertIs(counter.labels('tiles', 'success'), counter.labels('tiles', 'success'))
+        counter.labels('tiles', 'success').inc()
+        counter.labels('tiles', 'success').inc(2)
+        counter.labels('tiles', 'failure').inc()
+
+        samples = {tuple(s['labels']): s['value'] for s in self._family('jobs')['samples']}
+        self.assertEqual(samples, {('tiles', 'success'): 3, ('tiles', 'failure'): 1})
+        with self.assertRaises(ValueError):
+            counter.labels('tiles')
+        with self.assertRaises(ValueError):
+            counter.labels('tiles', 'success').inc(-1)
+
+    def test_registration_is_shared(self):
+        """Test registering the same family twice returns it and conflicting types are rejected"""
+        first = self.registry.gauge('depth', 'Queue depth')
+
+        self.assertIs(self.registry.gauge('depth', 'Queue depth'), first)
+        with self.assertRaises(ValueError):
+            self.registry.counter('depth', 'Queue depth')
+
+    def test_flush_writes_snapshot_atomically(self):
+        """Test a flush writes one JSON file per process only when metrics changed"""
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            registry = MetricsRegistry(snapshot_dir, flush_interval=3600)
+            registry.counter('jobs', 'Jobs').inc()
+            registry.flush()
+
+            files = os.listdir(snapshot_dir)
+            self.assertEqual(len(files), 1)
+            self.assertTrue(files[0].endswith(f"-{os.getpid()}.json"))
+            with open(os.path.join(snapshot_dir, files[0])) as f:
+                snapshot = json.load(f)
+            self.assertEqual(snapshot['families'][0]['samples'][0]['value'], 1)
+
+            os.remove(os.path.join(snapshot_dir, files[0]))
+            registry.flush()
+            self.assertEqual(os.listdir(snapshot_dir), [])
+
+    def test_idle_process_rewrites_snapshot_as_heartbeat(self):
+        """Test an unchanged registry still rewrites its snapshot every heartbeat"""
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            registry = MetricsRegistry(snapshot_dir, flush_interval=0.01, heartbeat_interval=0.05)
+            registry.counter('urban_planner_test_runs', 'Test runs').inc()
+            path = os.path.join(snapshot_dir, f"{registry.snapshot()['process']}.json")
+
+            deadline = time.time() + 2
+            while not os.path.exists(path) and time.time() < deadline:
+                time.sleep(0.01)
+            with open(path) as f:
+                first = json.load(f)['written_at']
+
+            time.sleep(0.2)
+            with open(path) as f:
+                self.assertGreater(json.load(f)['written_at'], first)
+
+    def test_monitor_exports_every_operation(self):
+        """Test each monitored operation updates its histogram, outcome counter and gauge"""
+        monitor = UrbanPlannerMonitor(self.registry, buckets={'export_duration': (10, 100)})
+        monitor.monitor_parcelization('site-1', 12.0, True, accuracy=97.5)
+        monitor.monitor_model_run('traffic', 250.0, False, queue_depth=4)
+        monitor.monitor_optimizer('scenario-1', 2000.0, True, pareto_points=42)
+        monitor.monitor_export('geojson', 20.0, True, file_size_mb=2.0)
+
+        self.assertEqual(self._family('urban_planner_parcelizations')['samples'][0]['labels'], ['success'])
+        self.assertEqual(self._family('urban_planner_parcelization_accuracy_percent')['samples'][0]['value'], 97.5)
+        self.assertEqual(self._family('urban_planner_model_runs')['samples'][0]['labels'], ['traffic', 'failure'])
+        self.assertEqual(self._family('urban_planner_model_run_queue_depth')['samples'][0]['value'], 4)
+        self.assertEqual(self._family('urban_planner_optimizer_pareto_points')['samples'][0]['value'], 42)
+
+        export = self._family('urban_planner_export_duration_seconds')
+        self.assertEqual(export['buckets'], [10.0, 100.0])
+        self.assertEqual(export['samples'][0]['counts'], [0, 1, 0])
+        size = self._family('urban_planner_export_file_size_bytes')['samples'][0]
+        self.assertEqual(size['sum'], 2 * 1024 * 1024)
+
+        # SLO samples are still recorded alongside the exported metrics
+        self.assertIn('export_duration', monitor.dashboard.metrics)
+
+if __name__ == '__main__':
+    unittest.main()
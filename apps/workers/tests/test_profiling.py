@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import patch
+import json
+import sys
+import os
+import tempfile
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import monitoring.instrumentation as instrumentation
+import monitoring.profiling as profiling
+from monitoring.instrumentation import TimingRecorder
+from monitoring.openmetrics import MetricsRegistry
+from monitoring.slo_dashboards import SLODashboard, UrbanPlannerMonitor
+from monitoring.profiling import profiled
+from optimizer.scenario_optimizer import ScenarioOptimizer
+
+def _hot_loop(n):
+    return sum(i * i for i in range(n))
+
+class DemoModel:
+    def __init__(self):
+        self.calls = 0
+
+    @profiled('demo')
+    def run(self, scenario_id, size=20000):
+        self.calls += 1
+        return {'success': True, 'data': {'total': _hot_loop(size)}}
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.recorder = TimingRecorder(SLODashboard(), registry=MetricsRegistry())
+        instrumentation.set_recorder(self.recorder)
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.dir_patch = patch.object(profiling, 'PROFILE_DIR', self.profile_dir.name)
+        self.dir_patch.start()
+
+    def tearDown(self):
+        """Restore the process-wide recorder and profile directory"""
+        self.dir_patch.stop()
+        self.profile_dir.cleanup()
+        instrumentation.set_recorder(None)
+
+    def test_unrequested_runs_are_not_profiled(self):
+        """Test runs without profile=True are untouched when sampling is off"""
+        with patch.object(profiling.cProfile, 'Profile') as profile:
+            result = DemoModel().run('scenario-1')
+
+        profile.assert_not_called()
+        self.assertNotIn('profile', result)
+        self.assertEqual(os.listdir(self.profile_dir.name), [])
+
+    def test_requested_run_is_stored_by_scenario_and_run(self):
+        """Test profile=True stores stats and a summary under the scenario and run ID"""
+        result = DemoModel().run('scenario-1', profile=True)
+
+        summary = result['profile']
+        self.assertEqual(summary['trigger'], 'request')
+        self.assertEqual(summary['operation'], 'run')
+        self.assertEqual(result['data']['total'], _hot_loop(20000))
+
+        directory = os.path.join(self.profile_dir.name, 'scenario-1')
+        self.assertEqual(sorted(os.listdir(directory)), [f"{summary['run_id']}.json", f"{summary['run_id']}.prof"])
+        with open(os.path.join(directory, f"{summary['run_id']}.json")) as f:
+            self.assertEqual(json.load(f)['run_id'], summary['run_id'])
+
+        functions = [row['function'] for row in summary['top_functions']]
+        self.assertTrue(any('_hot_loop' in name or 'genexpr' in name for name in functions[:5]))
+        self.assertLessEqual(len(functions), profiling.PROFILE_TOP_N)
+
+    def test_sampling_rate(self):
+        """Test sampled runs are profiled and profile=False opts out"""
+        model = DemoModel()
+        with patch.object(profiling, 'PROFILE_SAMPLE_RATE', 1.0):
+            self.assertEqual(model.run('scenario-1')['profile']['trigger'], 'sampled')
+            self.assertNotIn('profile', model.run('scenario-1', profile=False))
+
+    def test_dashboard_lists_recent_profiles(self):
+        """Test the SLO dashboard shows recent profiles with their top functions"""
+        model = DemoModel()
+        first = model.run('scenario-1', profile=True)['profile']
+        second = model.run('scenario-2', profile=True)['profile']
+
+        profiles = self.recorder.dashboard.get_slo_dashboard()['profiles']
+        self.assertEqual([p['run_id'] for p in profiles], [second['run_id'], first['run_id']])
+        self.assertLessEqual(len(profiles[0]['top_functions']), 10)
+
+    def test_served_monitor_shows_profiles_of_default_recorder(self):
+        """Test profiles recorded through the default recorder reach UrbanPlannerMonitor's dashboard"""
+        instrumentation.set_recorder(None)
+        monitor = UrbanPlannerMonitor(MetricsRegistry())
+
+        summary = DemoModel().run('scenario-1', profile=True)['profile']
+
+        self.assertIs(instrumentation.get_recorder().dashboard, monitor.dashboard)
+        self.assertIn(summary['run_id'], [p['run_id'] for p in monitor.get_dashboard()['profiles']])
+
+    def test_profile_dir_keeps_latest_runs(self):
+        """Test stored runs beyond PROFILE_RETENTION are deleted oldest first"""
+        model = DemoModel()
+        with patch.object(profiling, 'PROFILE_RETENTION', 2):
+            model.run('scenario-1', profile=True, size=10)
+            second = model.run('scenario-2', profile=True, size=10)['profile']
+            third = model.run('scenario-2', profile=True, size=10)['profile']
+
+        self.assertEqual(os.listdir(self.profile_dir.name), ['scenario-2'])
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.profile_dir.name, 'scenario-2'))),
+            sorted(f"{run['run_id']}.{ext}" for run in (second, third) for ext in ('json', 'prof'))
+        )
+
+    def test_optimizer_run_can_be_profiled(self):
+        """Test optimize_scenario accepts profile=True and attaches the summary to failed runs too"""
+        optimizer = ScenarioOptimizer()
+        with patch.object(optimizer, '_get_scenario_data', return_value=None):
+            result = optimizer.optimize_scenario('scenario-9', profile=True)
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['profile']['scenario_id'], 'scenario-9')
+        self.assertEqual(result['profile']['worker'], 'optimizer')
+
+if __name__ == '__main__':
+    unittest.main()
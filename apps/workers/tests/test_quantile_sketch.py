@@ -0,0 +1,106 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+import sys
+import os
+import numpy as np
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from monitoring.quantile_sketch import QuantileSketch, SketchSeries
+from monitoring.slo_dashboards import SLODashboard
+
+class TestQuantileSketch(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.default_rng(7)
+        self.samples = rng.lognormal(mean=3.0, sigma=1.2, size=200000)
+        self.quantiles = [0.5, 0.95, 0.99, 0.999]
+
+    def _assert_within_accuracy(self, sketch, samples, accuracy=0.01):
+        estimates = sketch.quantiles(self.quantiles)
+        for q, estimate in zip(self.quantiles, estimates):
+            lower_rank = int(np.floor(q * (len(samples) - 1)))
+            ordered = np.sort(samples)
+            exact = ordered[lower_rank]
+            self.assertLessEqual(abs(estimate - exact) / exact, accuracy * 1.5, f"q={q}")
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test sketch quantiles stay within the configured relative error"""
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        sketch.add_many(self.samples)
+
+        self._assert_within_accuracy(sketch, self.samples)
+        self.assertEqual(sketch.count, len(self.samples))
+        self.assertEqual(sketch.quantile(0.0), self.samples.min())
+        self.assertEqual(sketch.quantile(1.0), self.samples.max())
+        self.assertLessEqual(len(sketch.counts), sketch.max_bins)
+
+    def test_scalar_and_batch_adds_agree(self):
+        """Test add and add_many fill identical buckets"""
+        scalar = QuantileSketch()
+        for value in self.samples[:5000]:
+            scalar.add(value)
+        batch = QuantileSketch()
+        batch.add_many(self.samples[:5000])
+
+        self.assertEqual(scalar.offset, batch.offset)
+        np.testing.assert_array_equal(scalar.counts, batch.counts)
+
+    def test_merged_shards_equal_single_sketch(self):
+        """Test sketches from separate processes merge into the same view"""
+        whole = QuantileSketch()
+        whole.add_many(self.samples)
+
+        merged = QuantileSketch()
+        for shard in np.array_split(self.samples, 4):
+            part = QuantileSketch()
+            part.add_many(shard)
+            merged.merge(QuantileSketch.from_dict(json.loads(json.dumps(part.to_dict()))))
+
+        np.testing.assert_array_equal(merged.quantiles(self.quantiles), whole.quantiles(self.quantiles))
+        self.assertEqual(merged.count, whole.count)
+
+    def test_zero_values_and_collapsing(self):
+        """Test zeros are counted and bucket memory stays bounded"""
+        sketch = QuantileSketch(max_bins=64)
+        sketch.add_many([0.0] * 50 + list(np.logspace(-6, 6, 50)))
+
+        self.assertEqual(len(sketch.counts), 64)
+        self.assertEqual(sketch.quantile(0.25), 0.0)
+        self.assertAlmostEqual(sketch.quantile(1.0), 1e6)
+
+    def test_series_window_and_retention(self):
+        """Test time buckets select windows and expire past retention"""
+        series = SketchSeries(bucket_seconds=60, retention_seconds=600)
+        for minute in range(20):
+            series.add(minute * 60.0 + 1, float(minute + 1), minute % 3)
+
+        self.assertEqual(len(series.buckets), 11)
+        sketch, tallies = series.window(15 * 60.0)
+        self.assertEqual(sketch.count, 5)
+        self.assertEqual(sketch.min, 16.0)
+        self.assertEqual(int(tallies.sum()), 5)
+
+    def test_dashboard_merges_worker_sketches(self):
+        """Test the dashboard reports percentiles over samples from several workers"""
+        now = datetime.utcnow()
+        workers = [SLODashboard(capacity=16) for _ in range(3)]
+        for index, value in enumerate(self.samples[:30000]):
+            workers[index % 3].record_metric('api_response_time', value, 'ms',
+                                             timestamp=now - timedelta(seconds=index % 600))
+
+        combined = SLODashboard(capacity=16)
+        for worker in workers:
+            combined.merge_sketches(json.loads(json.dumps(worker.export_sketches())))
+
+        summary = combined.get_metric_summary('api_response_time', window_hours=1)
+        exact = np.percentile(self.samples[:30000], 99)
+        self.assertEqual(summary['count'], 30000)
+        self.assertLessEqual(abs(summary['p99'] - exact) / exact, 0.015)
+        self.assertEqual(summary['unit'], 'ms')
+        self.assertIsNone(summary['current_status'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reports.report_generator import ReportGenerator
+
+class TestReportBatch(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.generator = ReportGenerator()
+        self.generator.chart_config['workers'] = 1
+        self.generator.chart_config['dpi'] = 30
+        self.generator.chart_config['map_dpi'] = 30
+
+        square = '{"type":"Polygon","coordinates":[[[0,0],[1,0],[1,1],[0,1],[0,0]]]}'
+        self.scenarios = {
+            scenario_id: {
+                'scenario': {'id': scenario_id, 'name': scenario_id.title(), 'total_area': 20000, 'avg_far': 2.0, 'avg_height': 18.0},
+                'parcels': [{'id': 'parcel-1', 'geometry': square, 'properties': {'useMix': {'residential': 0.9}}}],
+                'links': [],
+                'kpis': {'capacity_analysis': {'total_units': units, 'total_population': 300, 'total_jobs': 80}}
+            }
+            for scenario_id, units in (('north', 120), ('south', 240))
+        }
+
+    def _fetch(self, scenario_id):
+        return self.scenarios.get(scenario_id)
+
+    def test_manifest_follows_request_order(self):
+        """Test every pair gets a manifest entry with PDF bytes and timings"""
+        requests = [('north', 'executive_summary'), ('south', 'stakeholder_report'), ('north', 'public_report')]
+
+        with patch.object(self.generator, '_get_scenario_data', side_effect=self._fetch) as fetch:
+            result = self.generator.generate_reports_batch(requests, max_workers=2)
+
+        self.assertTrue(result['success'])
+        manifest = result['data']
+        self.assertEqual([(r['scenario_id'], r['report_type']) for r in manifest['reports']], requests)
+        self.assertEqual(manifest['failed_count'], 0)
+        self.assertEqual(manifest['scenario_count'], 2)
+        for report in manifest['reports']:
+            self.assertTrue(report['pdf_bytes'].startswith(b'%PDF'))
+            self.assertEqual(report['content_length'], len(report['pdf_bytes']))
+            for step in ('fetch_ms', 'content_ms', 'charts_ms', 'maps_ms', 'pdf_ms', 'total_ms'):
+                self.assertIn(step, report['timings'])
+
+        # One fetch per scenario, not per report
+        self.assertEqual(sorted(call[0][0] for call in fetch.call_args_list), ['north', 'south'])
+
+    def test_templates_of_one_scenario_share_sections_and_charts(self):
+        """Test later templates reuse sections and charts built for the same scenario"""
+        requests = [('north', 'executive_summary'), ('north', 'public_report')]
+
+        with patch.object(self.generator, '_get_scenario_data', side_effect=self._fetch):
+            reports = self.generator.generate_reports_batch(requests)['data']['reports']
+
+        self.assertEqual(reports[1]['sections']['reused'], ['overview'])
+        self.assertEqual(reports[1]['charts'], {'reused': ['capacity'], 'regenerated': []})
+
+    def test_maps_are_drawn_once_per_scenario(self):
+        """Test every map template of a scenario reuses one set of maps"""
+        requests = [('north', 'executive_summary'), ('north', 'technical_report'), ('south', 'executive_summary')]
+
+        with patch.object(self.generator, '_get_scenario_data', side_effect=self._fetch), \
+             patch.object(self.generator, '_generate_maps', wraps=self.generator._generate_maps) as generate_maps:
+            result = self.generator.generate_reports_batch(requests, max_workers=1)
+
+        self.assertEqual(result['data']['failed_count'], 0)
+        self.assertEqual(generate_maps.call_count, 2)
+
+    def test_failures_are_reported_per_entry(self):
+        """Test missing scenarios and unknown templates do not fail the batch"""
+        requests = [('north', 'executive_summary'), ('missing', 'executive_summary'), ('south', 'unknown_report')]
+
+        with patch.object(self.generator, '_get_scenario_data', side_effect=self._fetch):
+            result = self.generator.generate_reports_batch(requests)
+
+        reports = result['data']['reports']
+        self.assertTrue(reports[0]['success'])
+        self.assertEqual(reports[1]['error'], 'No scenario data found')
+        self.assertEqual(reports[2]['error'], 'Invalid report type: unknown_report')
+        self.assertEqual(result['data']['failed_count'], 2)
+
+    def test_stream_delivery_uses_output_factory(self):
+        """Test streamed batch reports are written to and closed on caller streams"""
+        outputs = {}
+        def open_output(scenario_id, report_type):
+            output = BytesIO()
+            output.close = lambda: None
+            outputs[(scenario_id, report_type)] = output
+            return output
+
+        with patch.object(self.generator, '_get_scenario_data', side_effect=self._fetch):
+            result = self.generator.generate_reports_batch(
+                [('north', 'stakeholder_report'), ('south', 'stakeholder_report')],
+                delivery='stream', output_factory=open_output
+            )
+
+        for report in result['data']['reports']:
+            self.assertNotIn('pdf_bytes', report)
+            output = outputs[(report['scenario_id'], report['report_type'])]
+            self.assertEqual(len(output.getvalue()), report['content_length'])
+
+    def test_on_report_receives_pdfs_as_they_finish(self):
+        """Test a report sink gets each PDF and the manifest does not keep it"""
+        received = []
+
+        with patch.object(self.generator, '_get_scenario_data', side_effect=self._fetch):
+            result = self.generator.generate_reports_batch(
+                [('north', 'stakeholder_report'), ('south', 'stakeholder_report')], on_report=received.append
+            )
+
+        self.assertEqual(sorted(report['scenario_id'] for report in received), ['north', 'south'])
+        for report in received:
+            self.assertTrue(report['pdf_bytes'].startswith(b'%PDF'))
+        for report in result['data']['reports']:
+            self.assertTrue(report['success'])
+            self.assertNotIn('pdf_bytes', report)
+            self.assertGreater(report['content_length'], 0)
+
+    def test_stream_delivery_requires_factory(self):
+        """Test stream delivery is rejected without an output factory"""
+        result = self.generator.generate_reports_batch([('north', 'executive_summary')], delivery='stream')
+        self.assertFalse(result['success'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reports.report_generator import ReportGenerator, CHART_RENDERERS
+from reports.chart_cache import ChartCache
+import reports.report_generator as report_generator
+
+class TestReportCharts(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.generator = ReportGenerator()
+        self.generator.chart_config['workers'] = 1
+        self.generator.chart_config['dpi'] = 30
+
+        self.scenario_data = {
+            'scenario': {'id': 'scenario-1', 'name': 'Downtown'},
+            'parcels': [],
+            'links': [],
+            'kpis': {
+                'capacity_analysis': {'total_units': 120, 'total_population': 300, 'total_jobs': 80},
+                'sustainability_score': {'category_scores': {'energy': {'score': 72.5}, 'water': {'score': 61.0}}}
+            }
+        }
+
+    def test_charts_render_as_png_bytes(self):
+        """Test charts with data are rendered and charts without data are skipped"""
+        charts = self.generator._generate_charts(self.scenario_data)
+
+        self.assertEqual([chart['chart_type'] for chart in charts], ['capacity', 'sustainability'])
+        for chart in charts:
+            self.assertTrue(chart['image_bytes'].startswith(b'\x89PNG'))
+            self.assertFalse(chart['cached'])
+
+    def test_unchanged_scenario_skips_rendering(self):
+        """Test a second report for the same KPIs is served entirely from the cache"""
+        first = self.generator._generate_charts(self.scenario_data)
+
+        with patch.object(report_generator, '_render_chart') as render:
+            second = self.generator._generate_charts(self.scenario_data)
+
+        render.assert_not_called()
+        self.assertTrue(all(chart['cached'] for chart in second))
+        self.assertEqual([c['image_bytes'] for c in first], [c['image_bytes'] for c in second])
+
+    def test_changed_kpis_and_theme_rerender(self):
+        """Test the cache key covers the chart's own KPI input and the theme"""
+        self.generator._generate_charts(self.scenario_data)
+
+        changed = dict(self.scenario_data, kpis=dict(self.scenario_data['kpis'], budget_analysis={
+            'total': {'breakdown': {'infrastructure': 2000000, 'buildings': 5000000}}
+        }))
+        charts = self.generator._generate_charts(changed)
+        self.assertEqual({chart['chart_type']: chart['cached'] for chart in charts},
+                         {'capacity': True, 'sustainability': True, 'budget': False})
+
+        charts = self.generator._generate_charts(self.scenario_data, theme='print')
+        self.assertFalse(any(chart['cached'] for chart in charts))
+
+    def test_svg_format(self):
+        """Test charts can be rendered as SVG"""
+        charts = self.generator._generate_charts(self.scenario_data, image_format='svg')
+
+        self.assertIn(b'<svg', charts[0]['image_bytes'])
+        self.assertEqual(charts[0]['format'], 'svg')
+
+    def test_process_pool_matches_inline_rendering(self):
+        """Test charts rendered by pool workers have the same chart set"""
+        self.generator.chart_config['workers'] = 2
+        try:
+            rendered = self.generator._render_charts(list(CHART_RENDERERS), self.scenario_data['kpis'], 'default', 'png')
+        finally:
+            self.generator.close()
+
+        self.assertTrue(rendered['capacity'].startswith(b'\x89PNG'))
+        self.assertTrue(rendered['sustainability'].startswith(b'\x89PNG'))
+        self.assertEqual(rendered['budget'], b'')
+        self.assertIsNone(self.generator._chart_pool)
+
+    def test_pool_uses_forkserver(self):
+        """Test chart workers are not forked from a threaded parent"""
+        self.generator.chart_config['workers'] = 2
+        try:
+            pool = self.generator._get_chart_pool()
+            self.assertEqual(pool._mp_context.get_start_method(), 'forkserver')
+        finally:
+            self.generator.close()
+
+    def test_closed_pool_falls_back_to_inline_rendering(self):
+        """Test a pool shut down by another report does not fail this one"""
+        self.generator.chart_config['workers'] = 2
+        pool = self.generator._get_chart_pool()
+        pool.shutdown()
+
+        rendered = self.generator._render_charts(['capacity', 'budget'], self.scenario_data['kpis'], 'default', 'png')
+
+        self.assertTrue(rendered['capacity'].startswith(b'\x89PNG'))
+        self.assertEqual(rendered['budget'], b'')
+        self.assertIsNone(self.generator._chart_pool)
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test the chart cache stays within its byte budget"""
+        cache = ChartCache(max_bytes=10)
+        cache.put(('capacity', 'rev', 'default', 'png'), b'12345')
+        cache.put(('budget', 'rev', 'default', 'png'), b'12345')
+        cache.get(('capacity', 'rev', 'default', 'png'))
+        cache.put(('sustainability', 'rev', 'default', 'png'), b'12345')
+
+        self.assertIsNone(cache.get(('budget', 'rev', 'default', 'png')))
+        self.assertIsNotNone(cache.get(('capacity', 'rev', 'default', 'png')))
+        self.assertEqual(cache.total_bytes, 10)
+        self.assertEqual(cache.stats['evictions'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import json
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reports.report_generator import ReportGenerator, LAND_USE_COLORS, LINK_STYLES
+import reports.report_generator as report_generator
+
+class TestReportMaps(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.generator = ReportGenerator()
+        self.generator.chart_config['workers'] = 1
+        self.generator.chart_config['map_dpi'] = 30
+
+        square = {'type': 'Polygon', 'coordinates': [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]]}
+        multi = {'type': 'MultiPolygon', 'coordinates': [
+            [[[2, 0], [3, 0], [3, 1], [2, 0]]],
+            [[[4, 0], [5, 0], [5, 1], [4, 0]]]
+        ]}
+        self.parcels = [
+            {'id': 'parcel-1', 'geometry': json.dumps(square), 'properties': {'useMix': {'residential': 0.8}}},
+            {'id': 'parcel-2', 'geometry': json.dumps(multi), 'properties': {'useMix': {'commercial': 0.9}}},
+            {'id': 'parcel-3', 'geometry': None, 'properties': {}}
+        ]
+        self.links = [
+            {'id': 'link-1', 'geometry': '{"type":"LineString","coordinates":[[0,0],[5,1]]}', 'link_class': 'arterial'},
+            {'id': 'link-2', 'geometry': '{"type":"LineString","coordinates":[[0,1],[5,0]]}', 'link_class': 'footpath'}
+        ]
+
+    def test_geometry_paths_explode_multipart_rows(self):
+        """Test every polygon part becomes one path that points back at its row"""
+        paths, owners = report_generator._geometry_paths([p['geometry'] for p in self.parcels[:2]], polygons=True)
+
+        self.assertEqual(len(paths), 3)
+        self.assertEqual(owners.tolist(), [0, 1, 1])
+        self.assertEqual(paths[1].tolist(), [[2, 0], [3, 0], [3, 1], [2, 0]])
+
+    def test_maps_are_static_png(self):
+        """Test both maps are rendered as PNG images rather than HTML"""
+        maps = self.generator._generate_maps({'parcels': self.parcels, 'links': self.links})
+
+        self.assertEqual([m['title'] for m in maps], ['Site Overview', 'Network Connectivity'])
+        for site_map in maps:
+            self.assertTrue(site_map['image_bytes'].startswith(b'\x89PNG'))
+            self.assertEqual(site_map['type'], 'static_map')
+
+    def test_maps_are_styled_by_land_use_and_link_class(self):
+        """Test each collection is drawn once with per-path styles"""
+        with patch.object(report_generator, '_render_site_map', return_value=b'png') as render:
+            self.generator._generate_maps({'parcels': self.parcels, 'links': self.links})
+
+        overview, network = render.call_args_list
+        self.assertEqual(overview[0][1], [LAND_USE_COLORS['residential'], LAND_USE_COLORS['commercial'], LAND_USE_COLORS['commercial']])
+        self.assertEqual(network[0][3], [LINK_STYLES['arterial'][0], LINK_STYLES['local'][0]])
+        self.assertEqual(network[0][4], [LINK_STYLES['arterial'][1], LINK_STYLES['local'][1]])
+
+    def test_empty_scenario_has_no_maps(self):
+        """Test scenarios without geometry skip map rendering"""
+        self.assertEqual(self.generator._generate_maps({'parcels': [], 'links': []}), [])
+
+if __name__ == '__main__':
+    unittest.main()
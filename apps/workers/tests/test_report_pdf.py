@@ -0,0 +1,72 @@
+import base64
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reports.report_generator import ReportGenerator
+
+class TestReportPdf(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.generator = ReportGenerator()
+        self.generator.chart_config['workers'] = 1
+        self.generator.chart_config['dpi'] = 30
+
+        self.scenario_data = {
+            'scenario': {'id': 'scenario-1', 'name': 'Downtown', 'total_area': 20000, 'avg_far': 2.0, 'avg_height': 18.0},
+            'parcels': [],
+            'links': [],
+            'kpis': {'capacity_analysis': {'total_units': 120, 'total_population': 300, 'total_jobs': 80}}
+        }
+
+    def _generate(self, **kwargs):
+        with patch.object(self.generator, '_get_scenario_data', return_value=self.scenario_data):
+            return self.generator.generate_report('scenario-1', 'stakeholder_report', **kwargs)
+
+    def test_default_delivery_returns_raw_bytes(self):
+        """Test reports are returned as raw PDF bytes with a content length"""
+        files_before = set(os.listdir('.'))
+        result = self._generate()
+
+        self.assertTrue(result['success'])
+        data = result['data']
+        self.assertTrue(data['pdf_bytes'].startswith(b'%PDF'))
+        self.assertEqual(data['content_length'], len(data['pdf_bytes']))
+        self.assertEqual(data['content_type'], 'application/pdf')
+        self.assertNotIn('pdf_base64', data)
+        self.assertEqual(set(os.listdir('.')), files_before)
+
+    def test_stream_delivery_writes_to_output(self):
+        """Test stream delivery copies the PDF into the caller's stream"""
+        output = BytesIO()
+
+        result = self._generate(delivery='stream', output=output)
+
+        self.assertTrue(result['success'])
+        self.assertNotIn('pdf_bytes', result['data'])
+        self.assertEqual(result['data']['content_length'], len(output.getvalue()))
+        self.assertTrue(output.getvalue().startswith(b'%PDF'))
+
+    def test_base64_delivery_for_legacy_clients(self):
+        """Test legacy clients still receive pdf_base64"""
+        result = self._generate(delivery='base64')
+
+        pdf = base64.b64decode(result['data']['pdf_base64'])
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertEqual(result['data']['file_size'], len(pdf))
+
+    def test_invalid_delivery_is_rejected_before_fetching(self):
+        """Test bad delivery options fail without touching the database"""
+        with patch.object(self.generator, '_get_scenario_data') as get_data:
+            self.assertFalse(self.generator.generate_report('scenario-1', delivery='email')['success'])
+            self.assertFalse(self.generator.generate_report('scenario-1', delivery='stream')['success'])
+
+        get_data.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reports.report_generator import ReportGenerator, SECTION_DEPENDENCIES
+
+class TestReportSections(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.generator = ReportGenerator()
+        self.generator.chart_config['workers'] = 1
+        self.generator.chart_config['dpi'] = 30
+
+        self.scenario_data = {
+            'scenario': {
+                'id': 'scenario-1', 'name': 'Downtown', 'total_area': 20000, 'avg_far': 2.0, 'avg_height': 18.0,
+                'parcels_updated_at': '2025-08-25T10:00:00', 'links_updated_at': '2025-08-25T10:00:00'
+            },
+            'parcels': [{'id': 'parcel-1', 'properties': {'useMix': {'residential': 0.9}}}],
+            'links': [],
+            'kpis': {
+                'capacity_analysis': {'total_units': 120, 'total_population': 300, 'total_jobs': 80},
+                'network_analysis': {'intersection_density': 90, 'walkability_score': 70},
+                'sustainability_score': {'overall_score': 64.0, 'category_scores': {'energy': {'score': 58.0}}}
+            }
+        }
+        self.template = self.generator.report_templates['technical_report']
+
+    def _with_kpi(self, name, value):
+        return dict(self.scenario_data, kpis=dict(self.scenario_data['kpis'], **{name: value}))
+
+    def test_every_template_section_has_dependencies(self):
+        """Test the dependency map covers every section any template uses"""
+        for template in self.generator.report_templates.values():
+            for section in template['sections']:
+                self.assertIn(section, SECTION_DEPENDENCIES)
+                self.assertTrue(hasattr(self.generator, f'_generate_{section}_section'))
+
+    def test_unchanged_scenario_reuses_every_section(self):
+        """Test a second pass serves sections from the cache with identical content"""
+        first = self.generator._generate_report_content(self.scenario_data, self.template)
+        second = self.generator._generate_report_content(self.scenario_data, self.template)
+
+        self.assertEqual(first['section_cache']['regenerated'], self.template['sections'])
+        self.assertEqual(second['section_cache']['reused'], self.template['sections'])
+        self.assertEqual(first['sections'], second['sections'])
+
+    def test_kpi_rerun_rebuilds_only_dependent_sections(self):
+        """Test changing one analysis regenerates only the sections that read it"""
+        self.generator._generate_report_content(self.scenario_data, self.template)
+
+        changed = self._with_kpi('sustainability_score', {'overall_score': 81.0, 'category_scores': {'energy': {'score': 90.0}}})
+        content = self.generator._generate_report_content(changed, self.template)
+
+        self.assertEqual(content['section_cache']['regenerated'], ['results'])
+        self.assertIn('Overall sustainability: 81.0/100', content['sections']['results']['content'])
+
+        # An analysis no section reads leaves everything cached
+        content = self.generator._generate_report_content(self._with_kpi('energy_analysis', {'demand': {}}), self.template)
+        self.assertEqual(content['section_cache']['regenerated'], [])
+
+    def test_cached_sections_are_copies(self):
+        """Test edits to returned content cannot corrupt the cache"""
+        first = self.generator._generate_report_content(self.scenario_data, self.template)
+        first['sections']['methodology']['content'].append('edited')
+
+        second = self.generator._generate_report_content(self.scenario_data, self.template)
+        self.assertNotIn('edited', second['sections']['methodology']['content'])
+
+    def test_report_lists_reused_and_regenerated_work(self):
+        """Test generate_report reports section and chart reuse"""
+        with patch.object(self.generator, '_get_scenario_data', return_value=self.scenario_data):
+            self.generator.generate_report('scenario-1', 'stakeholder_report')
+
+        changed = self._with_kpi('capacity_analysis', {'total_units': 150, 'total_population': 320, 'total_jobs': 90})
+        with patch.object(self.generator, '_get_scenario_data', return_value=changed):
+            result = self.generator.generate_report('scenario-1', 'stakeholder_report')
+
+        data = result['data']
+        self.assertEqual(data['sections']['regenerated'], [])
+        self.assertEqual(data['sections']['reused'], ['overview', 'impacts', 'benefits', 'timeline', 'engagement'])
+        self.assertEqual(data['charts'], {'reused': ['sustainability'], 'regenerated': ['capacity']})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+from datetime import datetime, timedelta
+import sys
+import os
+import numpy as np
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from monitoring.slo_dashboards import SLODashboard, SLOStatus, MetricRingBuffer
+
+class TestSLOMetricStore(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.dashboard = SLODashboard(capacity=8)
+        self.now = datetime.utcnow()
+
+    def test_ring_keeps_newest_samples_in_order(self):
+        """Test appends past capacity overwrite the oldest samples"""
+        buffer = MetricRingBuffer(4, 'seconds')
+        for i in range(10):
+            buffer.append(float(i), i * 10.0, 0)
+
+        timestamps, values, _ = buffer.window(0.0)
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(timestamps.tolist(), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(values.tolist(), [60.0, 70.0, 80.0, 90.0])
+        self.assertEqual(buffer.latest(2)[1].tolist(), [80.0, 90.0])
+
+    def test_window_binary_search_across_wrap(self):
+        """Test window selection is correct when the ring has wrapped"""
+        buffer = MetricRingBuffer(5, 'seconds')
+        for i in range(7):
+            buffer.append(float(i), float(i), 0)
+
+        for since in (0.0, 2.0, 3.5, 5.0, 6.0, 7.0):
+            expected = [float(i) for i in range(2, 7) if i >= since]
+            self.assertEqual(buffer.window(since)[1].tolist(), expected)
+
+    def test_out_of_order_samples_fall_back_to_mask(self):
+        """Test backdated samples are still selected correctly"""
+        buffer = MetricRingBuffer(5, 'seconds')
+        for timestamp in (10.0, 20.0, 5.0, 30.0):
+            buffer.append(timestamp, timestamp, 0)
+
+        self.assertFalse(buffer.ordered)
+        self.assertEqual(buffer.window(10.0)[1].tolist(), [10.0, 20.0, 30.0])
+
+    def test_summary_matches_reference_statistics(self):
+        """Test window summaries match the interpolated percentiles within sketch accuracy"""
+        durations = [12.0, 45.0, 70.0, 150.0, 25.0, 31.0]
+        for i, duration in enumerate(durations):
+            self.dashboard.record_metric('parcelization_duration', duration, 'seconds',
+                                         timestamp=self.now - timedelta(minutes=len(durations) - i))
+        # Outside the one hour window
+        self.dashboard.record_metric('parcelization_duration', 999.0, 'seconds', timestamp=self.now - timedelta(hours=3))
+
+        summary = self.dashboard.get_metric_summary('parcelization_duration', window_hours=1)
+
+        self.assertEqual(summary['count'], 6)
+        self.assertEqual(summary['max'], 150.0)
+        self.assertAlmostEqual(summary['mean'], np.mean(durations))
+        self.assertAlmostEqual(summary['median'], 38.0, delta=38.0 * 0.01)
+        self.assertAlmostEqual(summary['p95'], 130.0, delta=130.0 * 0.01)
+        self.assertEqual(summary['status_distribution'], {'green': 2, 'yellow': 2, 'red': 2})
+        self.assertEqual(summary['current_status'], SLOStatus.YELLOW)
+        self.assertEqual(summary['unit'], 'seconds')
+
+    def test_alerts_from_recent_red_samples(self):
+        """Test critical alerts fire from ring buffer statuses"""
+        for i in range(3):
+            self.dashboard.record_metric('export_duration', 500.0, 'seconds', timestamp=self.now - timedelta(seconds=3 - i))
+
+        alerts = self.dashboard.get_slo_dashboard()['alerts']
+
+        self.assertEqual(len(alerts), 1)
+        self.assertEqual(alerts[0]['severity'], 'critical')
+        self.assertEqual(alerts[0]['count'], 3)
+        self.assertEqual(alerts[0]['timestamp'], (self.now - timedelta(seconds=1)).isoformat())
+
+    def test_recent_samples_keep_their_labels(self):
+        """Test labels are kept per sample and bounded by the ring capacity"""
+        for i in range(10):
+            self.dashboard.record_metric('optimizer_duration', float(i), 'seconds',
+                                         {'scenario_id': f'scenario-{i}'}, timestamp=self.now + timedelta(seconds=i))
+        self.dashboard.record_metric('optimizer_duration', 10.0, 'seconds', timestamp=self.now + timedelta(seconds=10))
+
+        samples = self.dashboard.get_recent_samples('optimizer_duration', count=3)
+
+        self.assertEqual([sample['value'] for sample in samples], [8.0, 9.0, 10.0])
+        self.assertEqual([sample['labels'] for sample in samples], [{'scenario_id': 'scenario-8'}, {'scenario_id': 'scenario-9'}, {}])
+        self.assertEqual(len(self.dashboard.get_recent_samples('optimizer_duration', count=100)), 8)
+        self.assertEqual(self.dashboard.get_recent_samples('missing'), [])
+
+if __name__ == '__main__':
+    unittest.main()
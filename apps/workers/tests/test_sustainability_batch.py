@@ -0,0 +1,206 @@
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+import numpy as np
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sustainability.sustainability_score import SustainabilityScore
+from optimizer.scenario_optimizer import ScenarioOptimizer
+
+class TestSustainabilityBatch(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scorer = SustainabilityScore()
+
+        self.scenarios = [
+            {
+                'scenario': {'id': 'scenario-1', 'total_area': 100000},
+                'parcels': [
+                    {'properties': {'useMix': {'residential': 0.7, 'commercial': 0.3}}, 'capacity': {'population': 900}},
+                    {'properties': {'useMix': {'residential': 1.0}}, 'capacity': {'population': 400}}
+                ],
+                'links': [
+                    {'properties': {'bike_lanes': True}, 'link_class': 'local', 'length': 100.0},
+                    {'properties': {'bike_lanes': False}, 'link_class': 'arterial', 'length': 300.0}
+                ],
+                'kpis': {
+                    'energy_analysis': {
+                        'demand': {'self_sufficiency_ratio': 0.65},
+                        'emissions': {'reduction_percent': 0.75},
+                        'solar': {'renewable_ratio': 0.4}
+                    },
+                    'network_analysis': {'intersection_density': 85}
+                }
+            },
+            {
+                'scenario': {'id': 'scenario-2', 'total_area': 20000},
+                'parcels': [
+                    {'properties': {}, 'capacity': {'population': 50}}
+                ],
+                'links': [],
+                'kpis': {}
+            },
+            {
+                'scenario': {'id': 'scenario-3', 'total_area': 0},
+                'parcels': [],
+                'links': [],
+                'kpis': {'network_analysis': {'intersection_density': 200}}
+            }
+        ]
+
+    def _scalar_scores(self, scenario_data, weights):
+        methods = {
+            'energy': self.scorer._calculate_energy_score,
+            'mobility': self.scorer._calculate_mobility_score,
+            'land_use': self.scorer._calculate_land_use_score,
+            'water': self.scorer._calculate_water_score,
+            'materials': self.scorer._calculate_materials_score,
+            'resilience': self.scorer._calculate_resilience_score
+        }
+        category_scores = {category: method(scenario_data) for category, method in methods.items()}
+        overall = sum(category_scores[c]['score'] * weights[c] for c in category_scores)
+        return category_scores, overall
+
+    def test_batch_matches_scalar_scoring(self):
+        """Test vectorized scores equal the per-category score methods"""
+        batch = self.scorer.score_scenario_data_batch(self.scenarios)
+
+        for row, scenario_data in enumerate(self.scenarios):
+            category_scores, overall = self._scalar_scores(scenario_data, self.scorer.scoring_weights)
+            result = self.scorer._batch_result(batch, row)
+
+            self.assertAlmostEqual(result['overall_score'], overall)
+            self.assertEqual(result['overall_grade'], self.scorer._calculate_grade(overall))
+            for category, expected in category_scores.items():
+                self.assertAlmostEqual(result['category_scores'][category]['score'], expected['score'])
+                self.assertEqual(result['category_scores'][category]['grade'], expected['grade'])
+                for metric, metric_data in expected['metrics'].items():
+                    self.assertAlmostEqual(
+                        result['category_scores'][category]['metrics'][metric]['value'], metric_data['value']
+                    )
+
+    def test_score_metric_array_matches_scalar(self):
+        """Test vectorized thresholds reproduce _score_metric at every boundary"""
+        criteria = self.scorer.scoring_criteria['land_use']['density']
+        values = [0, 25, 26, 50, 99, 100, 149, 150, 500]
+        tables = self.scorer._get_metric_tables()
+        column = tables['metrics'].index('land_use.density')
+        matrix = np.zeros((len(values), len(self.scorer.METRIC_LAYOUT)))
+        matrix[:, column] = values
+
+        for reverse in (False, True):
+            reverse_flags = np.full(len(self.scorer.METRIC_LAYOUT), reverse)
+            batch = self.scorer._score_metric_array(matrix, tables['thresholds'], reverse_flags)
+            for row, value in enumerate(values):
+                self.assertEqual(batch[row, column], self.scorer._score_metric(value, criteria, reverse=reverse))
+
+    def test_custom_weights_do_not_mutate_defaults(self):
+        """Test batch weights apply per call only"""
+        weights = {'energy': 0.5, 'mobility': 0.1, 'land_use': 0.1, 'water': 0.1, 'materials': 0.1, 'resilience': 0.1}
+        original = dict(self.scorer.scoring_weights)
+
+        batch = self.scorer.score_scenario_data_batch(self.scenarios, weights)
+
+        _, overall = self._scalar_scores(self.scenarios[0], weights)
+        self.assertAlmostEqual(batch['overall_scores'][0], overall)
+        self.assertEqual(self.scorer.scoring_weights, original)
+
+    @patch('sustainability.sustainability_score.psycopg2.connect')
+    def test_calculate_scores_batch(self, mock_connect):
+        """Test batch scoring loads and stores every scenario together"""
+        mock_cursor = Mock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        scenario_rows = [dict(self.scenarios[0]['scenario'], kpis=self.scenarios[0]['kpis'])]
+        parcel_rows = [dict(p, scenario_id='scenario-1') for p in self.scenarios[0]['parcels']]
+        link_rows = [dict(l, scenario_id='scenario-1') for l in self.scenarios[0]['links']]
+        mock_cursor.fetchall.side_effect = [scenario_rows, parcel_rows, link_rows]
+
+        result = self.scorer.calculate_sustainability_scores_batch(['scenario-1', 'scenario-missing'])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['missing'], ['scenario-missing'])
+        _, overall = self._scalar_scores(self.scenarios[0], self.scorer.scoring_weights)
+        self.assertAlmostEqual(result['data']['scenario-1']['overall_score'], overall)
+        self.assertEqual(mock_cursor.executemany.call_count, 1)
+
+    @patch('sustainability.sustainability_score.psycopg2.connect')
+    def test_aggregate_pushdown_matches_row_mode(self, mock_connect):
+        """Test scores from the single aggregate row equal scores from full parcel rows"""
+        mock_cursor = Mock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [{
+            'id': 'scenario-1',
+            'kpis': self.scenarios[0]['kpis'],
+            'parcel_count': 2,
+            'total_area': 100000,
+            'avg_far': None,
+            'avg_height': None,
+            'total_population': 1300,
+            'mixed_use_parcels': 1,
+            'total_link_length': 400.0,
+            'bike_link_length': 100.0
+        }]
+        self.scorer.aggregate_pushdown = True
+
+        category_scores = self.scorer._load_category_scores('scenario-1')
+        summary = self.scorer._get_scenario_summaries(['scenario-1'])['scenario-1']
+
+        expected, _ = self._scalar_scores(self.scenarios[0], self.scorer.scoring_weights)
+        for category, expected_score in expected.items():
+            self.assertAlmostEqual(category_scores[category]['score'], expected_score['score'])
+        self.assertEqual(mock_cursor.execute.call_count, 2)
+        self.assertAlmostEqual(summary['bike_coverage'], 0.25)
+        self.assertAlmostEqual(category_scores['mobility']['metrics']['bike_infrastructure']['value'], 0.25)
+
+    @patch('sustainability.sustainability_score.psycopg2.connect')
+    def test_boolean_and_numeric_bike_lanes(self, mock_connect):
+        """Test boolean seed properties and lane counts both count as bike lanes in either mode"""
+        links = [
+            {'properties': {'bike_lanes': True}, 'length': 200.0},
+            {'properties': {'bike_lanes': 2}, 'length': 100.0},
+            {'properties': {'bike_lanes': False}, 'length': 50.0},
+            {'properties': {'bike_lanes': 0}, 'length': 50.0},
+            {'properties': {}, 'length': 100.0}
+        ]
+        self.assertAlmostEqual(self.scorer._bike_coverage(links), 0.6)
+        self.assertIsNone(self.scorer._bike_coverage([]))
+
+        mock_cursor = Mock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = []
+        self.scorer._get_scenario_summaries(['scenario-1'])
+
+        # The pushdown must not cast JSON booleans to float
+        query = mock_cursor.execute.call_args[0][0]
+        self.assertIn("jsonb_typeof(l.properties->'bike_lanes')", query)
+        self.assertNotIn("(l.properties->>'bike_lanes')::float, 0", query)
+
+    def test_optimizer_full_model_scores_candidates(self):
+        """Test the optimizer can score every candidate with the full model"""
+        optimizer = ScenarioOptimizer()
+        optimizer._update_optimization_params({'sustainability_model': 'full'})
+        baseline = {
+            'scenario': {'id': 'scenario-1', 'total_area': 100000, 'avg_far': 2.0, 'avg_height': 15, 'avg_lot_coverage': 0.5},
+            'parcels': [
+                {'area': 5000, 'properties': {'far': 2.0, 'height': 15, 'useMix': {'residential': 1.0}}, 'capacity': {}}
+            ],
+            'links': [],
+            'kpis': {}
+        }
+
+        parameter_sets = [optimizer._extract_baseline_parameters(baseline), {'far': 6.0}]
+        scores = optimizer._score_candidates(baseline, parameter_sets)
+
+        expected = [
+            self._scalar_scores(optimizer._apply_parameters_to_scenario(baseline, params), self.scorer.scoring_weights)[1]
+            for params in parameter_sets
+        ]
+        self.assertEqual(len(scores), 2)
+        for score, value in zip(scores, expected):
+            self.assertAlmostEqual(score, value)
+
+if __name__ == '__main__':
+    unittest.main()
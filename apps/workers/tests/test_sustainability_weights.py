@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sustainability.sustainability_score import SustainabilityScore
+
+class TestSustainabilityWeights(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scorer = SustainabilityScore()
+
+        self.scenario_data = {
+            'scenario': {'id': 'scenario-1', 'total_area': 100000},
+            'parcels': [
+                {'properties': {'useMix': {'residential': 0.7, 'commercial': 0.3}}, 'capacity': {'population': 900}}
+            ],
+            'links': [],
+            'kpis': {
+                'energy_analysis': {'demand': {'self_sufficiency_ratio': 0.85}},
+                'network_analysis': {'intersection_density': 75}
+            }
+        }
+        self.category_scores = self.scorer._calculate_category_scores(self.scenario_data)
+
+        self.revision = patch.object(self.scorer, '_get_scenario_revision', return_value='rev-1')
+        self.scenario = patch.object(self.scorer, '_get_scenario_data', return_value=self.scenario_data)
+        self.mock_revision = self.revision.start()
+        self.mock_scenario = self.scenario.start()
+        self.addCleanup(patch.stopall)
+
+    def _expected(self, weights):
+        return sum(self.category_scores[c]['score'] * weights[c] for c in self.category_scores)
+
+    def test_reweight_uses_cache_for_unchanged_revision(self):
+        """Test repeated re-weighting loads the scenario only once"""
+        weights = {'energy': 0.5, 'mobility': 0.1, 'land_use': 0.1, 'water': 0.1, 'materials': 0.1, 'resilience': 0.1}
+
+        first = self.scorer.reweight_sustainability_score('scenario-1', weights)
+        second = self.scorer.reweight_sustainability_score('scenario-1', self.scorer.scoring_weights)
+
+        self.assertTrue(first['success'])
+        self.assertAlmostEqual(first['data']['results'][0]['overall_score'], self._expected(weights))
+        self.assertAlmostEqual(
+            second['data']['results'][0]['overall_score'], self._expected(self.scorer.scoring_weights)
+        )
+        self.assertEqual(self.mock_scenario.call_count, 1)
+
+    def test_new_revision_recomputes(self):
+        """Test a changed revision invalidates the cached category scores"""
+        self.scorer.reweight_sustainability_score('scenario-1', self.scorer.scoring_weights)
+        self.mock_revision.return_value = 'rev-2'
+        self.scorer.reweight_sustainability_score('scenario-1', self.scorer.scoring_weights)
+
+        self.assertEqual(self.mock_scenario.call_count, 2)
+
+    def test_link_edit_recomputes(self):
+        """Test editing a link changes the revision so bike coverage is rescored"""
+        self.revision.stop()
+        row = {'kpis_hash': 'abc', 'parcel_count': 1, 'parcels_updated_at': '2025-01-01', 'link_count': 2,
+               'links_updated_at': '2025-01-01'}
+        edited = dict(row, links_updated_at='2025-02-01')
+
+        with patch('sustainability.sustainability_score.psycopg2.connect') as connect:
+            connect.return_value.cursor.return_value.fetchone.side_effect = [row, row, edited]
+            for _ in range(3):
+                self.scorer.reweight_sustainability_score('scenario-1', self.scorer.scoring_weights)
+
+        self.assertIn('links', connect.return_value.cursor.return_value.execute.call_args[0][0])
+        self.assertEqual(self.mock_scenario.call_count, 2)
+
+    def test_many_weight_vectors(self):
+        """Test several weight vectors are applied in one call"""
+        weight_sets = [
+            {'energy': 1.0, 'mobility': 0, 'land_use': 0, 'water': 0, 'materials': 0, 'resilience': 0},
+            {'energy': 0, 'mobility': 0, 'land_use': 0, 'water': 0, 'materials': 0, 'resilience': 1.0}
+        ]
+
+        result = self.scorer.reweight_sustainability_score('scenario-1', weight_sets)
+
+        scores = [r['overall_score'] for r in result['data']['results']]
+        self.assertAlmostEqual(scores[0], self.category_scores['energy']['score'])
+        self.assertAlmostEqual(scores[1], self.category_scores['resilience']['score'])
+
+    def test_invalid_weights_rejected(self):
+        """Test weight vectors must sum to 1.0"""
+        result = self.scorer.reweight_sustainability_score('scenario-1', {'energy': 0.5})
+
+        self.assertFalse(result['success'])
+
+    def test_weight_sweep(self):
+        """Test a sweep varies one weight and keeps every row normalized"""
+        result = self.scorer.sweep_sustainability_weight('scenario-1', 'energy', steps=5)
+
+        data = result['data']
+        self.assertEqual(len(data['overall_scores']), 5)
+        energy_idx = data['categories'].index('energy')
+        for weights, score in zip(data['weights'], data['overall_scores']):
+            self.assertAlmostEqual(sum(weights), 1.0)
+            self.assertAlmostEqual(score, self._expected(dict(zip(data['categories'], weights))))
+        self.assertEqual(data['weights'][-1][energy_idx], 1.0)
+        self.assertAlmostEqual(data['overall_scores'][-1], self.category_scores['energy']['score'])
+
+    @patch('sustainability.sustainability_score.psycopg2.connect')
+    def test_calculate_does_not_mutate_weights(self, mock_connect):
+        """Test per-call weights leave the shared defaults untouched and seed the cache"""
+        original = dict(self.scorer.scoring_weights)
+        weights = {'energy': 0.5, 'mobility': 0.1, 'land_use': 0.1, 'water': 0.1, 'materials': 0.1, 'resilience': 0.1}
+
+        result = self.scorer.calculate_sustainability_score('scenario-1', weights)
+
+        self.assertTrue(result['success'])
+        self.assertAlmostEqual(result['data']['overall_score'], self._expected(weights))
+        self.assertEqual(self.scorer.scoring_weights, original)
+        self.scorer.reweight_sustainability_score('scenario-1', original)
+        self.assertEqual(self.mock_scenario.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import gzip
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from exports.vector_tiles import VectorTileExporter
+
+class FakeTileCursor:
+    """Cursor double that renders a tile for every requested (x, y) unless told it is empty"""
+
+    def __init__(self, scenario, empty_tiles=()):
+        self.scenario = scenario
+        self.empty_tiles = set(empty_tiles)
+        self.tile_requests = []
+        self.last_params = None
+
+    def execute(self, query, params=None):
+        self.last_params = params
+
+    def fetchone(self):
+        return self.scenario
+
+    def fetchall(self):
+        params = self.last_params
+        self.tile_requests.append((params['z'], list(zip(params['xs'], params['ys']))))
+        return [
+            {'x': x, 'y': y, 'tile': b'' if (params['z'], x, y) in self.empty_tiles else f'mvt-{params["z"]}-{x}-{y}'.encode()}
+            for x, y in zip(params['xs'], params['ys'])
+        ]
+
+    def close(self):
+        pass
+
+class TestVectorTiles(unittest.TestCase):
+    def setUp(self):
+        """Set up test fixtures"""
+        self.exporter = VectorTileExporter()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'scenario.mbtiles')
+
+        self.scenario = {
+            'id': 'scenario-1', 'name': 'Downtown', 'kpis': {'walk_score': 82},
+            'min_lon': -122.42, 'min_lat': 37.77, 'max_lon': -122.40, 'max_lat': 37.79
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _tiles(self):
+        with sqlite3.connect(self.path) as mbtiles:
+            return {
+                (z, x, y): data
+                for z, x, y, data in mbtiles.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles")
+            }
+
+    def test_tile_fraction(self):
+        """Test lon/lat to XYZ tile conversion"""
+        self.assertEqual(self.exporter._tile_fraction(0, 0, 1), (1.0, 1.0))
+        x, y = self.exporter._tile_fraction(-122.41, 37.78, 14)
+        self.assertEqual((int(x), int(y)), (2620, 6332))
+        self.assertEqual(self.exporter._tiles_for_bounds([(-1, -1, 1, 1)], 0), [(0, 0)])
+
+    @patch('exports.vector_tiles.psycopg2.connect')
+    def test_export_builds_pyramid_with_zoom_stats(self, mock_connect):
+        """Test every zoom level is rendered into gzipped TMS rows with per-zoom stats"""
+        cursor = FakeTileCursor(self.scenario, empty_tiles={(12, 655, 1583)})
+        mock_connect.return_value.cursor.return_value = cursor
+
+        result = self.exporter.export_mbtiles('scenario-1', self.path, min_zoom=12, max_zoom=14)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(set(result['data']['zoom_levels']), {'12', '13', '14'})
+        self.assertEqual([z for z, _ in cursor.tile_requests], [12, 13, 14])
+
+        tiles = self._tiles()
+        self.assertEqual(len(tiles), result['data']['tile_count'])
+        for (z, x, tms_y), data in tiles.items():
+            y = 2 ** z - 1 - tms_y
+            self.assertEqual(gzip.decompress(data), f'mvt-{z}-{x}-{y}'.encode())
+        self.assertNotIn((12, 655, 2 ** 12 - 1 - 1583), tiles)
+
+        for zoom, stats in result['data']['zoom_levels'].items():
+            self.assertIn('build_ms', stats)
+            self.assertEqual(stats['bytes'], sum(len(d) for (z, _, _), d in tiles.items() if str(z) == zoom))
+
+        with sqlite3.connect(self.path) as mbtiles:
+            metadata = dict(mbtiles.execute("SELECT name, value FROM metadata"))
+        self.assertEqual((metadata['format'], metadata['minzoom'], metadata['maxzoom']), ('pbf', '12', '14'))
+
+    @patch('exports.vector_tiles.psycopg2.connect')
+    def test_refresh_renders_only_touched_tiles(self, mock_connect):
+        """Test a geometry edit re-renders the tiles under it and drops tiles that became empty"""
+        mock_connect.return_value.cursor.return_value = FakeTileCursor(self.scenario)
+        self.exporter.export_mbtiles('scenario-1', self.path, min_zoom=13, max_zoom=14)
+        before = self._tiles()
+
+        edit = (-122.4195, 37.7705, -122.4190, 37.7710)
+        x, y = (int(value) for value in self.exporter._tile_fraction(-122.4192, 37.7707, 14))
+        cursor = FakeTileCursor(self.scenario, empty_tiles={(14, x, y)})
+        mock_connect.return_value.cursor.return_value = cursor
+
+        result = self.exporter.refresh_mbtiles('scenario-1', self.path, [edit])
+
+        self.assertTrue(result['success'])
+        requested = {(z, tile) for z, tiles in cursor.tile_requests for tile in tiles}
+        self.assertEqual(requested, {
+            (z, tile) for z in (13, 14) for tile in self.exporter._tiles_for_bounds([edit], z)
+        })
+        self.assertLess(len(requested), len(before))
+
+        after = self._tiles()
+        self.assertNotIn((14, x, 2 ** 14 - 1 - y), after)
+        self.assertEqual(len(after), len(before) - 1)
+
+if __name__ == '__main__':
+    unittest.main()